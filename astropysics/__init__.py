@@ -23,6 +23,7 @@ and visualizing astronomical data.
 * coords: Astronomical coordinate systems, distance measurements,
   and related objects
 * obstools: Tools and corrections for observations (mostly optical)
+* scheduling: Planning the observations for a night
 * models: Fitting functions/models and related calculations
 * objcat: Object Catalog objects and functions
 * phot: Photometry objects and related functions
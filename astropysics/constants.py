@@ -93,6 +93,10 @@ used in other modules as::
 
     from astropysics.constants import H0,omega
 
+Values that are expensive to compute from the cosmology should be stored with
+:func:`cosmology_cached`, which drops them automatically when the cosmology
+changes.
+
 .. todo:: examples for cosmologies, particularly :func:`rhoC`
 
 
@@ -254,6 +258,9 @@ class Cosmology(object):
         
     def __setattr__(self,name,value):
         object.__setattr__(self, name, value)
+        #globals() avoids name-mangling of the module-level variable
+        if self is globals().get('__current_cosmology'):
+            _cosmology_changed()
         if self._autoupdate:
             self._exportParams()
     
@@ -511,6 +518,66 @@ class WMAP3AllCosmology(FRWCosmology):
     omegaM_err = property(lambda self:self.omegaB_err+self.omegaC_err)
 
 
+__cosmo_version = 0
+__cosmo_cache = None
+
+def _cosmology_changed():
+    """
+    Called whenever the current cosmology or any cosmological parameter is
+    changed to increment the version and drop values cached with
+    :func:`cosmology_cached`.
+    """
+    global __cosmo_version
+    __cosmo_version += 1
+    if __cosmo_cache is not None:
+        __cosmo_cache.clear()
+    
+def get_cosmology_version():
+    """
+    Returns an integer that is incremented every time the current cosmology is
+    changed (by :func:`choose_cosmology` or :func:`update_cosmology`) or a
+    parameter of the current :class:`Cosmology` object is set. Values derived from the
+    cosmology can be stored along with this number to determine if they need
+    to be recomputed.
+    """
+    return __cosmo_version
+
+def cosmology_cached(key,func,*args,**kwargs):
+    """
+    Returns a value that depends on the current cosmology, computing it by
+    calling ``func(*args,**kwargs)`` only if it has not already been computed
+    for the current cosmology. The cached values are dropped whenever the
+    cosmology changes (see :func:`get_cosmology_version`).
+    
+    :param key: 
+        A hashable object identifying the value - it should include the name of
+        the calling function and any inputs that affect the value. If it is not
+        hashable, the value is computed but not cached.
+    :param func: A callable that computes the value.
+    
+    Further arguments are passed into `func`.
+    
+    :returns: The (possibly cached) value.
+    
+    **Examples**
+    
+    >>> cosmology_cached(('rhoC0',),lambda:get_cosmology().rhoC(0)) == get_cosmology().rhoC(0)
+    True
+    
+    """
+    global __cosmo_cache
+    if __cosmo_cache is None:
+        from .utils.gen import LRUCache
+        __cosmo_cache = LRUCache(256)
+        
+    try:
+        return __cosmo_cache[key]
+    except KeyError:
+        val = __cosmo_cache[key] = func(*args,**kwargs)
+        return val
+    except TypeError: #unhashable key
+        return func(*args,**kwargs)
+
 __current_cosmology=WMAP7BAOH0Cosmology() #default value
 __current_cosmology._exportParams()
 __cosmo_registry={}
@@ -585,6 +652,7 @@ def choose_cosmology(nameorobj,autoupdate=True,args=None,kwargs=None):
         __current_cosmology._exportParams()
         
     c._autoupdate = bool(autoupdate)
+    _cosmology_changed()
         
     return c
     
@@ -606,6 +674,7 @@ def update_cosmology():
     object
     """
     __current_cosmology._exportParams()
+    _cosmology_changed()
 
 def get_registry_names():
     """
@@ -139,12 +139,7 @@ class EphemerisObject(object):
             jd = calendar_to_jd(val)
         else:
             jd = val
-        if self._validrange is not None:
-            from warnings import warn
-            if self._validrange[0] is not None and jd < self._validrange[0]:
-                warn('JD {0} is below the valid range for this EphemerisObject'.format(jd),EphemerisAccuracyWarning)
-            elif self._validrange[1] is not None and jd > self._validrange[1]:
-                warn('JD {0} is above the valid range for this EphemerisObject'.format(jd),EphemerisAccuracyWarning)
+        self._checkValidjds(jd)
         
         self._jdhook(self._jd,jd)
         self._jd = jd        
@@ -162,6 +157,19 @@ class EphemerisObject(object):
 
     
     
+    def _checkValidjds(self,jds):
+        """
+        Issues an :exc:`EphemerisAccuracyWarning` if any of the provided jds
+        (scalar or array) are outside the valid range.
+        """
+        if self._validrange is not None:
+            from warnings import warn
+            minjd,maxjd = self._validrange
+            if minjd is not None and np.any(jds < minjd):
+                warn('JD {0} is below the valid range for this EphemerisObject'.format(np.min(jds)),EphemerisAccuracyWarning)
+            elif maxjd is not None and np.any(jds > maxjd):
+                warn('JD {0} is above the valid range for this EphemerisObject'.format(np.max(jds)),EphemerisAccuracyWarning)
+    
     @property
     def validjdrange(self):
         """
@@ -204,32 +212,57 @@ class EphemerisObject(object):
                         vs.append(v)
                 self._validrange = tuple(vs)
                 
-    def __call__(self,jds=None,coordsys=None):
+    def __call__(self,jds=None,coordsys=None,asarray=False):
         """
         Computes the coordinates of this object at the specified time(s).
         
         :param jds: 
             A sequence of julian dates at which to compute the coordinates, a
-            scalar JD, or None to use the :attr:`jd` attribute's current value.
+            scalar JD, an :class:`astropysics.obstools.TimeArray` (the julian
+            dates in its time scale are used), or None to use the :attr:`jd`
+            attribute's current value.
         :param coordsys: 
             A :class:`astropysics.coords.coordsys.CooordinateSystem` class that
             specifies the type of the output coordinates, or None to use the
             default coordinate type.
+        :param bool asarray: 
+            If True, the coordinates for all of the `jds` are computed at once
+            and returned as a single array-backed object (see
+            :meth:`_getCoordArray`). `coordsys` must then be None, the default
+            coordinate type, or a
+            :class:`astropysics.coords.coordsys.LatLongCoordinates` subclass.
 
         :returns: 
             A list of objects with the coordinates in the same order as `jds`,
             or a single object if `jds` is None or a scalar. Outputs are
             :class:`astropysics.coords.coordsys.CooordinateSystem` subclasses,
             and their type is either `coordsys` or the default type if
-            `coordsys` is None.
-        
+            `coordsys` is None. If `asarray` is True, a single object holding
+            arrays of coordinates is returned instead - for
+            :class:`astropysics.coords.coordsys.LatLongCoordinates` systems,
+            this is a
+            :class:`astropysics.coords.coordsys.LatLongCoordinatesArray`,
+            otherwise it is an object of the default type with array attributes
+            (e.g. x, y, and z).
+        
+        :except TypeError: 
+            If `asarray` is True and the coordinates cannot be converted to
+            `coordsys` as arrays.
+        :except ValueError: If `asarray` is True and `jds` is empty.
         
         """
+        if asarray:
+            return self._callArray(jds,coordsys)
+        
         single = False #return an object instead of a sequence of objects
         if jds is None:
             single = True
             res = (self._getCoordObj(),)
         else:
+            from ..obstools import TimeArray
+            
+            if isinstance(jds,TimeArray):
+                jds = np.asarray(jds)
             if isinstance(jds,np.ndarray):
                 if jds.shape == ():
                     single = True
@@ -255,6 +288,72 @@ class EphemerisObject(object):
             return res[0]
         else:
             return res
+        
+    def _callArray(self,jds,coordsys):
+        """
+        Implements :meth:`__call__` for `asarray` True.
+        """
+        from ..obstools import jd_to_epoch
+        from .coordsys import LatLongCoordinates,LatLongCoordinatesArray, \
+                              EpochalCoordinates
+        
+        if jds is None:
+            jds = self.jd
+        jds = np.array(jds,dtype=float,ndmin=1).ravel()
+        if len(jds)==0:
+            raise ValueError('no julian dates provided for array coordinates')
+        
+        self._checkValidjds(jds)
+        res = self._getCoordArray(jds)
+        if res is None:
+            #no vectorized implementation, so compute one at a time
+            jd0 = self._jd
+            try:
+                objs = []
+                for jd in jds:
+                    self._jdhook(self._jd,jd)
+                    self._jd = jd
+                    objs.append(self._getCoordObj())
+            finally:
+                self._jdhook(self._jd,jd0)
+                self._jd = jd0
+            res = _coord_objects_to_array(objs)
+            
+        if coordsys is None or isinstance(res,coordsys):
+            return res
+        elif not (isinstance(coordsys,type) and issubclass(coordsys,LatLongCoordinates)):
+            raise TypeError('coordinate arrays can only be converted to LatLongCoordinates systems')
+        elif isinstance(res,LatLongCoordinatesArray):
+            return res.convert(coordsys)
+        
+        #rectangular arrays go through the directly connected lat/long system
+        llsyss = [c for c in res.listTransformsFrom(res.__class__) 
+                    if issubclass(c,LatLongCoordinates)]
+        if len(llsyss)==0:
+            raise TypeError('cannot convert %s arrays to %s'%(res.__class__.__name__,coordsys.__name__))
+        epoch = jd_to_epoch(jds) if isinstance(res,EpochalCoordinates) else None
+        return _rect_to_latlong_array(res,llsyss[0],epoch).convert(coordsys)
+    
+    def _getCoordArray(self,jds):
+        """
+        Computes the coordinates of the object at many times at once. 
+        
+        Subclasses may override this to implement a vectorized version of
+        :meth:`_getCoordObj`. If it returns None (the default), the coordinates
+        are instead computed one time at a time with :meth:`_getCoordObj`.
+        
+        :param jds: A 1D array of julian dates.
+        
+        :returns: 
+            The coordinates at all of the `jds`. For
+            :class:`astropysics.coords.coordsys.LatLongCoordinates` systems, this
+            should be a
+            :class:`astropysics.coords.coordsys.LatLongCoordinatesArray`, while
+            for :class:`astropysics.coords.coordsys.RectangularCoordinates` it
+            should be an object of the output class with arrays as the x, y, and
+            z attributes (and a None epoch).
+        """
+        return None
                 
     
     @abstractmethod
@@ -286,6 +385,59 @@ class EphemerisObject(object):
         """
         raise NotImplementedError
     
+def _coord_objects_to_array(objs):
+    """
+    Combines a sequence of coordinate objects from :meth:`EphemerisObject._getCoordObj`
+    into the array form returned by :meth:`EphemerisObject._getCoordArray`.
+    """
+    from copy import copy
+    from .coordsys import LatLongCoordinates,LatLongCoordinatesArray, \
+                          RectangularCoordinates,EpochalCoordinates
+    
+    if len(objs)==0:
+        raise ValueError('cannot combine an empty sequence of coordinates into an array')
+    elif isinstance(objs[0],LatLongCoordinates):
+        return LatLongCoordinatesArray.fromObjects(objs)
+    elif isinstance(objs[0],RectangularCoordinates):
+        res = copy(objs[0])
+        res.x = np.array([o.x for o in objs],dtype=float)
+        res.y = np.array([o.y for o in objs],dtype=float)
+        res.z = np.array([o.z for o in objs],dtype=float)
+        if isinstance(res,EpochalCoordinates):
+            res._epoch = None
+        return res
+    else:
+        raise TypeError('cannot combine %s objects into an array'%objs[0].__class__.__name__)
+    
+def _rect_to_latlong_array(rc,llsys,epoch):
+    """
+    Converts an array-valued :class:`RectangularCoordinates` object into a
+    :class:`LatLongCoordinatesArray` in the `llsys` system, which should share
+    its axes and origin with `rc`.
+    """
+    from ..constants import auperpc
+    from .coordsys import LatLongCoordinatesArray
+    
+    x,y,z = rc.x,rc.y,rc.z
+    r = (x*x+y*y+z*z)**0.5
+    lat = np.arcsin(z/r)
+    long = np.arctan2(y,x)
+    
+    unit = getattr(rc,'unit',None)
+    if unit is None:
+        distancepc = None
+    elif unit == 'pc':
+        distancepc = r
+    elif unit == 'au':
+        distancepc = r/auperpc
+    else:
+        raise NotImplementedError('Unrecognized unit %s'%unit)
+    
+    if epoch is None:
+        epoch = 'default'
+    return LatLongCoordinatesArray(llsys,long,lat,epoch=epoch,
+                                   distancepc=distancepc,radians=True)
+    
 class ProperMotionObject(EphemerisObject):
     """
     An object with linear proper motion relative to a specified epoch.
@@ -390,6 +542,23 @@ class ProperMotionObject(EphemerisObject):
             return self.coordclass(self.ra,self.dec,distancepc=self.distancepc,
                                            epoch=jd_to_epoch(self.jd))
             
+    def _getCoordArray(self,jds):
+        from ..obstools import jd_to_epoch
+        from ..constants import asecperrad,cmperpc,secperyr
+        from .coordsys import LatLongCoordinatesArray
+        
+        dyr = (jds - self._jd0)/365.25
+        ra = self.ra0 + np.degrees(dyr*self.dra/asecperrad)
+        dec = self.dec0 + np.degrees(dyr*self.ddec/asecperrad)
+        if self.distpc0 is None:
+            distancepc = None
+        else:
+            distancepc = self.distpc0 + dyr*self.rv*secperyr*1e5/cmperpc
+            
+        return LatLongCoordinatesArray(self.coordclass,ra,dec,
+                                       epoch=jd_to_epoch(jds),
+                                       distancepc=distancepc)
+            
     
 class KeplerianObject(EphemerisObject):
     """
@@ -466,7 +635,7 @@ class KeplerianObject(EphemerisObject):
         
         self.outcoords = kwargs.pop('outcoords',RectangularCoordinates)
         self.outtransfunc = kwargs.pop('outtransfunc',None)
-        self.Etol = kwargs.pop('Etol',23.43928)
+        self.Etol = kwargs.pop('Etol',None)
         
         
         kwnms = ('a','e','i','Lan','L','Lp','ap','M')
@@ -575,12 +744,10 @@ class KeplerianObject(EphemerisObject):
         if hasattr(self,'_M'):
             return self._M(self._t)
         elif hasattr(self,'_bcsf'): #special hidden correction used for 3000BCE-3000CE 
-            from math import sin,cos
-            
             b,c,s,f = self._bcsf
             T = self._t
             
-            return self.L - self.Lp  + b*T*T + c*cos(f*T) + s*sin(f*T)
+            return self.L - self.Lp  + b*T*T + c*np.cos(f*T) + s*np.sin(f*T)
         
         else:
             return self.L - self.Lp
@@ -603,6 +770,41 @@ class KeplerianObject(EphemerisObject):
         from math import sin
         
         return E-M-e*sin(E)
+    
+    @staticmethod
+    def _solveKepler(M,e,tol=None,maxiter=50):
+        r"""
+        Solves Kepler's equation :math:`M = E - e \sin(E)` for the eccentric
+        anomaly using Newton-Raphson iteration. `M` and `e` can be arrays, in
+        which case all of the solutions are iterated at once.
+        
+        :param M: Mean anomaly in radians, in the range :math:`-\pi` to :math:`\pi`.
+        :param e: Eccentricity.
+        :param tol: 
+            Absolute tolerance for E in radians. If None, defaults to 1.5e-8,
+            and if 0, the analytic approximation is returned (see
+            :attr:`Etol`).
+        :param int maxiter: The maximum number of iterations.
+        
+        :returns: Eccentric anomaly in radians, with the shape of `M` and `e`.
+        """
+        M = np.asarray(M,dtype=float)
+        e = np.asarray(e,dtype=float)
+        
+        E = M + e*np.sin(M)*(1.0 + e*np.cos(M))
+        if tol == 0:
+            return E
+        elif tol is None:
+            tol = 1.5e-8
+            
+        #the approximation is a poor starting point for nearly parabolic orbits
+        E = np.where(e > 0.8,np.where(M < 0,-pi,pi),E)
+        for i in range(maxiter):
+            dE = (E - e*np.sin(E) - M)/(1.0 - e*np.cos(E))
+            E = E - dE
+            if np.all(np.abs(dE) < tol):
+                break
+        return E
         
     @property
     def E(self):
@@ -610,21 +812,12 @@ class KeplerianObject(EphemerisObject):
         Eccentric anamoly in degrees - calculated from mean anamoly with
         accuracy given by :attr:`Etol`.
         """
-        from math import radians,sin,cos,degrees,pi
-        from scipy.optimize import fsolve
-        
-        M = radians((self.M + 180)%360 - 180)
+        M = np.radians((self.M + 180)%360 - 180)
         e = self.e #radians
-        E0 = M + e*sin(M)*(1.0 + e*cos(M))
         
-        if self.Etol==0:
-            Er = E0
-        elif self.Etol is None:
-            Er = fsolve(KeplerianObject._keplerEq,E0,args=(M,e))[0]
-        else:
-            Er = fsolve(KeplerianObject._keplerEq,E0,args=(M,e),xtol=self.Etol)[0]
+        Er = KeplerianObject._solveKepler(M,e,self.Etol)
         
-        return degrees(Er)%360
+        return np.degrees(Er)%360
     
     @property
     def nu(self):
@@ -632,28 +825,24 @@ class KeplerianObject(EphemerisObject):
         True anamoly in degrees (:math:`-180 < \nu < 180`) - calculated from
         eccentric anamoly with accuracy given by :attr:`Etol`.
         """
-        from math import radians,sin,cos,atan2,sqrt,degrees
-        
-        E = radians(self.E)
+        E = np.radians(self.E)
         e = self.e
         
-        xv = cos(E) - e
-        yv = sqrt(1.0 - e*e) * sin(E)
+        xv = np.cos(E) - e
+        yv = np.sqrt(1.0 - e*e) * np.sin(E)
         
-        return degrees(atan2(yv,xv))
+        return np.degrees(np.arctan2(yv,xv))
     
     @property
     def d(self):
         """
         Current distance from focus of attraction to object.
         """
-        from math import radians,cos
-        
         a = self.a
         e = self.e
-        nu = radians(self.nu)
+        nu = np.radians(self.nu)
         
-        return a*(1-e*e)/(1+e*cos(nu))
+        return a*(1-e*e)/(1+e*np.cos(nu))
         
     @property
     def dperi(self):
@@ -677,30 +866,31 @@ class KeplerianObject(EphemerisObject):
         return self.a**1.5
     
     
-    def _getCoordObj(self):
-        from ..obstools import jd_to_epoch
-        from math import sin,cos,sqrt,radians
-        
+    def _computeCoords(self,jd):
+        """
+        Computes the output coordinates from the orbital elements at the current
+        value of :attr:`_t`, which may be an array. `jd` should match it.
+        """
         #orbital plane coordinates
         a = self.a
-        E = radians(self.E)
+        E = np.radians(self.E)
         e = self.e
-        xp = a*(cos(E)-e)
-        yp = a*sqrt(1-e*e)*sin(E)
+        xp = a*(np.cos(E)-e)
+        yp = a*np.sqrt(1-e*e)*np.sin(E)
         
-        w = radians(self.ap)
-        o = radians(self.Lan)
-        i = radians(self.i)
-        cw,sw = cos(w),sin(w)
-        co,so = cos(o),sin(o)
-        ci,si = cos(i),sin(i)
+        w = np.radians(self.ap)
+        o = np.radians(self.Lan)
+        i = np.radians(self.i)
+        cw,sw = np.cos(w),np.sin(w)
+        co,so = np.cos(o),np.sin(o)
+        ci,si = np.cos(i),np.sin(i)
         
         x = (cw*co-sw*so*ci)*xp + (-sw*co - cw*so*ci)*yp
         y = (cw*so+sw*co*ci)*xp + (-sw*so + cw*co*ci)*yp
         z = (sw*si)*xp + (cw*si)*yp
         
         if self.outtransfunc:
-            x,y,z = self.outtransfunc(x,y,z,self._jd)
+            x,y,z = self.outtransfunc(x,y,z,jd)
         res = self.outcoords(x,y,z)              
         
         #adjust units to AU if the coordinate system has units
@@ -708,12 +898,29 @@ class KeplerianObject(EphemerisObject):
             res.unit = None #convention is that None implies not to do conversions
             res.unit = 'au'
             
+        return res
+    
+    def _getCoordObj(self):
+        from ..obstools import jd_to_epoch
+        
+        res = self._computeCoords(self._jd)
         #add epoch info if coordinates have an epoch
         if hasattr(res,'epoch'):
             res.epoch = jd_to_epoch(self.jd)
             
         return res
     
+    def _getCoordArray(self,jds):
+        from ..obstools import jd2000
+        
+        t0 = self._t
+        try:
+            self._t = (jds - jd2000)/36525.
+            res = self._computeCoords(jds)
+        finally:
+            self._t = t0
+        return res
+    
     def getPhase(self,viewobj='Earth',illumobj='Sun'):
         """
         Computes the phase of this object. The phase is computed as viwed from
@@ -937,15 +1144,27 @@ class Moon(KeplerianObject):
 
 
         
+_earth_series_coeffs = None
 def _load_earth_series(datafn='earth_series.tab'):
     """
-    Load series terms from VSOP2000 simplified solution
+    Load series terms from VSOP2000 simplified solution. The file is only
+    loaded the first time this is called, and is cached in binary form (see
+    :func:`astropysics.utils.io.get_package_data_arrays`).
     """
-    from ..utils.io import get_package_data
-    from numpy import array,matrix
-    from math import sqrt
+    from ..utils.io import get_package_data_arrays
+    global _earth_series_coeffs
+    
+    if _earth_series_coeffs is None:
+        _earth_series_coeffs = get_package_data_arrays(datafn,_parse_earth_series)
+    return _earth_series_coeffs
+    
+def _parse_earth_series(s):
+    """
+    Parses the VSOP2000 series data file content into a dictionary of arrays.
+    """
+    from numpy import array
     
-    lines = [l for l in get_package_data(datafn).split('\n') if not l.startswith('#') if not l=='']
+    lines = [l for l in s.split('\n') if not l.startswith('#') if not l=='']
     
     lst = None
     lsts = {}
@@ -966,8 +1185,9 @@ def _load_earth_series(datafn='earth_series.tab'):
     #first add all matricies
     for k,v in lsts.items():
         if k.endswith('mat'):
-            mat = matrix(v,dtype=float)
-            res[k] = mat.reshape(sqrt(mat.size),sqrt(mat.size))
+            mat = array(v,dtype=float)
+            n = int(round(mat.size**0.5))
+            res[k] = mat.reshape(n,n)
     
     #now construct all the x,y,z combination series'
     coeffnms = set([k[:-1] for k in lsts.keys() if not k.endswith('mat')])
@@ -992,49 +1212,51 @@ def _load_earth_series(datafn='earth_series.tab'):
         res[cnm+'coeffs'] = array([xs,ys,zs],dtype=float)
     
     return res
-    
-_earth_series_coeffs = _load_earth_series()
+
+#maximum number of (component,term,time) elements evaluated at once
+_earth_series_chunksize = 2**16
 
 def _compute_earth_series(t,coeffs0,coeffs1,coeffs2):
     """
     Internal function to computes Earth location/velocity components from series
     coefficients.
     
-    :param t:  T = JD - JD_J2000
+    :param t:  T = JD - JD_J2000 in julian years, as a scalar or 1D array
     :param coeffs0: constant term
     :param coeffs1: T^1 term
     :param coeffs2: T^2 term
     
-    :returns: pos,vel
+    :returns: 
+        pos,vel as length-3 arrays, or 3xN arrays if `t` is an array of length
+        N.
     """
-    
-    #T^0 terms
-    acs = coeffs0[:,0::3]
-    bcs = coeffs0[:,1::3]
-    ccs = coeffs0[:,2::3]
-    ps = bcs + ccs*t
-    pos = np.sum(acs*np.cos(ps),axis=1)
-    vel = np.sum(-acs*ccs*np.sin(ps),axis=1)
-    
-    #T^1 terms
-    acs = coeffs1[:,0::3]
-    bcs = coeffs1[:,1::3]
-    ccs = coeffs1[:,2::3]
-    cts = ccs*t
-    ps = bcs + cts
-    cps = np.cos(ps)
-    pos += np.sum(acs*t*cps,axis=1)
-    vel += np.sum(acs*(cps - cts*np.sin(ps)),axis=1)
-    
-    #T^2 terms
-    acs = coeffs2[:,0::3]
-    bcs = coeffs2[:,1::3]
-    ccs = coeffs2[:,2::3]
-    cts = ccs*t
-    ps = bcs + cts
-    cps = np.cos(ps)
-    pos += np.sum(acs*cps*t*t,axis=1)
-    vel += np.sum(acs*t*(2.0*cps - cts*np.sin(ps)),axis=1)
+    t = np.asarray(t,dtype=float)
+    if t.ndim == 0:
+        pos,vel = _compute_earth_series(t.reshape(1),coeffs0,coeffs1,coeffs2)
+        return pos[:,0],vel[:,0]
+    
+    pos = np.zeros((3,len(t)))
+    vel = np.zeros((3,len(t)))
+    
+    #evaluate in chunks of times to keep the (3,nterms,ntimes) arrays small
+    nterms = max([c.shape[1]//3 for c in (coeffs0,coeffs1,coeffs2)])
+    chunk = max(_earth_series_chunksize//(3*nterms),1)
+    for i in range(0,len(t),chunk):
+        ti = t[i:i+chunk]
+        for n,coeffs in enumerate((coeffs0,coeffs1,coeffs2)):
+            #T^n terms: a T^n cos(b + c T)
+            acs = coeffs[:,0::3]
+            bcs = coeffs[:,1::3]
+            ccs = coeffs[:,2::3]
+            ps = bcs[:,:,np.newaxis] + ccs[:,:,np.newaxis]*ti
+            sumcos = np.einsum('ik,ikn->in',acs,np.cos(ps))
+            sumsin = np.einsum('ik,ikn->in',acs*ccs,np.sin(ps))
+            
+            tn = ti**n
+            pos[:,i:i+chunk] += tn*sumcos
+            vel[:,i:i+chunk] -= tn*sumsin
+            if n > 0:
+                vel[:,i:i+chunk] += n*ti**(n-1)*sumcos
     
     return pos,vel
 
@@ -1060,18 +1282,26 @@ class Earth(EphemerisObject):
         x,y,z = earth_pos_vel(self.jd,True)[0]
         return RectangularICRSCoordinates(x=x,y=y,z=z,epoch=jd_to_epoch(self.jd))
     
+    def _getCoordArray(self,jds):
+        from .coordsys import RectangularICRSCoordinates
+        
+        x,y,z = earth_pos_vel(jds,True)[0]
+        return RectangularICRSCoordinates(x=x,y=y,z=z)
+    
     def getVelocity(self,jd=None,kms=True):
         """
         Computes and returns the velociy of the Earth relative to the solar
         system barycenter.
         
         :params jd: 
-            The julian date at which to compute the velocity, or None to use the
-            :attr:`jd` attribute.
+            The julian date (or an array of dates) at which to compute the
+            velocity, or None to use the :attr:`jd` attribute.
         :params bool kms: 
             If True, velocities are returned in km/s, otherwise AU/yr.
             
-        :returns: vx,vy,vz in km/s if `kms` is True, otherwise AU/yr.
+        :returns: 
+            vx,vy,vz in km/s if `kms` is True, otherwise AU/yr. Each is an
+            array if `jd` is an array.
             
         """
         return earth_pos_vel(self.jd if jd is None else jd,True,kms)[1]
@@ -1087,6 +1317,7 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     1900-2100. 
     
     :param jd: The julian date for the positions and velocities.
+    :type jd: scalar or array-like
     :param bool barycentric: 
         If True, the output positions and velocities are relative to the solar
         system barycenter. Otherwise, positions and velocities are heliocentric.
@@ -1095,7 +1326,8 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     :returns: 
         2 3-tuples (x,y,z),(vx,vy,vz) where x,y, and z are GCRS-aligned
         positions in AU, and vx,vy, and vz are velocities in km/s if `kms` is
-        True, or AU/yr.
+        True, or AU/yr. If `jd` is an array, these are returned as two 3xN
+        arrays.
         
     
     """
@@ -1103,12 +1335,14 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     from ..constants import aupercm,secperyr
     from warnings import warn
     
-    coeffsd = _earth_series_coeffs
+    coeffsd = _load_earth_series()
     
+    jd = np.asarray(jd,dtype=float)
     t = (jd-jd2000)/365.25 #Julian years since 2000.0 reference
     
-    if t > 100 or t < -100:
-        warn('JD {0} is not in range 1900-2100 CE for Earth position'.format(jd),EphemerisAccuracyWarning)
+    if np.any(np.abs(t) > 100):
+        badjd = np.ravel(jd)[np.ravel(np.abs(t) > 100)][0]
+        warn('JD {0} is not in range 1900-2100 CE for Earth position'.format(badjd),EphemerisAccuracyWarning)
         
     pos,vel = _compute_earth_series(t,coeffsd['h0coeffs'],coeffsd['h1coeffs'],coeffsd['h2coeffs'])
     
@@ -1119,8 +1353,8 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     
     #this rotates the analytic model from the series to DE405/BCRS
     #same as rotating by -23d26'21.4091" about x then 0.0475" about z        
-    pos = (coeffsd['ec2bcrsmat']*pos.reshape(3,1)).A.ravel()
-    vel = (coeffsd['ec2bcrsmat']*vel.reshape(3,1)).A.ravel()
+    pos = np.dot(coeffsd['ec2bcrsmat'],pos)
+    vel = np.dot(coeffsd['ec2bcrsmat'],vel)
     
     if kms:
         #AU/yr*(   km/AU  *  yr/sec ) = km/sec
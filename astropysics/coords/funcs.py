@@ -488,7 +488,84 @@ def radec_str_to_decimal(*args):
     
     return np.array(ras),np.array(decs)
 
-def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
+def _lonlat_to_unit_vectors(long,lat):
+    """
+    Converts longitude and latitude arrays (in degrees) to an N x 3 array of
+    cartesian unit vectors.
+    """
+    long = np.radians(np.array(long,copy=False,dtype=float).ravel())
+    lat = np.radians(np.array(lat,copy=False,dtype=float).ravel())
+    
+    res = np.empty((long.size,3))
+    clat = np.cos(lat)
+    res[:,0] = clat*np.cos(long)
+    res[:,1] = clat*np.sin(long)
+    res[:,2] = np.sin(lat)
+    return res
+
+def _angle_to_chord(angle):
+    """
+    Converts an angular separation in degrees to the straight-line (chord)
+    distance between two points on the unit sphere.
+    """
+    angle = np.clip(np.radians(angle),0,pi)
+    return 2*np.sin(angle/2)
+
+def _chord_to_angle(chord):
+    """
+    Converts the straight-line (chord) distance between two points on the unit
+    sphere to an angular separation in degrees.
+    """
+    return np.degrees(2*np.arcsin(np.clip(np.array(chord,copy=False)/2,0,1)))
+
+def _kdtree_class():
+    """
+    Returns the best available kd-tree class from scipy.
+    """
+    try:
+        from scipy.spatial import cKDTree as KDTree
+    except ImportError:
+        from warnings import warn
+        warn('C-based scipy kd-tree not available - coordinate matching will be much slower!')
+        from scipy.spatial import KDTree
+    return KDTree
+
+def _kdtree_pairs(kdt1,kdt2,r):
+    """
+    Finds all pairs of points in two kd-trees within a distance `r` of each
+    other.
+    
+    :returns: (ind1,ind2) arrays of indecies into the data of `kdt1` and `kdt2`
+    """
+    try:
+        pairs = kdt1.sparse_distance_matrix(kdt2,r,output_type='ndarray')
+        return pairs['i'].astype(int),pairs['j'].astype(int)
+    except TypeError: #older scipy or pure-python KDTree
+        lists = kdt1.query_ball_tree(kdt2,r)
+        ind1 = np.repeat(np.arange(len(lists)),[len(l) for l in lists])
+        ind2 = np.array([j for l in lists for j in l],dtype=int)
+        return ind1,ind2
+    
+def _match_pairs(x1,x2,r,chunksize):
+    """
+    Generator that finds all pairs of points (rows) in `x1` and `x2` within a
+    distance `r` of each other, processing `x2` in chunks of at most
+    `chunksize` points.
+    
+    :returns: 
+        An iterator over (ind1,ind2) arrays of indecies into `x1` and `x2`
+        for the matched pairs in each chunk.
+    """
+    KDTree = _kdtree_class()
+    
+    chunksize = max(int(chunksize),1)
+    kdt1 = KDTree(x1)
+    for start in range(0,len(x2),chunksize):
+        kdt2 = KDTree(x2[start:start+chunksize])
+        ind1,ind2 = _kdtree_pairs(kdt1,kdt2,r)
+        yield ind1,ind2+start
+
+def match_coords(a1,b1,a2,b2,eps=1,mode='mask',spherical=False,chunksize=100000):
     """
     Match one pair of coordinate :class:`arrays <numpy.ndarray>` to another
     within a specified tolerance (`eps`).
@@ -496,7 +573,13 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
     Distance is determined by the cartesian distance between the two arrays,
     implying the small-angle approximation if the input coordinates are
     spherical. Units are arbitrary, but should match between all coordinates
-    (and `eps` should be in the same units)
+    (and `eps` should be in the same units). If `spherical` is True, the
+    coordinates are instead taken to be longitude (`a`) and latitude (`b`) in
+    degrees, and distance is the great-circle separation in degrees.
+    
+    Matching uses a kd-tree, and the second set of coordinates is processed in
+    chunks, so memory use is proportional to the number of coordinates and
+    matches rather than the product of the lengths of the two sets.
     
     :param a1: the first coordinate for the first set of coordinates
     :type a1: array-like
@@ -535,9 +618,13 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             a2[ind2[i]] will give the "a" coordinate for a matched pair
             of coordinates.
         * 'match2D'
-            Returns a 2-dimensional bool array. The array element M[i,j] is True
-            if the ith coordinate of the first coordinate set
-            matches the jth coordinate of the second set.
+            Returns a 2-dimensional bool array with shape (len(a2),len(a1)).
+            The array element M[j,i] is True if the ith coordinate of the first
+            coordinate set matches the jth coordinate of the second set.
+        * 'sparse2D'
+            Returns the same matches as 'match2D', but as a boolean
+            :class:`scipy.sparse.csr_matrix`, which requires much less memory
+            for large coordinate sets.
         * 'nearest'
             Returns (nearestind,distance,match). `nearestind` is an int array
             such that nearestind holds indecies into the *second* set of
@@ -548,8 +635,17 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             if the distance is within `eps`, and is the same shape as the other
             outputs. Note that if a1 and b1 are the same object (and a2 and b2),
             this finds the second-closest match (because the first will always
-            be the object itself if the coordinate pairs are the same) This mode
-            is a wrapper around :func:`match_nearest_coords`.
+            be the object itself if the coordinate pairs are the same). If
+            `spherical` is False, this mode is a wrapper around
+            :func:`match_nearest_coords`.
+            
+    :param bool spherical: 
+        If True, the coordinates are treated as longitude/latitude in degrees
+        on the sphere. Otherwise, they are treated as flat cartesian
+        coordinates.
+    :param int chunksize: 
+        The maximum number of coordinates from the second set to match at a
+        time.
     
     :returns: See `mode` for a description of return types.
     
@@ -571,36 +667,59 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
     a2 = np.array(a2,copy=False).ravel()
     b2 = np.array(b2,copy=False).ravel()
     
-    #bypass the rest for 'nearest', as it calls match_nearest_coords
+    if spherical:
+        x1 = _lonlat_to_unit_vectors(a1,b1)
+        x2 = x1 if identical else _lonlat_to_unit_vectors(a2,b2)
+        r = _angle_to_chord(eps)
+    else:
+        x1 = np.column_stack((a1,b1)).astype(float)
+        x2 = x1 if identical else np.column_stack((a2,b2)).astype(float)
+        r = eps
+    
+    #bypass the rest for 'nearest', as it only needs the nearest neighbor
     if mode == 'nearest':
-        #special casing so that match_nearest_coords dpes second nearest
-        if identical: 
-            t = (a1,b1)
-            seps,i2 = match_nearest_coords(t,t)
+        if spherical:
+            kdt = _kdtree_class()(x2)
+            if identical:
+                #special casing so that the second nearest is found 
+                chords,i2 = kdt.query(x1,2)
+                chords,i2 = chords[:,1],i2[:,1]
+            else:
+                chords,i2 = kdt.query(x1)
+            seps = _chord_to_angle(chords)
         else:
-            seps,i2 = match_nearest_coords((a1,b1),(a2,b2))
+            #special casing so that match_nearest_coords does second nearest
+            if identical: 
+                t = (a1,b1)
+                seps,i2 = match_nearest_coords(t,t)
+            else:
+                seps,i2 = match_nearest_coords((a1,b1),(a2,b2))
         return i2,seps,(seps<=eps)
-        
-    def find_sep(A,B):
-        At = np.tile(A,(len(B),1))
-        Bt = np.tile(B,(len(A),1))
-        return At.T-Bt
-    sep1 = find_sep(a1,a2)
-    sep2 = find_sep(b1,b2)
-    sep = np.hypot(sep1,sep2)
     
-    matches =  sep <= eps
+    if mode not in ('mask','maskexcept','maskwarn','count','index','match2D',
+                    'sparse2D'):
+        raise ValueError('unrecognized mode')
+    
+    n1,n2 = len(x1),len(x2)
+    s1 = np.zeros(n1,dtype=int)
+    s2 = np.zeros(n2,dtype=int)
+    inds1 = []
+    inds2 = []
+    for i1,i2 in _match_pairs(x1,x2,r,chunksize):
+        s1 += np.bincount(i1,minlength=n1)
+        s2 += np.bincount(i2,minlength=n2)
+        if mode in ('index','match2D','sparse2D'):
+            inds1.append(i1)
+            inds2.append(i2)
     
     if mode == 'mask':
-        return np.any(matches,axis=1),np.any(matches,axis=0)
+        return s1>0,s2>0
     elif mode == 'maskexcept':
-        s1,s2 = np.sum(matches,axis=1),np.sum(matches,axis=0) 
         if np.all(s1<2) and np.all(s2<2):
             return s1>0,s2>0
         else:
             raise ValueError('match_coords found multiple matches')
     elif mode == 'maskwarn':
-        s1,s2 = np.sum(matches,axis=1),np.sum(matches,axis=0) 
         from warnings import warn
         
         for i in np.where(s1>1)[0]:
@@ -609,29 +728,42 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             warn('2nd index %i has %i matches!'%(j,s2[j]))
         return s1>0,s2>0
     elif mode == 'count':
-        return np.sum(np.any(matches,axis=1)),np.sum(np.any(matches,axis=0)) 
-    elif mode == 'index':
-        return np.where(matches)
+        return np.sum(s1>0),np.sum(s2>0)
+    
+    ind1 = np.concatenate(inds1) if inds1 else np.array([],dtype=int)
+    ind2 = np.concatenate(inds2) if inds2 else np.array([],dtype=int)
+    if mode == 'index':
+        #sort in the same order as numpy.where on the full match matrix
+        sorti = np.lexsort((ind2,ind1))
+        return ind1[sorti],ind2[sorti]
     elif mode == 'match2D':
-        return matches.T
-    elif mode == 'nearest':
-        assert False,"'nearest' should always return above this - code should be unreachable!"
+        matches = np.zeros((n2,n1),dtype=bool)
+        matches[ind2,ind1] = True
+        return matches
+    elif mode == 'sparse2D':
+        from scipy.sparse import csr_matrix
+        
+        return csr_matrix((np.ones(ind1.size,dtype=bool),(ind2,ind1)),shape=(n2,n1))
     else:
-        raise ValueError('unrecognized mode')
+        assert False,"all modes should return above this - code should be unreachable!"
     
 def match_nearest_coords(c1,c2=None,n=None):
     """
     Match a set of coordinates to their nearest neighbor(s) in another set of
     coordinates.
     
+    Distances are cartesian (e.g. the small-angle approximation for
+    coordinates on the sky) - see :class:`SphericalIndex` for great-circle
+    distances and queries that can be repeated without rebuilding the index.
+    
     :param c1: 
-        A D x N array with coordinate values (either as floats or
-        :class:`AngularPosition` objects) or a sequence of
-        :class:`LatLongCoordinates` objects for the first set of coordinates.
+        A D x N array with coordinate values, a sequence of
+        :class:`LatLongCoordinates` objects, or a
+        :class:`LatLongCoordinatesArray` for the first set of coordinates.
     :param c2: 
-        A D x N array with coordinate values (either as floats or
-        :class:`AngularPosition` objects) or a sequence of
-        :class:`LatLongCoordinates` objects for the second set of coordinates.
+        A D x M array with coordinate values, a sequence of
+        :class:`LatLongCoordinates` objects, or a
+        :class:`LatLongCoordinatesArray` for the second set of coordinates.
         Alternatively, if this is None, `c2` will be set to `c1`, finding the 
         nearest neighbor of a point in `c1` to another point in `c1`.
     :param int n: 
@@ -647,34 +779,17 @@ def match_nearest_coords(c1,c2=None,n=None):
         indecies into `c2` to find the nearest to the corresponding `c1`
         coordinate, and `seps` are the distances.
     """
-    try:
-        from scipy.spatial import cKDTree as KDTree
-    except ImportError:
-        from warnings import warn
-        warn('C-based scipy kd-tree not available - match_nearest_coords will be much slower!')
-        from scipy.spatial import KDTree
+    KDTree = _kdtree_class()
         
     if c2 is None:
         c2 = c1
     if n is None:    
         n = 2 if c1 is c2 else 1
         
-    c1 = np.array(c1,ndmin=1,copy=False)
-    c2 = np.array(c2,ndmin=1,copy=False)
-    
-    if len(c1.shape)==1:
-        a1 = np.empty(c1.size)
-        b1 = np.empty(c1.size)
-        a2 = np.empty(c1.size)
-        b2 = np.empty(c1.size)
-        for i in range(len(c1)):
-            a1[i] = c1[i].long.d
-            b1[i] = c1[i].lat.d
-            a2[i] = c2[i].long.d
-            b2[i] = c2[i].lat.d
-        c1 = np.array((a1,b1))
-        c2 = np.array((a2,b2))
-    elif len(c1.shape)!=2:
+    c1 = _coords_to_array(c1)
+    c2 = _coords_to_array(c2)
+    
+    if len(c1.shape)!=2 or len(c2.shape)!=2:
         raise ValueError('match_nearest_coords inputs have incorrect number of dimensions')
     
     if c1.shape[0] != c2.shape[0]:
@@ -686,9 +801,176 @@ def match_nearest_coords(c1,c2=None,n=None):
     else:
         dist,inds = kdt.query(c1.T,n)
         return dist[:,n-1],inds[:,n-1]
+    
+def _coords_to_array(coords):
+    """
+    Converts a set of coordinates to a D x N array. `coords` can be a
+    :class:`LatLongCoordinatesArray`, a :class:`LatLongCoordinates` object, or
+    a sequence of :class:`LatLongCoordinates` objects (all of which give a 2 x
+    N array of longitude and latitude in degrees), or a D x N array-like.
+    """
+    from .coordsys import LatLongCoordinates,LatLongCoordinatesArray
+    
+    if isinstance(coords,LatLongCoordinatesArray):
+        return np.array((coords.long,coords.lat))
+    if isinstance(coords,LatLongCoordinates):
+        coords = [coords]
         
+    arr = np.array(coords,ndmin=1,copy=False)
+    if len(arr.shape)==1:
+        longs = np.fromiter((c.long.d for c in arr),dtype=float,count=arr.size)
+        lats = np.fromiter((c.lat.d for c in arr),dtype=float,count=arr.size)
+        arr = np.array((longs,lats))
+    return arr
+
+class SphericalIndex(object):
+    """
+    An index of positions on the sphere that can be built once for a reference
+    catalog and then used to quickly find neighbors of other sets of positions.
+    
+    Positions are stored as cartesian unit vectors in a kd-tree (from
+    :mod:`scipy.spatial`), so all separations are exact great-circle distances
+    and work across the poles and the 0/360 degree longitude boundary.
+    All angles (inputs and outputs) are in degrees.
+    
+    **Examples**
+    
+    >>> from numpy import array
+    >>> idx = SphericalIndex(array([10,10.5,200]),array([20,20,-45]))
+    >>> seps,inds = idx.query_knn(array([10.1]),array([20.]))
+    >>> inds
+    array([0])
+    >>> idx.count_pairs(array([10.1]),array([20.]),1)
+    2
+    
+    """
+    def __init__(self,coords,lat=None,leafsize=16):
+        """
+        :param coords: 
+            The reference positions. If `lat` is given, this is an array of
+            longitudes. Otherwise it can be a :class:`LatLongCoordinatesArray`,
+            a sequence of :class:`LatLongCoordinates` objects, or a 2 x N array
+            of (longitude,latitude).
+        :param lat: An array of latitudes or None (see `coords`).
+        :param int leafsize: The leaf size of the kd-tree.
+        """
+        long,lat = self._lonlat(coords,lat)
+        self.long = long
+        self.lat = lat
+        self._kdtree = _kdtree_class()(_lonlat_to_unit_vectors(long,lat),leafsize)
         
+    @staticmethod
+    def _lonlat(coords,lat):
+        if lat is None:
+            arr = _coords_to_array(coords)
+            if len(arr.shape)!=2 or arr.shape[0]!=2:
+                raise ValueError('coordinates must be a 2 x N array or a set of coordinate objects')
+            long,lat = arr
+        else:
+            long = coords
+        long = np.array(long,dtype=float,ndmin=1).ravel()
+        lat = np.array(lat,dtype=float,ndmin=1).ravel()
+        if long.shape != lat.shape:
+            raise ValueError("longitude and latitude arrays don't match")
+        return long,lat
+    
+    def _vectors(self,coords,lat):
+        return _lonlat_to_unit_vectors(*self._lonlat(coords,lat))
+        
+    def __len__(self):
+        return self.long.size
+    
+    def query_knn(self,coords,lat=None,k=1,maxsep=None):
+        """
+        Finds the `k` nearest neighbors in this index for each of a set of
+        positions.
+        
+        :param coords: The positions to query (see :class:`SphericalIndex`).
+        :param lat: An array of latitudes or None (see `coords`).
+        :param int k: The number of neighbors to find.
+        :param maxsep: 
+            If not None, only neighbors within this separation are returned.
+        
+        :returns: 
+            (seps,inds) where `seps` are the separations and `inds` are indecies
+            into this index. If `k` is 1, these are 1D arrays with one element
+            per query position, otherwise they have shape (N,k) and are sorted
+            from nearest to farthest. Missing neighbors (if there are fewer
+            than `k` or they are beyond `maxsep`) have a separation of inf and
+            an index of len(self).
+        """
+        x = self._vectors(coords,lat)
+        if maxsep is None:
+            chords,inds = self._kdtree.query(x,k)
+        else:
+            chords,inds = self._kdtree.query(x,k,distance_upper_bound=_angle_to_chord(maxsep))
+        
+        seps = _chord_to_angle(chords)
+        seps[np.isinf(chords)] = np.inf
+        return seps,inds
+    
+    def query_radius(self,coords,lat=None,radius=1,chunksize=100000):
+        """
+        Finds all of the positions in this index within a given radius of each
+        of a set of positions.
+        
+        :param coords: The positions to query (see :class:`SphericalIndex`).
+        :param lat: An array of latitudes or None (see `coords`).
+        :param float radius: The maximum separation of a match.
+        :param int chunksize: 
+            The maximum number of query positions to match at a time.
+        
+        :returns: 
+            (qinds,inds,seps) where `qinds` are indecies into the query
+            positions, `inds` are indecies into this index, and `seps` are the
+            separations of the matched pairs. Pairs are sorted by query index
+            and then index.
+        """
+        x = self._vectors(coords,lat)
+        
+        KDTree = _kdtree_class()
+        chunksize = max(int(chunksize),1)
+        r = _angle_to_chord(radius)
+        qinds = []
+        inds = []
+        for start in range(0,len(x),chunksize):
+            ind,qind = _kdtree_pairs(self._kdtree,KDTree(x[start:start+chunksize]),r)
+            qinds.append(qind+start)
+            inds.append(ind)
+        if qinds:
+            qinds = np.concatenate(qinds)
+            inds = np.concatenate(inds)
+        else:
+            qinds = inds = np.array([],dtype=int)
+        
+        sorti = np.lexsort((inds,qinds))
+        qinds,inds = qinds[sorti],inds[sorti]
+        
+        v1 = self._kdtree.data[inds]
+        v2 = x[qinds]
+        seps = _chord_to_angle(np.sqrt(np.sum((v1-v2)**2,axis=1)))
+        return qinds,inds,seps
+    
+    def count_pairs(self,coords,lat=None,radius=1):
+        """
+        Counts the number of pairs of a set of positions and the positions in
+        this index that are within a given separation (e.g. for computing
+        correlation functions).
+        
+        :param coords: The positions to query (see :class:`SphericalIndex`).
+        :param lat: An array of latitudes or None (see `coords`).
+        :param radius: 
+            The maximum separation of a pair, or an array of separations.
+        
+        :returns: 
+            The number of pairs within `radius`. If `radius` is an array, the
+            output is an array of cumulative counts with the same shape.
+        """
+        x = self._vectors(coords,lat)
+        otherkdt = _kdtree_class()(x)
+        return otherkdt.count_neighbors(self._kdtree,_angle_to_chord(radius))
     
+        
 def separation_matrix(v,w=None,tri=False):
     """
     Computes a matrix of the separation between each of the components of the
@@ -714,6 +996,10 @@ def separation_matrix(v,w=None,tri=False):
         and flexible at computing distances if individual components and sign
         information is unnecessary.
         
+        :func:`separation_matrix_chunks`, :func:`separation_histogram`, and
+        :func:`separation_min` for computing the separations of large
+        sets of points without storing the whole matrix.
+        
     """
     if w is None:
         w = v
@@ -730,6 +1016,167 @@ def separation_matrix(v,w=None,tri=False):
     else:
         return A
     
+def separation_matrix_chunks(v,w=None,chunksize=None,distances=False,
+                             greatcircle=False):
+    """
+    Generates the separation matrix of :func:`separation_matrix` in blocks of
+    rows, so that the separations of large sets of points can be processed
+    with a fixed memory ceiling.
+    
+    :param v: The first array with first dimension n
+    :param w: 
+        The second array with first dimension m, and all following dimensions
+        matched to `v`. If None, `v` will be treated as `w`.
+    :param chunksize: 
+        The number of rows in each block. If None, it will be chosen so that
+        each block has about 4 million elements.
+    :param bool distances: 
+        If True, the blocks contain the (euclidean) distance between points
+        instead of the separation in each component.
+    :param bool greatcircle: 
+        If True, `v` and `w` must be n x 2 and m x 2 arrays of (longitude,
+        latitude) in degrees, and the blocks contain the great-circle
+        separation in degrees (implies `distances`).
+        
+    :returns: 
+        An iterator over 2-tuples (i,block) where `block` is the part of the
+        separation matrix with rows i to i+len(block).
+    """
+    for i,block in _separation_chunks(v,w,chunksize,distances,greatcircle):
+        if greatcircle:
+            block = _chord_to_angle(block)
+        yield i,block
+        
+def _separation_chunks(v,w,chunksize,distances,greatcircle):
+    """
+    Implements :func:`separation_matrix_chunks`, except that great-circle
+    separations are given as chord distances on the unit sphere (which are
+    monotonic in angle, so they can be compared or binned without inverse 
+    trig functions).
+    """
+    v = np.array(v,copy=False)
+    w = v if w is None else np.array(w,copy=False)
+    
+    if greatcircle:
+        if v.ndim!=2 or v.shape[1]!=2 or w.ndim!=2 or w.shape[1]!=2:
+            raise ValueError('great-circle separations require n x 2 arrays of (longitude,latitude)')
+        v = _lonlat_to_unit_vectors(v[:,0],v[:,1])
+        w = _lonlat_to_unit_vectors(w[:,0],w[:,1])
+        distances = True
+    
+    if chunksize is None:
+        chunksize = 2**22//max(w.size,1)
+    chunksize = max(int(chunksize),1)
+    
+    if distances and w.ndim > 1:
+        #sum over one component at a time to avoid the n x m x d array
+        v = v.reshape((len(v),-1))
+        w = w.reshape((len(w),-1))
+        
+    for i in range(0,len(v),chunksize):
+        if distances and w.ndim > 1:
+            vi = v[i:i+chunksize]
+            block = np.zeros((len(vi),len(w)))
+            for d in range(w.shape[1]):
+                diff = vi[:,d,np.newaxis] - w[:,d]
+                diff *= diff
+                block += diff
+            np.sqrt(block,block)
+        elif distances:
+            block = np.abs(separation_matrix(v[i:i+chunksize],w))
+        else:
+            block = separation_matrix(v[i:i+chunksize],w)
+        yield i,block
+        
+def separation_histogram(v,w=None,bins=10,range=None,greatcircle=False,
+                         chunksize=None):
+    """
+    Computes a histogram of the distances between all pairs of points without
+    storing the full separation matrix (e.g. for correlation functions).
+    
+    :param v: The first array with first dimension n
+    :param w: 
+        The second array with first dimension m, and all following dimensions
+        matched to `v`. If None, the distances between all distinct pairs of
+        points in `v` are used (each pair is counted once).
+    :param bins: The number of bins or a sequence of bin edges.
+    :param range: 
+        A 2-tuple (lower,upper) giving the range of the bins if `bins` is a
+        number. If None, the range is from 0 to the largest possible separation
+        (180 degrees for great-circle distances, or the diagonal of the
+        bounding box of the points otherwise).
+    :param bool greatcircle: 
+        If True, distances are great-circle separations in degrees (see
+        :func:`separation_matrix_chunks`).
+    :param chunksize: See :func:`separation_matrix_chunks`.
+    
+    :returns: 
+        (counts,edges) as for :func:`numpy.histogram`.
+    """
+    auto = w is None
+    v = np.array(v,copy=False)
+    w = v if w is None else np.array(w,copy=False)
+    
+    if np.isscalar(bins):
+        if range is None:
+            if greatcircle:
+                range = (0,180)
+            else:
+                vw = np.concatenate((v.reshape((len(v),-1)),w.reshape((len(w),-1))))
+                range = (0,np.sqrt(np.sum((vw.max(axis=0)-vw.min(axis=0))**2)))
+        edges = np.linspace(range[0],range[1],int(bins)+1)
+    else:
+        edges = np.array(bins,dtype=float)
+        
+    #bin great-circle separations as chord distances
+    chordedges = _angle_to_chord(edges) if greatcircle else edges
+    
+    counts = np.zeros(len(edges)-1,dtype=int)
+    for i,block in _separation_chunks(v,None if auto else w,chunksize,True,
+                                      greatcircle):
+        if auto:
+            rows = np.arange(i,i+len(block))[:,np.newaxis]
+            block = block[np.arange(len(w))>rows]
+        counts += np.histogram(block,chordedges)[0]
+    return counts,edges
+
+def separation_min(v,w=None,greatcircle=False,chunksize=None):
+    """
+    Computes the minimum distance from each point in one set to the points in
+    another (or the same) set without storing the full separation matrix.
+    
+    :param v: The first array with first dimension n
+    :param w: 
+        The second array with first dimension m, and all following dimensions
+        matched to `v`. If None, the nearest *other* point in `v` is used.
+    :param bool greatcircle: 
+        If True, distances are great-circle separations in degrees (see
+        :func:`separation_matrix_chunks`).
+    :param chunksize: See :func:`separation_matrix_chunks`.
+    
+    :returns: 
+        (mins,argmins) where `mins` is an array of length n with the smallest
+        distance for each point in `v`, and `argmins` are the indecies of the
+        corresponding points in `w`.
+    """
+    auto = w is None
+    v = np.array(v,copy=False)
+    
+    mins = np.empty(len(v))
+    argmins = np.empty(len(v),dtype=int)
+    for i,block in _separation_chunks(v,w,chunksize,True,greatcircle):
+        rows = np.arange(len(block))
+        if auto:
+            block = np.array(block,dtype=float)
+            block[rows,rows+i] = np.inf
+        argmin = np.argmin(block,axis=1)
+        argmins[i:i+len(block)] = argmin
+        mins[i:i+len(block)] = block[rows,argmin]
+        
+    if greatcircle:
+        mins = _chord_to_angle(mins)
+    return mins,argmins
+    
 
 #<--------------------Cosmological distances and conversions------------------->
 def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}):
@@ -739,6 +1186,10 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     :class:`astropyscs.constants.Cosmology` -- if any of those do not exist in
     the current cosmology this will fail.
     
+    The distance integrals are computed once for each cosmology on a dense grid
+    in redshift and interpolated (to better than the requested `inttol`), so
+    large arrays of redshifts are fast.
+    
     The distance type can be one of the following:
     
     * 'comoving'(0) : comoving distance (in Mpc)
@@ -764,7 +1215,9 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
         If True, normalize output by result for `z` == None.  If a scalar, 
         normalize by the distance at that redshift. If False, no normalization.
     :type normed: boolean
-    :param intkwargs: keywords for integrals (see :mod:`scipy.integrate`)
+    :param intkwargs: 
+        keywords for integrals (see :mod:`scipy.integrate`) - these are only
+        used for redshifts beyond the tabulated range (z>10^4).
     :type intkwargs: a dictionary   
     
     
@@ -804,20 +1257,12 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     '0.956971'
         
     """
-    from operator import isSequenceType
-    from scipy.integrate import quad as integrate
-    from numpy import array,vectorize,abs,isscalar
+    from numpy import array,abs,isscalar
     
-    from ..constants import H0,omegaM,omegaL,omegaR,c
+    from ..constants import H0,omegaM,omegaL,omegaR,c,cosmology_cached
     
     c=c/1e5 #convert to km/s
-    if type(disttype) == str:
-        disttypemap={'comoving':0,'luminosity':1,'angular':2,'lookback':3,'distmod':4}
-        try:
-            disttype=disttypemap[disttype]
-        except KeyError,e:
-            e.message='invalid disttype string'
-            raise
+    disttype = _cosmo_disttype(disttype)
     
     flipsign = disttype < 0
     disttype = abs(disttype)
@@ -825,85 +1270,30 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     if z is None:
         if normed:
             return 1.0
-        if disttype == 2:
-            #find maximum value for angular diam dist
-            from scipy.optimize import fminbound
-            res = upper = 5
-            while abs(res-upper) < inttol:
-                #-2 flips sign so that we get a minimum instead of a maximum
-                res = fminbound(cosmo_z_to_dist,0,upper,(None,-2,inttol,normed,intkwargs),inttol,full_output=1)
-                res = -res[1] #this is the actual value -- res[0] is the redshift at which it occurs
-            return res
-        else:
-            #iterate towards large numbers until convergence achieved
-            iterz = 1e6
-            currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
-            lastval = currval + 2*inttol
-            while(abs(lastval-currval)>inttol):
-                lastval = currval
-                iterz *= 10
-                currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
-            return currval
+        key = ('cosmo_z_to_dist',H0,omegaR,omegaM,omegaL,disttype,inttol,
+               tuple(sorted(intkwargs.items())))
+        return cosmology_cached(key,_cosmo_max_dist,disttype,inttol,intkwargs)[1]
         
-    z = array(z,copy=False)
+    scalarin = isscalar(z)
+    z = array(z,copy=False,dtype=float)
     a0 = 1/(z+1)
     omegaK = 1 - omegaM - omegaL - omegaR
     
-    if disttype != 3:
-        #comoving distance out to scale factor a0: integral(da'/(a'^2 H(a')),a0,1)
-        #H^2 a^4=omegaR +omegaM a^1 + omegaE a^4 + omegaK a^2
-        def integrand(a,H0,R,M,L,K): #1/(a^2 H)
-            return (R + M*a + L*a**4 + K*a**2)**-0.5/H0
-    else:
-        #lookback time
-        def integrand(a,H0,R,M,L,K): #1/(a^2 H)
-            return a*(R + M*a + L*a**4 + K*a**2)**-0.5/H0
-        
-    if isSequenceType(a0):
-        integratevec = vectorize(lambda x:integrate(integrand,x,1,args=(H0,omegaR,
-                                             omegaM,omegaL,omegaK),**intkwargs))
-        res=integratevec(a0)
-        intres,interr = res[0],res[1]        
-        try:
-            if np.any(interr/intres > inttol):
-                raise Exception('Integral fractional error for one of the integrals is beyond tolerance')
-        except ZeroDivisionError:
-            pass
-        
-    else:
-        res=integrate(integrand,a0,1,args=(H0,omegaR,omegaM,omegaL,omegaK),**intkwargs)
-        intres,interr=res[0],res[1]
-        
-        try:
-            if interr/intres > inttol:
-                raise Exception('Integral fractional error is '+str(interr/intres)+', beyond tolerance'+str(inttol))
-        except ZeroDivisionError:
-            pass
+    table = _get_cosmo_dist_table(inttol)
+    intres = table(z,disttype==3)
     
-    if disttype == 3: #lookback integrand
-        d = c*intres*3.26163626e-3
-        #d = c*intres*3.08568025e19/24/3600/365.25e9
-    else: 
-        dc = c*intres #comoving distance 
-        
-        if disttype == 0:
-            d = dc
-        elif disttype == 1:
-            d = dc/a0
-        elif disttype == 2:
-            if omegaK == 0:
-                d = dc*a0
-            else:
-                angfactor = H0*complex(-omegaK)**0.5
-                d = c*(np.sin(angfactor*intres)/angfactor).real*a0
-        elif disttype == 4:
-            from ..phot import distance_modulus
-            d = distance_modulus(c*intres/a0*1e6,autocosmo=False)
-        else:
-            raise KeyError('unknown disttype')
+    #anything outside the range of the table is integrated directly
+    outside = np.isnan(intres)
+    if np.any(outside):
+        intres[outside] = _cosmo_integral(z[outside],disttype==3,inttol,intkwargs)
+    
+    d = _cosmo_int_to_dist(intres,a0,disttype,H0,omegaK,c)
+    if scalarin:
+        d = d.ravel()[0]
         
     if normed:
-        nrm = 1/cosmo_z_to_dist(None if normed is True else normed,None,disttype,inttol,intkwargs)
+        nrm = 1/cosmo_z_to_dist(None if normed is True else normed,None,
+                                disttype,inttol,intkwargs=intkwargs)
     else:
         nrm = 1
         
@@ -915,45 +1305,313 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     else:
         if not isscalar(zerr):
             zerr = array(zerr,copy=False) 
-        upper=cosmo_z_to_dist(z+zerr,None,disttype,inttol,intkwargs)
-        lower=cosmo_z_to_dist(z-zerr,None,disttype,inttol,intkwargs)
+        upper=cosmo_z_to_dist(z+zerr,None,disttype,inttol,intkwargs=intkwargs)
+        lower=cosmo_z_to_dist(z-zerr,None,disttype,inttol,intkwargs=intkwargs)
         return nrm*d,nrm*(upper-d),nrm*(d-lower)
     
 def cosmo_dist_to_z(d,derr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}):
     """
     Convert a distance to a redshift. See :func:`cosmo_z_to_dist` for meaning of
     parameters. Note that if `d` is None, the maximum distance will be returned.
+    
+    The inversion uses the same tabulated integrals as :func:`cosmo_z_to_dist`,
+    so arrays of distances are converted at once. For angular diameter
+    distances, the redshift returned is the lower of the two possible values
+    (i.e. below the redshift of the maximum angular diameter distance).
+    
+    :except ValueError: If a distance is impossible in the current cosmology.
     """
-    from scipy.optimize import brenth
-    maxz=10000.0
+    from numpy import array,isscalar
+    
+    from ..constants import H0,omegaM,omegaL,omegaR,c,cosmology_cached
     
     if derr is not None:
         raise NotImplementedError
     
+    disttype = _cosmo_disttype(disttype)
+    
     if d is None:
         if disttype==2:
-            #find maximum value for angular diam dist
-            from scipy.optimize import fminbound
-            res = upper = 5
-            while abs(res-upper) < inttol:
-                #-2 flips sign so that we get a minimum instead of a maximum
-                res = fminbound(cosmo_z_to_dist,0,upper,(None,-2,inttol,normed,intkwargs),inttol,full_output=1)
-                res = res[0] #this is the redshift, -res[1] is the distance value
-            return res
+            #redshift of the maximum angular diameter distance
+            key = ('cosmo_z_to_dist',H0,omegaR,omegaM,omegaL,disttype,inttol,
+                   tuple(sorted(intkwargs.items())))
+            return cosmology_cached(key,_cosmo_max_dist,disttype,inttol,intkwargs)[0]
         else:
             d = cosmo_z_to_dist(None,None,disttype,inttol,normed,intkwargs)
+            
+    scalarin = isscalar(d)
+    d = array(d,copy=False,dtype=float)
+    if normed:
+        d = d*cosmo_z_to_dist(None if normed is True else normed,None,disttype,
+                              inttol,intkwargs=intkwargs)
     
-    f=lambda z,dmin:dmin-cosmo_z_to_dist(z,None,disttype,inttol,normed,intkwargs)
+    if disttype == 4:
+        #invert the luminosity distance instead of the distance modulus
+        d = 10**(d/5-5)
+        disttype = 1
+    
+    c = c/1e5 #convert to km/s
+    omegaK = 1 - omegaM - omegaL - omegaR
+    table = _get_cosmo_dist_table(inttol)
+    
+    def dfunc(u):
+        intres = table.integral(u,disttype==3)
+        return _cosmo_int_to_dist(intres,np.exp(-u),disttype,H0,omegaK,c)
+    
+    #tabulated values are monotonic up to the maximum of the table (or the 
+    #peak of the angular diameter distance)
+    with np.errstate(divide='ignore'):
+        dnodes = dfunc(table.u)
+    if disttype == 2:
+        imax = np.argmax(dnodes)+1
+    else:
+        imax = len(dnodes)
+    dnodes = dnodes[:imax]
+    
+    if np.any(d < dnodes[0]) or np.any(d > dnodes[-1]):
+        if disttype == 2 or np.any(d < dnodes[0]):
+            raise ValueError('input distance impossible')
+        #beyond the table - fall back on root-finding for those
+        beyond = d > dnodes[-1]
+        dtab = np.where(beyond,dnodes[-1],d)
+    else:
+        beyond = None
+        dtab = d
+        
+    #secant method on the interpolated function starting from the bracketing
+    #table nodes, until within tolerance in z
+    i = np.clip(np.searchsorted(dnodes,dtab),1,imax-1)
+    u0,u1 = table.u[i-1],table.u[i]
+    f0,f1 = dnodes[i-1]-dtab,dnodes[i]-dtab
+    for iter in range(100):
+        df = f1-f0
+        df = np.where(df==0,1,df) #converged - f1 should be 0 too
+        u0,u1 = u1,u1-f1*(u1-u0)/df
+        f0,f1 = f1,dfunc(u1)-dtab
+        if np.all(np.abs(u1-u0)*np.exp(u1) <= inttol*1e-2):
+            break
+    z = np.expm1(u1)
+    
+    if beyond is not None:
+        z = np.array(z,copy=False,ndmin=1)
+        db = np.array(d,copy=False,ndmin=1)[beyond.ravel()]
+        z[beyond.ravel()] = [_cosmo_dist_to_z_root(di,disttype,inttol,intkwargs) for di in db]
+        z = z.reshape(d.shape)
+    
+    if scalarin:
+        return float(z)
+    else:
+        return z
+    
+def _cosmo_max_dist(disttype,inttol,intkwargs):
+    """
+    Computes the maximum value of a distance from :func:`cosmo_z_to_dist` for
+    the current cosmology.
+    
+    :returns: (z,d) where `z` is the redshift of the maximum (or None if it is
+        at infinite redshift) and `d` is the distance. 
+    """
+    if disttype == 2:
+        #find maximum value for angular diam dist
+        from scipy.optimize import fminbound
+        res = upper = 5
+        while abs(res-upper) < inttol:
+            #-2 flips sign so that we get a minimum instead of a maximum
+            res = fminbound(cosmo_z_to_dist,0,upper,(None,-2,inttol,False,intkwargs),inttol,full_output=1)
+            zmax,res = res[0],-res[1] #res[0] is the redshift at which it occurs
+        return zmax,res
+    else:
+        #iterate towards large numbers until convergence achieved
+        iterz = 1e6
+        currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
+        lastval = currval + 2*inttol
+        while(abs(lastval-currval)>inttol):
+            lastval = currval
+            iterz *= 10
+            currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
+        return None,currval
+    
+def _cosmo_dist_to_z_root(d,disttype,inttol,intkwargs):
+    """
+    Inverts :func:`cosmo_z_to_dist` by root-finding for a single distance.
+    """
+    from scipy.optimize import brenth
+    maxz=10000.0
+    
+    f=lambda z,dmin:dmin-cosmo_z_to_dist(z,None,disttype,inttol,False,intkwargs)
     try:
         while f(maxz,d) > 0:
             maxz=maxz**2
     except OverflowError:
         raise ValueError('input distance %g impossible'%float(d))
         
-    zval = brenth(f,0,maxz,(d,),xtol=inttol)
+    return brenth(f,0,maxz,(d,),xtol=inttol)
     
-    return zval
+def _cosmo_disttype(disttype):
+    """
+    Converts a distance type name to the integer code used by
+    :func:`cosmo_z_to_dist`.
+    """
+    if isinstance(disttype,basestring):
+        disttypemap={'comoving':0,'luminosity':1,'angular':2,'lookback':3,'distmod':4}
+        try:
+            disttype=disttypemap[disttype]
+        except KeyError,e:
+            e.message='invalid disttype string'
+            raise
+    return disttype
+    
+def _cosmo_integrand(a,lookback,R,M,L,K):
+    """
+    The integrand (without the 1/H0 factor) for the comoving distance or
+    lookback time, as a function of scale factor `a` (1/(a^2 H) or 1/(a H)).
+    """
+    #H^2 a^4 = omegaR + omegaM a^1 + omegaE a^4 + omegaK a^2
+    res = (R + M*a + L*a**4 + K*a**2)**-0.5
+    if lookback:
+        res = a*res
+    return res
+    
+def _cosmo_integral(z,lookback,inttol,intkwargs):
+    """
+    Directly integrates (with :func:`scipy.integrate.quad`) the comoving
+    distance or lookback time integral (in units of 1/H0) for each of the
+    redshifts `z`.
+    """
+    from scipy.integrate import quad as integrate
+    from ..constants import H0,omegaM,omegaL,omegaR
+    
+    omegaK = 1 - omegaM - omegaL - omegaR
+    args = (lookback,omegaR,omegaM,omegaL,omegaK)
+    
+    z = np.array(z,copy=False,dtype=float)
+    res = np.empty(z.shape)
+    for i,zi in enumerate(z.flat):
+        intres,interr = integrate(_cosmo_integrand,1/(1+zi),1,args=args,**intkwargs)
+        if intres!=0 and interr/intres > inttol:
+            raise Exception('Integral fractional error is '+str(interr/intres)+', beyond tolerance'+str(inttol))
+        res.flat[i] = intres/H0
+    return res
+    
+def _cosmo_int_to_dist(intres,a0,disttype,H0,omegaK,c):
+    """
+    Converts the comoving distance or lookback integral (in units of 1/H0) to
+    the distance type requested for :func:`cosmo_z_to_dist`.
+    """
+    if disttype == 3: #lookback integrand
+        d = c*intres*3.26163626e-3
+        #d = c*intres*3.08568025e19/24/3600/365.25e9
+    else: 
+        dc = c*intres #comoving distance 
+        
+        if disttype == 0:
+            d = dc
+        elif disttype == 1:
+            d = dc/a0
+        elif disttype == 2:
+            if omegaK == 0:
+                d = dc*a0
+            else:
+                angfactor = H0*complex(-omegaK)**0.5
+                d = c*(np.sin(angfactor*intres)/angfactor).real*a0
+        elif disttype == 4:
+            from ..phot import distance_modulus
+            d = distance_modulus(c*intres/a0*1e6,autocosmo=False)
+        else:
+            raise KeyError('unknown disttype')
+    return d
+    
+class _CosmoDistanceTable(object):
+    """
+    Tabulates the comoving distance and lookback time integrals for a
+    particular cosmology on a grid uniform in u = ln(1+z). The integrals are
+    computed by Gauss-Legendre quadrature on each grid interval and
+    interpolated with cubic Hermite polynomials using the (exact) integrand as
+    the derivative. The grid is refined until the interpolated values at the
+    interval midpoints are within the requested fractional tolerance.
+    """
+    zmax = 1e4
+    
+    def __init__(self,H0,omegaR,omegaM,omegaL,tol):
+        self.H0 = H0
+        self.params = (omegaR,omegaM,omegaL,1-omegaR-omegaM-omegaL)
+        self.tol = tol
+        
+        umax = np.log1p(self.zmax)
+        n = 256
+        while True:
+            u = np.linspace(0,umax,n+1)
+            ints,derivs = self._integrate(u)
+            #check the interpolation at the midpoints against direct integrals
+            mids = (u[:-1]+u[1:])/2
+            exact = [ints[j][:-1] + self._integrate_intervals(u[:-1],mids,j==1) for j in (0,1)]
+            self.u,self.h,self.ints,self.derivs = u,u[1]-u[0],ints,derivs
+            interp = [self.integral(mids,j==1) for j in (0,1)]
+            err = max([np.max(np.abs(interp[j]/exact[j]-1)) for j in (0,1)])
+            if err < tol or n >= 2**20:
+                break
+            n *= 2
+            
+    def _integrand(self,u,lookback):
+        #change of variables from a to u=-ln(a) adds a factor of a
+        a = np.exp(-u)
+        return a*_cosmo_integrand(a,lookback,*self.params)/self.H0
+            
+    def _integrate_intervals(self,lower,upper,lookback,order=8):
+        x,w = np.polynomial.legendre.leggauss(order)
+        half = (upper-lower)/2
+        centers = (upper+lower)/2
+        vals = self._integrand(centers[:,np.newaxis]+half[:,np.newaxis]*x,lookback)
+        return half*np.dot(vals,w)
+    
+    def _integrate(self,u):
+        ints = []
+        derivs = []
+        for lookback in (False,True):
+            cum = np.concatenate(([0],np.cumsum(self._integrate_intervals(u[:-1],u[1:],lookback))))
+            ints.append(cum)
+            derivs.append(self._integrand(u,lookback))
+        return ints,derivs
+    
+    def integral(self,u,lookback):
+        """
+        Interpolates the integral at u=ln(1+z) - NaN if outside the table.
+        """
+        u = np.array(u,copy=False,dtype=float)
+        y = self.ints[int(lookback)]
+        m = self.derivs[int(lookback)]
+        
+        i = np.clip(((u-self.u[0])/self.h).astype(int),0,len(self.u)-2)
+        t = (u-self.u[i])/self.h
+        t2 = t*t
+        t3 = t2*t
+        res = (2*t3-3*t2+1)*y[i] + (t3-2*t2+t)*self.h*m[i] + \
+              (3*t2-2*t3)*y[i+1] + (t3-t2)*self.h*m[i+1]
+              
+        outside = (u<self.u[0])|(u>self.u[-1])
+        if np.any(outside):
+            res = np.array(res,copy=False)
+            res[outside] = np.nan
+        return res
+    
+    def __call__(self,z,lookback):
+        """
+        Interpolates the integral at redshift `z` - NaN if outside the table.
+        """
+        with np.errstate(invalid='ignore'):
+            return self.integral(np.log1p(z),lookback)
+
+def _get_cosmo_dist_table(inttol):
+    """
+    Returns the :class:`_CosmoDistanceTable` for the current cosmology, 
+    computing it if it has not been computed since the cosmology changed.
+    """
+    from ..constants import H0,omegaM,omegaL,omegaR,cosmology_cached
     
+    #tables are always at least this precise, so one usually suffices
+    tol = min(inttol,1e-9)
+    key = ('_get_cosmo_dist_table',H0,omegaR,omegaM,omegaL,tol)
+    return cosmology_cached(key,_CosmoDistanceTable,H0,omegaR,omegaM,omegaL,tol)
     
 def cosmo_z_to_H(z,zerr=None):
     """
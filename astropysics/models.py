@@ -636,7 +636,6 @@ class NFWModel(FunctionModel1DAuto):
         :type z: scalar
         
         """
-        from .constants import get_cosmology
 #        if Rvir is None and Mvir is None:
 #            raise ValueError('need to specify Rvir or Mvir')
 #        elif Rvir is None:
@@ -648,11 +647,11 @@ class NFWModel(FunctionModel1DAuto):
             if Mvir is None:
                 Mvir = self.getMv()
                 
-            rhov = get_cosmology().rhoC(z,'cosmological')*1e-18*self.deltavir(z)
+            rhov = self._rhoC(z)*1e-18*self.deltavir(z)
             Rvir = 1e-3*(3*Mvir/(4*pi*rhov))**(1/3)
             
         elif Mvir is None:
-            rhov = get_cosmology().rhoC(z,'cosmological')*1e-18*self.deltavir(z)
+            rhov = self._rhoC(z)*1e-18*self.deltavir(z)
             Mvir = (4*pi*(Rvir*1e3)**3/3)*rhov
         else: #both are specified, implying a particular deltavir
             self._c = c
@@ -708,9 +707,19 @@ class NFWModel(FunctionModel1DAuto):
         :returns: virial overdensity        
         
         """
-        from .constants import get_cosmology
+        from .constants import get_cosmology,cosmology_cached
         
-        return get_cosmology().deltavir(z)
+        return cosmology_cached(('NFWModel.deltavir',z),get_cosmology().deltavir,z)
+    
+    @staticmethod
+    def _rhoC(z):
+        """
+        The critical density of the current cosmology in Msun Mpc^-3 (cached
+        until the cosmology changes).
+        """
+        from .constants import get_cosmology,cosmology_cached
+        
+        return cosmology_cached(('NFWModel._rhoC',z),get_cosmology().rhoC,z,'cosmological')
             
     def getRv(self,z=0):
         """
@@ -720,14 +729,8 @@ class NFWModel(FunctionModel1DAuto):
         
         units in kpc for mass in Msun
         """
-        from scipy.optimize import newton
-        from .constants import get_cosmology,Ms
-        
-        cosmo = get_cosmology()
-        overden = self.deltavir(z)
-        
         try:
-            rhov = self.deltavir(z)*cosmo.rhoC(z,'cosmological')*1e-18 
+            rhov = self.deltavir(z)*self._rhoC(z)*1e-18 
             # *1e-18  does Mpc^-3->pc^-3
         except:
             raise ValueError('current cosmology does not support critical density')
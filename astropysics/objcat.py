@@ -110,12 +110,13 @@ class CatalogNode(object):
     """
 
     __metaclass__ = ABCMeta
-    __slots__=('_parent','_children','__weakref__')
+    __slots__=('_parent','_children','_flatcache','__weakref__')
 
     @abstractmethod
     def __init__(self,parent):
         self._children = []
         self._parent = None
+        self._flatcache = None
 
         if parent is not None:
             self.parent = parent
@@ -125,18 +126,38 @@ class CatalogNode(object):
     def __setstate__(self,d):
         self._parent = d['_parent']
         self._children = d['_children']
+        self._flatcache = None
 
     def _cycleCheck(self,source):
         """
         call this from a child object with the child as the Source to check
         for cycles in the graph
         """
-        if source is self:
-            raise CycleError('cycle detected in graph assignment attempt')
-        if self._parent is None:
-            return None
-        else:
-            return self.parent._cycleCheck(source)
+        node = self
+        while node is not None:
+            if source is node:
+                raise CycleError('cycle detected in graph assignment attempt')
+            node = node._parent
+
+    def _treeChanged(self,changednode=None):
+        """
+        Called when the structure of the tree below this node changes, and
+        passes the notice on to all the ancestors of this node. If
+        `changednode` is not None, it is a node below this one whose
+        :class:`Fields<Field>` (rather than children) were added or removed.
+        """
+        node = self
+        while node is not None:
+            node._subtreeChanged(changednode)
+            node = node._parent
+
+    def _subtreeChanged(self,changednode):
+        """
+        Updates this node for a change in the tree below it - see
+        :meth:`_treeChanged`.
+        """
+        if changednode is None:
+            self._flatcache = None
 
     def _getParent(self):
         return self._parent
@@ -145,16 +166,22 @@ class CatalogNode(object):
             val._cycleCheck(self) #TODO:test performance effect/make disablable
             val._children.append(self)
 
-        if self._parent is not None:
+        oldparent = self._parent
+        if oldparent is not None:
             #TODO: optimize this by storing index somewhere?
-            for i,c in enumerate(self._parent._children):
+            for i,c in enumerate(oldparent._children):
                 if c is self:
                     break
             else:
                 raise ValueError('Node '+str(self)+" not in parent's children! This should be impossible.")
-            del self._parent._children[i]
+            del oldparent._children[i]
         self._parent = val
 
+        if oldparent is not None:
+            oldparent._treeChanged()
+        if val is not None:
+            val._treeChanged()
+
     parent=property(_getParent,_setParent)
 
 
@@ -203,6 +230,7 @@ class CatalogNode(object):
                 neworder = argsort(neworder)
             #now reorder
             self._children[:] = np.array(self._children,dtype=object)[neworder]
+        self._treeChanged()
 
     def addChild(self,node):
         """
@@ -268,8 +296,8 @@ class CatalogNode(object):
             * 'postorder'
             * an integer indicating at which index the root should be evaluated
               (pre/post are 0/-1)
-            * a float between -1 and 1 indicating where the root should be evaluated
-              as a fraction
+            * a float between 0 and 1 indicating where the root should be
+              evaluated as a fraction of the number of children
             * 'level'/'breathfirst'
             * None:only visit this Node
 
@@ -293,64 +321,119 @@ class CatalogNode(object):
 
         :returns: A list with the return values of `visitfunc` at each visited node.
 
+        .. seealso:: :meth:`ivisit` to iterate over the return values lazily.
+
+        """
+        return list(self.ivisit(func,traversal,filter,includeself))
+
+    def ivisit(self,func,traversal='postorder',filter=False,includeself=True):
         """
+        Iterates through the object and all its children, executing
+        func(:class:`CatalogNode`) as each node is reached. This is the same as
+        :meth:`visit` except that the return values are yielded as they are
+        computed instead of being collected in a list, so large trees can be
+        processed without building intermediate lists. The tree is walked
+        without recursion, so there is no limit on its depth.
+
+        The tree should not be modified until the iteration is complete.
+
+        :param func: The function to call as ``func(node)`` on each node.
+        :type func: a callable
+        :param traversal: The traversal order of the tree - see :meth:`visit`.
+        :param filter: Determines which nodes are visited - see :meth:`visit`.
+        :param includeself:
+            If False, the function will not visit the node itself (only the
+            sub-trees)
+        :type includeself: bool
+
+        :returns: An iterator over the return values of `func`.
+
+        :except ValueError: If `traversal` is not a valid traversal order.
+        """
+        nodes = self._iterNodes(traversal,includeself)
+
         if callable(filter):
-            oldfunc = func
-            def func(*args,**kwargs):
-                if filter(args[0]):
-                    return oldfunc(*args,**kwargs)
-                else:
-                    return None
-            filterval = None
+            return (v for v in (func(n) for n in nodes if filter(n)) if v is not None)
+        elif filter is False:
+            return (func(n) for n in nodes)
         else:
-            filterval = filter
-
-        if type(traversal) is int:
-            retvals = []
-            doroot = True
-            for i,c in enumerate(self._children):
-                if i == traversal and includeself:
-                    retvals.append(func(self))
-                    doroot = False
-                retvals.extend(c.visit(func,traversal))
-            if doroot and includeself:
-                retvals.append(func(self))
-        elif type(traversal) is float:
-            retvals = []
-            doroot = True
-            travi = int(traversal*self._children)
-            for i,c in enumerate(self._children):
-                if i == travi and includeself:
-                    retvals.append(func(self))
-                    doroot = False
-                retvals.extend(c.visit(func,traversal))
-            if doroot and includeself:
-                retvals.append(func(self))
-        elif traversal == 'postorder': #None means postorder
-            retvals = []
-            for c in self._children:
-                retvals.extend(c.visit(func,traversal))
-            if  includeself:
-                retvals.append(func(self))
-        elif traversal == 'preorder':
-            retvals = self.visit(func,0,filter,includeself)
+            return (v for v in (func(n) for n in nodes) if v is not filter)
+
+    def _iterNodes(self,traversal,includeself):
+        """
+        Returns an iterator over the nodes below this one in the order given by
+        `traversal` (see :meth:`visit`).
+        """
+        if traversal == 'preorder':
+            traversal = 0
+        elif traversal == 'postorder':
+            traversal = -1
+
+        if isinstance(traversal,(int,long,float)):
+            return self._iterDepthFirst(traversal,includeself)
         elif traversal == 'level' or traversal == 'breadthfirst':
-            retvals=[]
-            q = deque()
-            if includeself:
-                q.append(self)
-            while len(q)>0:
-                elem = q.popleft()
-                retvals.append(func(elem))
-                q.extend(elem._children)
+            return self._iterBreadthFirst(includeself)
         elif traversal is None:
-            retvals = [func(self)]
+            return iter((self,))
         else:
             raise ValueError('unrecognized traversal type')
 
-        if filterval is not False:
-            retvals = [v for v in retvals if v is not filterval]
-        return retvals
+    def _iterDepthFirst(self,rootpos,includeself):
+        """
+        Iterates over the tree depth-first, visiting each node just before the
+        child at index `rootpos` (or after all the children if there is no such
+        child). A float `rootpos` is a fraction of the number of children.
+        """
+        if isinstance(rootpos,float):
+            posfunc = lambda n:int(rootpos*len(n._children))
+        else:
+            posfunc = lambda n:rootpos
+
+        #each entry is [node,index of next child,root position or None if done]
+        stack = [[self,0,posfunc(self) if includeself else None]]
+        while stack:
+            entry = stack[-1]
+            node,i,pos = entry
+            if i == pos:
+                entry[2] = None
+                yield node
+            if i < len(node._children):
+                entry[1] = i + 1
+                child = node._children[i]
+                stack.append([child,0,posfunc(child)])
+            else:
+                stack.pop()
+                if entry[2] is not None:
+                    yield node
+
+    def _iterBreadthFirst(self,includeself):
+        """
+        Iterates over the tree breadth-first.
+        """
+        q = deque()
+        if includeself:
+            q.append(self)
+        else:
+            q.extend(self._children)
+        while len(q)>0:
+            elem = q.popleft()
+            yield elem
+            q.extend(elem._children)
+
+    def _flatNodes(self,traversal='postorder',includeself=True):
+        """
+        Returns a list of the nodes visited by :meth:`visit` (with no filter) in
+        the order they are visited. The list is cached until the tree below
+        this node changes, so it must not be modified.
+        """
+        key = (traversal,includeself)
+        if self._flatcache is None:
+            self._flatcache = {}
+        nodes = self._flatcache.get(key)
+        if nodes is None:
+            nodes = list(self._iterNodes(traversal,includeself))
+            self._flatcache[key] = nodes
+        return nodes
 
     def save(self,file,savechildren=True,**kwargs):
         """
@@ -565,6 +648,8 @@ class FieldNode(CatalogNode,Sequence):
             raise ValueError('a Field can only reside in one Node')
         field.node = self
         self._fieldnames.append(field.name)
+        if self._parent is not None:
+            self._parent._treeChanged(self)
 
     def delField(self,fieldname):
         try:
@@ -575,6 +660,8 @@ class FieldNode(CatalogNode,Sequence):
                 delattr(self,fieldname)
         except ValueError:
             raise KeyError('Field "%s" not found'%fieldname)
+        if self._parent is not None:
+            self._parent._treeChanged(self)
 
     def fields(self):
         """
@@ -719,11 +806,12 @@ class FieldNode(CatalogNode,Sequence):
         else:
             raise ValueError('invalid missing action')
 
-        for f in self.fields():
-            if src in f:
-                f.currentobj = src
-            else:
-                action(src,f,self)
+        with Field.deferNotifications():
+            for f in self.fields():
+                if src in f:
+                    f.currentobj = src
+                else:
+                    action(src,f,self)
 
     @staticmethod
     def setToSourceAtNode(node,src,missing='skip',traversal='postorder',siblings=False):
@@ -757,11 +845,13 @@ class FieldNode(CatalogNode,Sequence):
                 if hasattr(node,'setToSource'):
                     node.setToSource(src,missing)
                     return node
-            return node.visit(f,traversal=traversal,includeself=includeself,filter=None)
+            with Field.deferNotifications():
+                return node.visit(f,traversal=traversal,includeself=includeself,filter=None)
         else: #assume iterable
             vals = []
-            for n in node:
-                vals.extend(FieldNode.setToSourceAtNode(n,src,missing,traversal,siblings))
+            with Field.deferNotifications():
+                for n in node:
+                    vals.extend(FieldNode.setToSourceAtNode(n,src,missing,traversal,siblings))
             return vals
 
     @_add_docs_and_sig(setToSourceAtNode)
@@ -801,7 +891,10 @@ class FieldNode(CatalogNode,Sequence):
             * A comma-seperated string of field names.
 
         :param traversal: see :meth:`CatalogNode.visit`
-        :param filter: see :meth:`CatalogNode.visit`
+        :param filter:
+            see :meth:`CatalogNode.visit` - a callable selects the nodes to
+            include, while any other value (aside from False) excludes the
+            entries of each field that are equal to it.
         :param missing:
             Determines the behavior in the event that a field is not present (or
             a non :class:`FieldNode` is encountered) it can be:
@@ -860,9 +953,6 @@ class FieldNode(CatalogNode,Sequence):
             * (values,errors) if `errors` are True and `sources` are False
 
         """
-
-        from functools import partial
-
         if missing in ('exception','raise','skip','mask','masked'):
             missingval = 0
         else:
@@ -918,20 +1008,39 @@ class FieldNode(CatalogNode,Sequence):
             except (KeyError,IndexError,TypeError,AttributeError):
                 return False
 
-        if filter is not False and not callable(filter):
-            def maskfilter(node,fieldname):
-                return visitfunc(node,fieldname)!=filter
+        #columnar catalogs of leaf nodes can be extracted from the columns
+        columns = getattr(node,'_columns',None)
+        if columns is not None:
+            len(columns) #update the rows
+            usecolumns = columns._leaves and not includeself and \
+                         filter is False and converter is None and \
+                         missing not in ('exception','raise') and \
+                         (type(traversal) is int or traversal in
+                          ('postorder','preorder','level','breadthfirst'))
         else:
-            maskfilter = filter
+            usecolumns = False
+
+        if usecolumns:
+            lsts,masks,srcs,errs = columns._extractLists(fieldnames,missingval,
+                                                         sources,errors)
+        else:
+            nodes = node._flatNodes(traversal,includeself)
+            if callable(filter):
+                nodes = [n for n in nodes if filter(n)]
+            lsts,masks,srcs,errs = FieldNode._extractLists(nodes,fieldnames,
+                                        visitfunc,maskfunc,converter,
+                                        missingval,sources,errors)
 
-        lsts = []
-        masks = []
-        maskfilterp = maskfilter
-        for fn in fieldnames:
-            lsts.append(node.visit(partial(visitfunc,fieldname=fn),traversal=traversal,filter=filter,includeself=includeself))
             if filter is not False and not callable(filter):
-                maskfilterp = partial(maskfilter,fieldname=fn)
-            masks.append(node.visit(partial(maskfunc,fieldname=fn),traversal=traversal,filter=maskfilterp,includeself=includeself))
+                #drop the entries of each field that match the filter value
+                for i in range(len(fieldnames)):
+                    keep = [v != filter for v in lsts[i]]
+                    lsts[i] = [v for v,k in zip(lsts[i],keep) if k]
+                    masks[i] = masks[i][np.array(keep,dtype=bool)]
+                    if sources:
+                        srcs[i] = [v for v,k in zip(srcs[i],keep) if k]
+                    if errors:
+                        errs[i] = [v for v,k in zip(errs[i],keep) if k]
 
         lsts = [np.array(l) for l in lsts]
         #lists of objects sometimes becomes arrays of lists instead of the intended result - this fixes that
@@ -942,31 +1051,8 @@ class FieldNode(CatalogNode,Sequence):
             lsts = [a[m] for a in lsts]
 
 
-        if sources:
-            def srcfunc(node,fieldname):
-                try:
-                    return getattr(node,fieldname).currentobj.source
-                except (KeyError,IndexError,TypeError,AttributeError):
-                    return None
-            if filter is not False and not callable(filter):
-                srcs = [node.visit(partial(srcfunc,fieldname=fn),traversal=traversal,filter=partial(maskfilter,fieldname=fn),includeself=includeself) for fn in fieldnames]
-            else:
-                srcs = [node.visit(partial(srcfunc,fieldname=fn),traversal=traversal,filter=filter,includeself=includeself) for fn in fieldnames]
-
-            if sources != 'object':
-                srcs = [[str(s) for s in f]  for f in srcs]
-
-        if errors:
-            def errfunc(node,fieldname):
-                try:
-                    return getattr(node,fieldname).currentobj.errors
-                except (KeyError,IndexError,TypeError,AttributeError),e:
-                    return (0,0)
-            if filter is not False and not callable(filter):
-                errs = [node.visit(partial(errfunc,fieldname=fn),traversal=traversal,filter=partial(maskfilter,fieldname=fn),includeself=includeself) for fn in fieldnames]
-            else:
-                errs = [node.visit(partial(errfunc,fieldname=fn),traversal=traversal,filter=maskfilter,includeself=includeself) for fn in fieldnames]
-
+        if sources and sources != 'object':
+            srcs = [[str(s) for s in f]  for f in srcs]
 
         if asrec:
             from operator import isMappingType,isSequenceType
@@ -1055,6 +1141,72 @@ class FieldNode(CatalogNode,Sequence):
             else:
                 return res
 
+    @staticmethod
+    def _extractLists(nodes,fieldnames,visitfunc,maskfunc,converter,missingval,
+                      sources,errors):
+        """
+        Gathers the values, masks, sources, and errors of all the `fieldnames`
+        for `nodes` in a single pass for :meth:`extractFieldAtNode`. The values
+        of :class:`Fields<Field>` are read directly, while `visitfunc` and
+        `maskfunc` are used for anything else (including missing fields and
+        failures).
+        """
+        failexc = (KeyError,IndexError,TypeError,AttributeError)
+
+        nn = len(nodes)
+        lsts = [[missingval]*nn for fn in fieldnames]
+        masks = np.zeros((len(fieldnames),nn),dtype=bool)
+        srcs = [[None]*nn for fn in fieldnames] if sources else None
+        errs = [[(0,0)]*nn for fn in fieldnames] if errors else None
+        fieldinds = list(enumerate(fieldnames))
+
+        for j,n in enumerate(nodes):
+            nodefields = getattr(n,'_fieldnames',())
+            for i,fn in fieldinds:
+                if fn in nodefields:
+                    fi = getattr(n,fn)
+                    try:
+                        obj = fi.currentobj
+                    except IndexError: #empty Field
+                        if converter is None:
+                            lsts[i][j] = None
+                        else:
+                            lsts[i][j] = visitfunc(n,fn)
+                        masks[i,j] = True
+                        continue
+
+                    try:
+                        val = obj.value
+                        if converter is not None:
+                            val = converter(val)
+                        lsts[i][j] = val
+                        masks[i,j] = True
+                    except failexc:
+                        lsts[i][j] = visitfunc(n,fn)
+                        masks[i,j] = maskfunc(n,fn)
+
+                    if sources:
+                        srcs[i][j] = obj.source
+                    if errors:
+                        try:
+                            errs[i][j] = obj.errors
+                        except failexc:
+                            pass
+                else:
+                    lsts[i][j] = visitfunc(n,fn)
+                    masks[i,j] = maskfunc(n,fn)
+                    if sources or errors:
+                        try:
+                            obj = getattr(n,fn).currentobj
+                            if sources:
+                                srcs[i][j] = obj.source
+                            if errors:
+                                errs[i][j] = obj.errors
+                        except failexc:
+                            pass
+
+        return lsts,list(masks),srcs,errs
+
     @_add_docs_and_sig(extractFieldAtNode)
     def extractField(self,*args,**kwargs):
         """
@@ -1079,6 +1231,37 @@ class FieldNode(CatalogNode,Sequence):
             return FieldNode.extractFieldAtNode(self,*args,**kwargs)
     #extractField.__doc__ += extractFieldAtNode.__doc__
 
+    @staticmethod
+    def evaluateDerivedAtNode(node,fieldnames=None,traversal='postorder',
+                              includeself=True):
+        """
+        Computes the current values of derived fields for all nodes at or below
+        `node` together, using :meth:`DerivedValue.evaluateBatch`. This is
+        much faster than computing them one node at a time if a derived field
+        is needed for many nodes.
+
+        :param node: The node at which to start the traversal.
+        :type node: :class:`CatalogNode`
+        :param fieldnames:
+            The names of the fields to compute as a sequence or comma-separated
+            string, or None to compute all derived fields.
+        :param traversal: see :meth:`CatalogNode.visit`
+        :param includeself: If True, this node itself will be included.
+        :type includeself: bool
+        """
+        if isinstance(fieldnames,basestring):
+            fieldnames = [fn.strip() for fn in fieldnames.split(',')]
+
+        dvs = []
+        for n in node._flatNodes(traversal,includeself):
+            nodefields = getattr(n,'_fieldnames',())
+            for fn in (nodefields if fieldnames is None else fieldnames):
+                if fn in nodefields:
+                    vals = getattr(n,fn)._vals
+                    if len(vals) > 0 and isinstance(vals[0],DerivedValue):
+                        dvs.append(vals[0])
+        DerivedValue.evaluateBatch(dvs)
+
     @staticmethod
     def getFieldValueNodesAtNode(node,fieldname,value,visitkwargs={}):
         """
@@ -1112,6 +1295,13 @@ class Field(MutableSequence):
     """
     __slots__=('_name','_type','_vals','_nodewr','_notifywrs','_units','_descr')
 
+    #nesting level of deferNotifications blocks, and the pending notifications
+    #as [field,oldvalobject,newvalobject] lists (with the same lists indexed
+    #by id(field))
+    _deferdepth = 0
+    _deferred = None
+    _deferredorder = None
+
     def __init__(self,name=None,type=None,defaultval=None,usedef=None,
                       descr=None,units=None):
         """
@@ -1264,7 +1454,22 @@ class Field(MutableSequence):
         field has changed
 
         (see registerNotifier)
+
+        Inside a :meth:`deferNotifications` block, the notification is instead
+        sent when the block ends, and only once per Field.
         """
+        if Field._deferdepth > 0:
+            pending = Field._deferred.get(id(self))
+            if pending is None:
+                pending = [self,oldvalobject,newvalobject]
+                Field._deferred[id(self)] = pending
+                Field._deferredorder.append(pending)
+            else:
+                pending[2] = newvalobject
+        else:
+            self._callNotifiers(oldvalobject,newvalobject)
+
+    def _callNotifiers(self,oldvalobject,newvalobject):
         if self._notifywrs is not None:
             deadrefs=[]
             for i,wr in enumerate(self._notifywrs):
@@ -1281,6 +1486,47 @@ class Field(MutableSequence):
                 for i in reversed(deadrefs):
                     del self._notifywrs[i]
 
+    @staticmethod
+    def deferNotifications():
+        """
+        Returns a context manager that defers the change notifications of all
+        :class:`Fields<Field>` until the end of a `with` block. Each Field with
+        changes then sends a single notification (with the first old and last
+        new value objects), as do any Fields invalidated by those
+        notifications, so a :class:`DerivedValue` that depends on many changed
+        values is invalidated only once. Note that this means
+        :class:`DerivedValues<DerivedValue>` are not updated until the block
+        ends. Blocks can be nested, in which case the notifications are sent
+        when the outermost one ends.
+
+        **Examples**
+
+        ::
+
+            with Field.deferNotifications():
+                for node in nodes:
+                    node['mag'] = ('newsrc',mags[node['name']])
+
+        """
+        return _DeferredNotifications()
+
+    @staticmethod
+    def _flushNotifications():
+        """
+        Sends the notifications deferred by :meth:`deferNotifications`. This
+        must be called while notifications are still deferred so that further
+        notifications are queued rather than recursing.
+        """
+        done = {}
+        while Field._deferredorder:
+            order = Field._deferredorder
+            Field._deferred = {}
+            Field._deferredorder = []
+            for fi,oldvalobj,newvalobj in order:
+                if id(fi) not in done:
+                    done[id(fi)] = fi
+                    fi._callNotifiers(oldvalobj,newvalobj)
+
     def registerNotifier(self,notifier,checkargs=True):
         """
         this registers a function to be called when the value changes or is
@@ -1345,6 +1591,9 @@ class Field(MutableSequence):
             if not isinstance(val,FieldValue):
                 val = (s,val)
             val = self._checkConvInVal(val,dosrccheck=True)
+            if len(self._vals) == 0:
+                #the new value becomes the current value
+                self.notifyValueChange(None,val)
             self._vals.append(val)
 
     def __delitem__(self,key):
@@ -1484,6 +1733,28 @@ class Field(MutableSequence):
         return [v.errors if hasattr(v,'errors') else (0,0) for v in self._vals]
 
 
+class _DeferredNotifications(object):
+    """
+    Context manager returned by :meth:`Field.deferNotifications`.
+    """
+    def __enter__(self):
+        if Field._deferdepth == 0:
+            Field._deferred = {}
+            Field._deferredorder = []
+        Field._deferdepth += 1
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        if Field._deferdepth == 1:
+            try:
+                Field._flushNotifications()
+            finally:
+                Field._deferdepth = 0
+                Field._deferred = Field._deferredorder = None
+        else:
+            Field._deferdepth -= 1
+
+
 class _SourceMeta(type):
     def __call__(cls,*args,**kwargs):
         obj = type.__call__(cls,*args,**kwargs)
@@ -2237,6 +2508,188 @@ class DerivedValue(FieldValue):
         v = self.value #need to compute value to make sure errors are up-to-date
         return self._errs
 
+    @staticmethod
+    def evaluateBatch(dvs):
+        """
+        Computes the values of many :class:`DerivedValue` objects at once.
+
+        The dependency graph of `dvs` (including any other invalid
+        :class:`DerivedValue` objects they depend on) is built once, and the
+        values are then computed in dependency order. All values that share a
+        function are computed with a single call of the function on arrays of
+        the dependency values, and errors are propagated with one more pair of
+        calls for each dependency that has non-zero errors. The function must
+        hence act element-wise on arrays. Any values for which that fails
+        (including floating point errors and non-numeric dependencies) are
+        computed individually through :attr:`value`.
+
+        Values that cannot be computed are left invalid, so accessing them
+        behaves as determined by :attr:`failedvalueaction`.
+
+        :param dvs: A sequence of :class:`DerivedValue` objects.
+        """
+        failexc = (ValueError,IndexError,CycleError,AttributeError,TypeError)
+
+        dvmap = {}
+        stack = []
+        for dv in dvs:
+            if not dv._valid and id(dv) not in dvmap:
+                dvmap[id(dv)] = dv
+                stack.append(dv)
+
+        #dependency fields (or None if they cannot be used) and invalid
+        #DerivedValues that each DerivedValue depends on
+        depfields = {}
+        deps = {}
+        #type checks are cached because the abstract class checks are slow
+        fieldtypes = {}
+        dvtypes = {}
+        while stack:
+            dv = stack.pop()
+            src = dv._source
+            fis = [wr() for wr in src.depfieldrefs]
+            if None in fis:
+                try:
+                    fis = src.populateFieldRefs()
+                except failexc:
+                    fis = None
+            depids = None
+            for fi in (fis or ()):
+                t = type(fi)
+                if t not in fieldtypes:
+                    fieldtypes[t] = issubclass(t,Field)
+                if not fieldtypes[t]:
+                    fis = None
+                    break
+                if len(fi._vals) > 0:
+                    obj = fi._vals[0]
+                    t = type(obj)
+                    if t not in dvtypes:
+                        dvtypes[t] = issubclass(t,DerivedValue)
+                    if dvtypes[t] and not obj._valid:
+                        if depids is None:
+                            depids = deps[id(dv)] = set()
+                        depids.add(id(obj))
+                        if id(obj) not in dvmap:
+                            dvmap[id(obj)] = obj
+                            stack.append(obj)
+            depfields[id(dv)] = fis
+
+        ndeps = {}
+        dependents = {}
+        for i,depids in deps.iteritems():
+            ndeps[i] = len(depids)
+            for j in depids:
+                dependents.setdefault(j,[]).append(i)
+
+        #anything never ready is in a cycle, and is left invalid
+        ready = [i for i in dvmap if i not in deps]
+        while ready:
+            groups = {}
+            for i in ready:
+                dv = dvmap[i]
+                groups.setdefault((dv._f,dv._ferr),[]).append(dv)
+            for (f,ferr),group in groups.iteritems():
+                DerivedValue._evaluateGroup(f,ferr,group,depfields)
+
+            nextready = []
+            for i in ready:
+                for j in dependents.get(i,()):
+                    ndeps[j] -= 1
+                    if ndeps[j] == 0:
+                        nextready.append(j)
+            ready = nextready
+
+    @staticmethod
+    def _evaluateGroup(f,ferr,group,depfields):
+        """
+        Computes the values for `group`, a list of :class:`DerivedValue` objects
+        with function `f`, in a single call if possible.
+        """
+        failexc = (ValueError,IndexError,CycleError,AttributeError,TypeError)
+
+        dvs = []
+        individual = []
+        vals,errs = [],[]
+        for dv in group:
+            fis = depfields[id(dv)]
+            if fis is None:
+                individual.append(dv)
+                continue
+            try:
+                dvals = [fi() for fi in fis]
+                derrs = [fi.currenterror for fi in fis]
+            except failexc:
+                individual.append(dv)
+                continue
+            dvs.append(dv)
+            vals.append(dvals)
+            errs.append(derrs)
+
+        n = len(dvs)
+        if n > 0:
+            numkinds = 'biufc'
+            try:
+                #arrays are (nargs,n)
+                vals = np.array(vals).T
+                if any([None in es for es in errs]):
+                    errs = [[(0,0) if e is None else e for e in es] for es in errs]
+                errs = np.array(errs).T
+                if errs.shape != (2,)+vals.shape:
+                    raise TypeError('errors are not pairs of scalars')
+                uerrs,lerrs = errs
+                if vals.shape[1:] != (n,) or \
+                   vals.dtype.kind not in numkinds or \
+                   uerrs.dtype.kind not in numkinds or \
+                   lerrs.dtype.kind not in numkinds:
+                    raise TypeError('dependencies are not numeric scalars')
+
+                with np.errstate(all='raise'):
+                    if ferr:
+                        res = f(*zip(vals,uerrs,lerrs))
+                        if len(res) != 3:
+                            raise ValueError('function did not return 3 values')
+                        val,uerr,lerr = [np.broadcast_to(r,(n,)) for r in res]
+                        haserrs = np.ones(n,dtype=bool)
+                    else:
+                        val = np.broadcast_to(f(*vals),(n,))
+                        uerr = np.zeros(n)
+                        lerr = np.zeros(n)
+                        haserrs = np.zeros(n,dtype=bool)
+                        #compute (df/dx)dx for all variables and add in quadrature
+                        for i in range(len(vals)):
+                            nonzero = (uerrs[i] != 0) | (lerrs[i] != 0)
+                            if np.any(nonzero):
+                                haserrs |= nonzero
+                                args = list(vals)
+                                args[i] = vals[i] + uerrs[i]
+                                uerr = uerr + (f(*args) - val)**2
+                                args[i] = vals[i] - lerrs[i]
+                                lerr = lerr + (val - f(*args))**2
+                        uerr = uerr**0.5
+                        lerr = lerr**0.5
+                        uerr = np.broadcast_to(uerr,(n,))
+                        lerr = np.broadcast_to(lerr,(n,))
+                if val.dtype.kind not in numkinds:
+                    raise TypeError('function did not return numeric values')
+            except Exception:
+                #the function cannot be applied to arrays
+                individual.extend(dvs)
+            else:
+                val,uerr,lerr = val.tolist(),uerr.tolist(),lerr.tolist()
+                haserrs = haserrs.tolist()
+                for j,dv in enumerate(dvs):
+                    dv._value = val[j]
+                    dv._errs = (uerr[j],lerr[j]) if haserrs[j] else (0,0)
+                    dv._valid = True
+
+        for dv in individual:
+            try:
+                dv.value
+            except Exception:
+                #left invalid, so the problem recurs when it is accessed
+                pass
+
 class DependentSource(Source):
     """
     This class holds weak references to the :class:`Field`s that are necessary
@@ -2287,6 +2740,9 @@ class DependentSource(Source):
         self.pathnode = pathnode
         self.notifierfunc = notifierfunc
 
+        if notifierfunc is not None and not callable(notifierfunc):
+            raise TypeError('notifier not a callable')
+
         for f in depfields:
             if isinstance(f,basestring):
                 depstrs.append(f)
@@ -2403,7 +2859,8 @@ class DependentSource(Source):
                     refs.append(f)
                     self.depfieldrefs[i] = ref(f)
                     if self.notifierfunc is not None:
-                            f.registerNotifier(self.notifierfunc)
+                        #the signature was already checked in __init__
+                        f.registerNotifier(self.notifierfunc,False)
                 else:
                     refs.append(wrf())
 
@@ -2535,14 +2992,57 @@ class Catalog(CatalogNode):
 
     Attributes can also be accessed as catobj[attrname] (this allows
     access to Catalog attributes in the same way as FieldNodes)
+
+    If the catalog is :attr:`columnar`, the current values, errors, and sources
+    of the fields of its :class:`FieldNode` children are also available as
+    arrays through :attr:`columns` (see :class:`CatalogColumns`).
     """
-    def __init__(self,name='default Catalog',parent=None):
+    def __init__(self,name='default Catalog',parent=None,columnar=False):
+        self._columns = None
         super(Catalog,self).__init__(parent)
         self.name = name
+        self.columnar = columnar
+
+    def __getstate__(self):
+        d = super(Catalog,self).__getstate__()
+        d['name'] = self.name
+        d['columnar'] = self.columnar
+        return d
+    def __setstate__(self,d):
+        super(Catalog,self).__setstate__(d)
+        self.name = d.get('name','default Catalog')
+        self._columns = None
+        self.columnar = d.get('columnar',False)
 
     def __str__(self):
         return 'Catalog %s'%self.name
 
+    def _getColumnar(self):
+        return self._columns is not None
+    def _setColumnar(self,val):
+        if val and self._columns is None:
+            self._columns = CatalogColumns(self)
+        elif not val:
+            self._columns = None
+    columnar = property(_getColumnar,_setColumnar,doc="""
+    If True, this catalog maintains a :class:`CatalogColumns` object (available
+    as :attr:`columns`) with arrays of the current values of the fields of its
+    :class:`FieldNode` children. Setting this to False discards the columns.
+    """)
+
+    @property
+    def columns(self):
+        """
+        The :class:`CatalogColumns` for the :class:`FieldNode` children of this
+        catalog, or None if this catalog is not :attr:`columnar`.
+        """
+        return self._columns
+
+    def _subtreeChanged(self,changednode):
+        if self._columns is not None:
+            self._columns._treeChanged(changednode)
+        super(Catalog,self)._subtreeChanged(changednode)
+
     def __contains__(self,key):
         if isinstance(key,basestring):
             return hasattr(self,key)
@@ -2610,6 +3110,7 @@ class Catalog(CatalogNode):
         self.parent = newparent
         #put the Catalog in the same location in the parent as the old node
         newparent._children.insert(ind,newparent._children.pop())
+        newparent._treeChanged()
 
     #<----------------------FieldNode children-specific ----------------------->
     @_add_docs_and_sig(FieldNode.extractFieldAtNode)
@@ -2642,12 +3143,465 @@ class Catalog(CatalogNode):
         """
         return FieldNode.getFieldValueNodesAtNode(self,fieldname,value,{'includeself':False})
 
+    def bulkUpdate(self):
+        """
+        Returns a context manager that defers the invalidation of derived
+        values until the end of a `with` block, so that each is only
+        invalidated once when many values in the Catalog are changed - see
+        :meth:`Field.deferNotifications`.
+
+        **Examples**
+
+        ::
+
+            with cat.bulkUpdate():
+                for node,mag in zip(cat.children,mags):
+                    node['mag'] = ('newsrc',mag)
+
+        """
+        return Field.deferNotifications()
+
+    def evaluateDerived(self,fieldnames=None):
+        """
+        Computes the current values of derived fields for all the nodes in this
+        Catalog together - see :meth:`FieldNode.evaluateDerivedAtNode`.
+
+        :param fieldnames:
+            The names of the fields to compute as a sequence or comma-separated
+            string, or None to compute all derived fields.
+        """
+        FieldNode.evaluateDerivedAtNode(self,fieldnames,includeself=False)
+
     def locateName(self,name):
         """
         Searches the Catalog and finds all objects with the requested name
         """
         return FieldNode.getFieldValueNodesAtNode(self,'name',name,{'includeself':False})
 
+class _Column(object):
+    """
+    Arrays for one field in a :class:`CatalogColumns` object.
+
+    `srcinds` are indecies into `sources`, or -1 for an empty :class:`Field`
+    and -2 if the node has no such field (or its value could not be
+    determined). Values that cannot be derived because a dependency is empty
+    are None, but keep the index of their source.
+    """
+    __slots__ = ('values','uerrs','lerrs','srcinds','sources','srcmap','dirty')
+    def __init__(self,n):
+        self.values = self.uerrs = self.lerrs = None
+        self.srcinds = np.empty(n,dtype=int)
+        self.sources = []
+        self.srcmap = {}
+        self.dirty = np.ones(n,dtype=bool)
+
+    def reindex(self,oldinds):
+        """
+        Reorders the rows to match new nodes, where `oldinds` are the old row
+        for each new row, or -1 for new nodes.
+        """
+        new = oldinds < 0
+        oi = np.where(new,0,oldinds)
+        for nm in ('values','uerrs','lerrs'):
+            arr = getattr(self,nm)
+            if arr is not None:
+                if len(arr) == 0:
+                    arr = np.zeros(1,dtype=arr.dtype)
+                setattr(self,nm,arr[oi])
+        self.srcinds = self.srcinds[oi] if len(self.srcinds) > 0 else np.empty(len(oi),dtype=int)
+        self.dirty = new | self.dirty[oi] if len(self.dirty) > 0 else np.ones(len(oi),dtype=bool)
+
+    def filled(self,vals,fill):
+        """
+        Returns a copy of `vals` with the entries for nodes without the field
+        set to `fill`, upcasting if necessary.
+        """
+        absent = self.srcinds == -2
+        if np.any(absent):
+            if vals.dtype.kind in 'biufc' and np.isscalar(fill) and \
+               np.asarray(fill).dtype.kind in 'biufc':
+                vals = vals.astype(np.result_type(vals,fill))
+            else:
+                vals = vals.astype(object)
+            vals[absent] = fill
+        return vals
+
+    @staticmethod
+    def _assign(arr,n,inds,vals):
+        """
+        Sets the entries `inds` of the length-`n` array `arr` (or None) to the
+        sequence `vals`, upcasting the array if necessary to hold the new
+        values, and returns the (possibly new) array.
+        """
+        new = np.array(vals)
+        if new.ndim != 1:
+            new = np.empty(len(vals),dtype=object)
+            for i,v in enumerate(vals):
+                new[i] = v
+        if arr is None:
+            if len(inds) == n:
+                return new
+            arr = np.zeros(n,dtype=new.dtype)
+            if arr.dtype.kind == 'O':
+                arr[:] = None
+        else:
+            k,nk = arr.dtype.kind,new.dtype.kind
+            if 'O' in (k,nk):
+                dt = np.dtype(object)
+            elif (k in 'biufc' and nk in 'biufc') or k == nk:
+                dt = np.promote_types(arr.dtype,new.dtype)
+            else:
+                dt = np.dtype(object)
+            if dt != arr.dtype:
+                arr = arr.astype(dt)
+        arr[inds] = new
+        return arr
+
+class _ColumnNotifier(object):
+    """
+    Notifier registered with a :class:`Field` to mark its row in a
+    :class:`CatalogColumns` object as changed.
+    """
+    __slots__ = ('columnswr','field','__weakref__')
+    def __init__(self,columns,field):
+        from weakref import ref
+        self.columnswr = ref(columns)
+        self.field = field
+    def __call__(self,oldvalobj,newvalobj):
+        columns = self.columnswr()
+        if columns is not None:
+            columns._fieldChanged(self.field)
+
+class CatalogColumns(object):
+    """
+    Columnar storage for the :class:`FieldNode` children of a :class:`Catalog`
+    (see :attr:`Catalog.columnar`). For each field, the current values, upper
+    and lower errors, and sources are stored in arrays with one row per
+    :class:`FieldNode` child of the catalog, in the order of the children. This
+    allows extraction and filtering of the catalog with array operations, e.g.::
+
+        cat = Catalog('cat',columnar=True)
+        ... add nodes to the catalog ...
+        bright = cat.columns.select(cat.columns['mag'] < 15)
+
+    The :class:`Field` objects of the nodes remain the record of all the
+    values - the columns hold the current value of each field, and act as a view
+    of the nodes that is kept up to date through :meth:`Field.registerNotifier`
+    and notices of changes in the catalog structure. Changed rows are refreshed
+    lazily when a column is accessed, so any number of changes can be made
+    through the node interface between accesses, and each changed row is only
+    updated once.
+
+    Columns are generated when a field is first requested. The values of
+    :class:`DerivedValues<DerivedValue>` are computed when they are refreshed.
+    """
+    def __init__(self,catalog):
+        from weakref import ref
+
+        self._catalogwr = ref(catalog)
+        self._nodes = []
+        self._rowinds = {} #id(node) -> row
+        self._notifiers = {} #id(Field) -> _ColumnNotifier
+        self._cols = {}
+        self._leaves = True
+        self._rowsvalid = False
+
+    @property
+    def catalog(self):
+        """
+        The :class:`Catalog` these columns belong to.
+        """
+        return self._catalogwr()
+
+    def _treeChanged(self,changednode=None):
+        if changednode is not None and changednode._parent is self.catalog:
+            row = self._rowinds.get(id(changednode))
+            if row is not None and self._nodes[row] is changednode:
+                for col in self._cols.itervalues():
+                    col.dirty[row] = True
+                return
+        self._rowsvalid = False
+
+    def _fieldChanged(self,field):
+        node = field.node
+        row = self._rowinds.get(id(node))
+        if row is not None and self._nodes[row] is node:
+            col = self._cols.get(field.name)
+            if col is not None:
+                col.dirty[row] = True
+
+    def _updateRows(self):
+        """
+        Matches the rows to the current children of the catalog.
+        """
+        cat = self.catalog
+        nodes = [c for c in cat._children if isinstance(c,FieldNode)]
+        self._leaves = len(nodes) == len(cat._children) and \
+                       not any([len(n._children) for n in nodes])
+
+        oldnodes = self._nodes
+        oldrowinds = self._rowinds
+        rowinds = {}
+        oldinds = np.empty(len(nodes),dtype=int)
+        for i,n in enumerate(nodes):
+            nid = id(n)
+            rowinds[nid] = i
+            j = oldrowinds.get(nid,-1)
+            oldinds[i] = j if j >= 0 and oldnodes[j] is n else -1
+
+        #stop listening to nodes that were removed
+        kept = np.zeros(len(oldnodes),dtype=bool)
+        kept[oldinds[oldinds >= 0]] = True
+        for j in np.flatnonzero(~kept):
+            for fi in oldnodes[j].fields():
+                self._notifiers.pop(id(fi),None)
+
+        for col in self._cols.itervalues():
+            col.reindex(oldinds)
+        self._nodes = nodes
+        self._rowinds = rowinds
+        self._rowsvalid = True
+
+    def _getColumn(self,fieldname):
+        """
+        Returns the up-to-date :class:`_Column` for `fieldname`.
+        """
+        if not self._rowsvalid:
+            self._updateRows()
+        col = self._cols.get(fieldname)
+        if col is None:
+            col = self._cols[fieldname] = _Column(len(self._nodes))
+
+        rows = np.flatnonzero(col.dirty)
+        if len(rows) > 0:
+            nodes = self._nodes
+            notifiers = self._notifiers
+
+            dvs = []
+            for row in rows:
+                node = nodes[row]
+                if fieldname in node._fieldnames:
+                    vals = getattr(node,fieldname)._vals
+                    if len(vals) > 0 and isinstance(vals[0],DerivedValue):
+                        dvs.append(vals[0])
+            DerivedValue.evaluateBatch(dvs)
+
+            srcmap = col.srcmap
+            srcinds = np.empty(len(rows),dtype=int)
+            vrows,vals,uerrs,lerrs = [],[],[],[]
+            for i,row in enumerate(rows):
+                node = nodes[row]
+                if fieldname not in node._fieldnames:
+                    srcinds[i] = -2
+                    continue
+                fi = getattr(node,fieldname)
+                if id(fi) not in notifiers:
+                    notifiers[id(fi)] = notifier = _ColumnNotifier(self,fi)
+                    fi.registerNotifier(notifier,False)
+                try:
+                    obj = fi.currentobj
+                except IndexError: #empty Field
+                    srcinds[i] = -1
+                    val,errs = None,(0,0)
+                else:
+                    try:
+                        val = obj.value
+                        errs = obj.errors if hasattr(obj,'errors') else (0,0)
+                    except IndexError:
+                        #present but not derivable (e.g. a DerivedValue with an
+                        #empty dependency) - kept with a None value and its
+                        #source, like FieldNode.__getitem__
+                        val,errs = None,(0,0)
+                    except (KeyError,TypeError,AttributeError):
+                        srcinds[i] = -2
+                        continue
+                    if errs is None:
+                        errs = (0,0)
+                    src = obj.source
+                    si = srcmap.get(src)
+                    if si is None:
+                        si = srcmap[src] = len(col.sources)
+                        col.sources.append(src)
+                    srcinds[i] = si
+                vrows.append(row)
+                vals.append(val)
+                uerrs.append(errs[0])
+                lerrs.append(errs[1])
+
+            n = len(nodes)
+            col.values = _Column._assign(col.values,n,vrows,vals)
+            col.uerrs = _Column._assign(col.uerrs,n,vrows,uerrs)
+            col.lerrs = _Column._assign(col.lerrs,n,vrows,lerrs)
+            absent = rows[srcinds == -2]
+            if len(absent) > 0:
+                col.values[absent] = None if col.values.dtype.kind == 'O' else 0
+                col.uerrs[absent] = col.lerrs[absent] = 0
+            col.srcinds[rows] = srcinds
+            col.dirty[rows] = False
+        return col
+
+    def __len__(self):
+        if not self._rowsvalid:
+            self._updateRows()
+        return len(self._nodes)
+
+    def __getitem__(self,fieldname):
+        return self.getValues(fieldname)
+
+    @property
+    def nodes(self):
+        """
+        A tuple of the nodes for each row.
+        """
+        if not self._rowsvalid:
+            self._updateRows()
+        return tuple(self._nodes)
+
+    @property
+    def fieldnames(self):
+        """
+        A set of the names of the fields present in any of the nodes.
+        """
+        s = set()
+        for n in self.nodes:
+            s.update(n._fieldnames)
+        return s
+
+    @staticmethod
+    def _readonly(arr):
+        arr = arr.view()
+        arr.flags.writeable = False
+        return arr
+
+    def getValues(self,fieldname,missing=None):
+        """
+        Gets the current values of a field.
+
+        :param str fieldname: The name of the field.
+        :param missing:
+            The value to use for nodes that do not have the field. If None,
+            these entries are 0 (or None if the values are not numeric) - see
+            :meth:`getMask`.
+
+        :returns:
+            A read-only array of the current values of the field for each row
+            (None for empty fields or values that cannot be derived).
+        """
+        col = self._getColumn(fieldname)
+        vals = col.values
+        if vals is None:
+            vals = np.empty(len(self._nodes),dtype=object)
+        if missing is not None:
+            vals = col.filled(vals,missing)
+        return self._readonly(vals)
+
+    def getMask(self,fieldname):
+        """
+        Gets a mask indicating which rows have a field.
+
+        :param str fieldname: The name of the field.
+
+        :returns:
+            A boolean array that is True for the nodes that have the field
+            (including empty fields).
+        """
+        return self._getColumn(fieldname).srcinds > -2
+
+    def getErrors(self,fieldname):
+        """
+        Gets the errors on the current values of a field.
+
+        :param str fieldname: The name of the field.
+
+        :returns:
+            (uppererror,lowererror) as read-only arrays. Values without errors
+            have errors of 0.
+        """
+        col = self._getColumn(fieldname)
+        if col.uerrs is None:
+            return np.zeros(len(self._nodes)),np.zeros(len(self._nodes))
+        return self._readonly(col.uerrs),self._readonly(col.lerrs)
+
+    def getSources(self,fieldname,asstrings=False):
+        """
+        Gets the sources of the current values of a field.
+
+        :param str fieldname: The name of the field.
+        :param bool asstrings:
+            If True, the string representation of the sources are returned,
+            otherwise the :class:`Source` objects.
+
+        :returns:
+            An object array of the sources (None for empty or missing fields).
+        """
+        col = self._getColumn(fieldname)
+        srcs = np.empty(len(col.sources)+2,dtype=object)
+        srcs[:-2] = col.sources
+        if asstrings:
+            srcs[:] = [str(s) for s in srcs]
+        return srcs[col.srcinds]
+
+    def _extractLists(self,fieldnames,missingval,sources,errors):
+        """
+        Generates the values, masks, sources, and errors for
+        :meth:`FieldNode.extractFieldAtNode` in the same form as a traversal of
+        the catalog (when the catalog only has leaf :class:`FieldNode`
+        children).
+        """
+        lsts,masks,srcs,errs = [],[],[],[]
+        for fn in fieldnames:
+            col = self._getColumn(fn)
+            mask = col.srcinds > -2
+            if mask.all():
+                vals = col.values
+                if vals is None:
+                    vals = []
+                elif vals.dtype.kind == 'O':
+                    vals = list(vals)
+            else:
+                vals = col.filled(col.values,missingval)
+                if vals.dtype.kind == 'O':
+                    vals = list(vals)
+            lsts.append(vals)
+            masks.append(mask)
+            if sources:
+                srcs.append(list(self.getSources(fn)))
+            if errors:
+                uerrs,lerrs = self.getErrors(fn)
+                errs.append(zip(uerrs.tolist(),lerrs.tolist()))
+        return lsts,masks,srcs,errs
+
+    def select(self,mask):
+        """
+        Selects nodes using a mask over the rows.
+
+        :param mask: A boolean array with one entry per row, or row indecies.
+
+        :returns: A list of the selected nodes.
+        """
+        nodes = self.nodes
+        mask = np.asarray(mask)
+        if mask.dtype == bool:
+            if mask.shape != (len(nodes),):
+                raise ValueError('mask does not match the number of rows')
+            mask = np.flatnonzero(mask)
+        return [nodes[i] for i in mask]
+
+    def refresh(self):
+        """
+        Brings all existing columns up to date with the nodes.
+        """
+        for fieldname in self._cols.keys():
+            self._getColumn(fieldname)
+
+    def clear(self):
+        """
+        Discards all columns, releasing their memory. They will be regenerated
+        as they are requested.
+        """
+        self._cols.clear()
+        self._notifiers.clear()
+
 
 class _StructuredFieldNodeMeta(ABCMeta):
     #Metaclass is used to check at class creation-time that fields all match names
@@ -2875,6 +3829,8 @@ class StructuredFieldNode(FieldNode):
         self._altered = False
         self.addField = types.MethodType(StructuredFieldNode.addField,self,StructuredFieldNode)
         self.delField = types.MethodType(StructuredFieldNode.delField,self,StructuredFieldNode)
+        if self._parent is not None:
+            self._parent._treeChanged(self)
 
     def addField(self,field):
         self._altered = True
@@ -105,7 +105,89 @@ mjdoffset = 2400000.5
 Offset between Julian Date and Modified Julian Date - e.g. mjd = jd - mjdoffset
 """
 
-def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=False):
+def _datetime64_utcoffsets(us,tz,fromutc):
+    """
+    Computes UTC offsets in microseconds for int64 microsecond timestamps `us`
+    (since 1970-01-01). `tz` is a timezone as accepted by :func:`calendar_to_jd`
+    and `fromutc` indicates if `us` are UTC (True) or local times (False).
+    Offsets are looked up once per day, and once per hour only on days where
+    the offset changes, so DST transitions are handled without converting
+    every timestamp.
+    """
+    from datetime import datetime,tzinfo
+
+    if tz is None:
+        return 0
+    if isinstance(tz,basestring):
+        tzi = tzmod.gettz(tz)
+        if tzi is None:
+            raise ValueError('unrecognized time zone string '+tz)
+        tz = tzi
+    if not isinstance(tz,tzinfo):
+        return int(round(tz*3600e6))
+
+    epoch = datetime(1970,1,1)
+    def hroffsets(hours):
+        offs = []
+        for h in hours:
+            dt = (epoch + timedelta(hours=int(h))).replace(tzinfo=tz)
+            off = tz.fromutc(dt).utcoffset() if fromutc else dt.utcoffset()
+            offs.append(0 if off is None else (off.days*86400 + off.seconds)*1000000 + off.microseconds)
+        return np.array(offs,dtype='int64')
+
+    hrs = np.array(us,copy=False,ndmin=1)//3600000000
+    days = hrs//24
+    dmin,dmax = days.min(),days.max()
+    if dmax - dmin < days.size:
+        #dense table of days avoids sorting large arrays
+        udays = np.arange(dmin,dmax+1)
+        inv = days - dmin
+    else:
+        udays,inv = np.unique(days,return_inverse=True)
+
+    dayoffs = hroffsets(udays*24)
+    res = dayoffs[inv]
+    changed = dayoffs != hroffsets(udays*24+23)
+    if np.any(changed):
+        msk = changed[inv]
+        uhrs,hinv = np.unique(hrs[msk],return_inverse=True)
+        res[msk] = hroffsets(uhrs)[hinv]
+    return res.reshape(np.shape(us))
+
+def _datetime64_to_jd(dt64,tz,mjd):
+    """
+    Implements :func:`calendar_to_jd` for :class:`numpy.datetime64` input.
+    """
+    us = np.array(dt64,copy=False).astype('datetime64[us]').astype('int64')
+    us = us - _datetime64_utcoffsets(us,tz,False)
+
+    days = us//86400000000
+    frac = (us - days*86400000000)/86400000000
+    if mjd:
+        res = (days + (2440587.5 - mjdoffset)) + frac
+    else:
+        res = (days + 2440587.5) + frac
+
+    if res.shape == ():
+        return float(res)
+    else:
+        return res
+
+def _jd_to_datetime64(jd,rounding,tz):
+    """
+    Implements :func:`jd_to_calendar` for 'datetime64' output.
+    """
+    days = np.floor(jd - 0.5)
+    frac = (jd - 0.5) - days
+    us = (days - 2440587).astype('int64')*86400000000 + \
+         np.round(frac*86400000000).astype('int64')
+    if rounding > 0:
+        rounding = int(rounding)
+        us = ((us + rounding//2)//rounding)*rounding
+    us = us + _datetime64_utcoffsets(us,tz,True)
+    return us.astype('datetime64[us]')
+
+def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=False,tz=None):
     """
     Converts a julian date to a calendar date and time.
 
@@ -116,9 +198,10 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
     :type jd: scalar, array-like, or None
     :param rounding:
         If non-0, Performs a fix for floating-point errors. It specifies the
-        number of milliseconds by which to round the result to the nearest
-        second. If 1000000 (one second), no milliseconds are recorded. If
-        larger, a ValueError is raised.
+        number of microseconds by which to round the result to the nearest
+        second. If 1000000 (one second), no microseconds are recorded. If
+        larger, a ValueError is raised. For 'datetime64' output, the result is
+        rounded to the nearest multiple of `rounding` microseconds.
     :type rounding: scalar
     :param output:
         Determines the format of the returned object and can be:
@@ -134,6 +217,11 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
             * 'fracarray'
                 An Nx3 array (year,month,day) where day includes the decimal
                 portion.
+            * 'datetime64'
+                A :class:`numpy.datetime64` array with microsecond resolution
+                (or a scalar if the input is a scalar), computed without any
+                per-element python objects. These are always in the (proleptic)
+                Gregorian calendar.
 
     :param gregorian:
         If True, the output will be in the Gregorian calendar. Otherwise, it
@@ -143,6 +231,11 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
     :param bool mjd:
         If True, the input is interpreted as a modified julian date instead of a
         standard julian date.
+    :param tz:
+        The time zone for 'datetime' and 'datetime64' outputs, in any of the
+        forms accepted by :func:`calendar_to_jd`. If None, the outputs are in
+        UTC. :class:`numpy.datetime64` values do not carry a time zone, so
+        they give the local time in `tz`.
 
     :returns:
         The calendar date and time in a format determined by the `output`
@@ -163,13 +256,15 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
            [1600,    1,    1,    0,    0,    0,    0]])
     >>> jd_to_calendar(0.0,output='fracarray')
     array([[ -4.71200000e+03,   1.00000000e+00,   1.50000000e+00]])
+    >>> jd_to_calendar([2451545,2455197.75],output='datetime64')
+    array(['2000-01-01T12:00:00.000000', '2010-01-01T06:00:00.000000'], dtype='datetime64[us]')
 
     """
     import datetime
-    from dateutil import tz
+    from dateutil import tz as dtz
 
     if jd is None:
-        jd = calendar_to_jd(datetime.datetime.now(tz.tzlocal()))
+        jd = calendar_to_jd(datetime.datetime.now(dtz.tzlocal()))
 
     jd = np.array(jd,copy=True,dtype=float)
     scalar = jd.shape == ()
@@ -180,7 +275,11 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
 
     if rounding > 1000000:
         raise ValueError('rounding cannot exceed a second')
+    elif output == 'datetime64':
+        res = _jd_to_datetime64(jd,rounding,tz)
+        return res[0] if scalar else res
     elif rounding <= 0:
+        roundingfrac = 0
         jd += .5
     else:
         rounding = int(rounding)
@@ -255,12 +354,18 @@ def jd_to_calendar(jd,rounding=1000000,output='datetime',gregorian=None,mjd=Fals
         min -= 60*hr
 
     if output == 'datetime':
-        tzi = tz.tzutc()
+        tzi = dtz.tzutc()
         if msec is None:
             ts = (year,month,day,hr%24,min%60,sec%60)
         else:
             ts = (year,month,day,hr%24,min%60,sec%60,msec%1000000)
         res = [datetime.datetime(*t,**dict(tzinfo=tzi)) for t in zip(*ts)]
+        if tz is not None:
+            if isinstance(tz,basestring):
+                tz = dtz.gettz(tz)
+            elif not isinstance(tz,datetime.tzinfo):
+                tz = dtz.tzoffset(str(tz),int(tz*3600))
+            res = [r.astimezone(tz) for r in res]
     elif output == 'array':
         msec = np.zeros_like(sec) if msec is None else msec
         res = np.array([year,month,day,hr%24,min%60,sec%60,msec]).T
@@ -288,6 +393,9 @@ def calendar_to_jd(caltime,tz=None,gregorian=True,mjd=False):
             * A :class:`datetime.datetime` or :class:`datetime.date` object
             * A sequence of :class:`datetime.datetime` or :class:`datetime.date`
               objects (a sequence will be returned).
+            * A :class:`numpy.datetime64` or an array of them. These are
+              converted without any per-element python objects, and are
+              always interpreted in the (proleptic) Gregorian calendar.
             * None : returns the JD at the moment the function is called.
 
         If the time is unspecified, it is taken to be noon (i.e. Julian Date =
@@ -337,12 +445,18 @@ def calendar_to_jd(caltime,tz=None,gregorian=True,mjd=False):
     >>> tz = dateutil.tz.tzoffset('2',3*3600)
     >>> calendar_to_jd((2010,1,1),tz)
     2455197.875
+    >>> calendar_to_jd(np.array(['2004-03-05','2004-03-09T06'],dtype='datetime64'))
+    array([ 2453069.5 ,  2453073.75])
 
 
     """
     #Adapted from xidl  jdcnv.pro
     from datetime import datetime,date,tzinfo
 
+    if isinstance(caltime,np.datetime64) or \
+       (isinstance(caltime,np.ndarray) and caltime.dtype.kind == 'M'):
+        return _datetime64_to_jd(caltime,tz,mjd)
+
     if caltime is None:
         from dateutil.tz import tzlocal
         datetimes = [datetime.now(tzlocal())]
@@ -400,8 +514,7 @@ def calendar_to_jd(caltime,tz=None,gregorian=True,mjd=False):
     #do tz conversion if tz is provided
     if isinstance(tz,basestring) or isinstance(tz,tzinfo):
         if isinstance(tz,basestring):
-            from dateutil import tz
-            tzi = tz.gettz(tz)
+            tzi = tzmod.gettz(tz)
         else:
             tzi = tz
 
@@ -447,7 +560,7 @@ def calendar_to_jd(caltime,tz=None,gregorian=True,mjd=False):
     jdn = (365.25*(yr+4716)).astype(int) + \
           (30.6001*(month + 1)).astype(int) + \
                day + gregoffset - 1524.5
-    res = jdn + hr/24.0 + min/1440.0 + sec/86400.0
+    res = jdn + hr/24.0 + min/1440.0 + sec/86400.0 + msec/86400e6
 
     if mjd:
         res -= mjdoffset
@@ -573,56 +686,137 @@ def delta_AT(jdutc,usett=False):
     Computes the difference between International Atomic Time (TAI) and
     UTC, known as delta(AT).
 
-    Note that this is not valid before UTC (Jan 1,1960) beganand it is not
+    Note that this is not valid before UTC (Jan 1,1960) began and it is not
     correct for future dates, as leap seconds are not predictable. Hence,
-    warnings are issued if before UTC or >5 years from the date of the
-    algorithm.
+    warnings are issued if before UTC or after the leap second table is valid
+    (see :func:`set_leap_seconds`).
 
     Implementation adapted from the matching `SOFA <http://www.iausofa.org/>`_
-    algorithm (dat.c).
+    algorithm (dat.c), but uses a sorted table of leap second dates so that
+    array inputs are converted in a single vectorized lookup.
 
-    :param utc:
+    :param jdutc:
         UTC time as a Julian Date (use :func:`calendar_to_jd` for calendar form
         inputs.)
-    :type utc: float
+    :type jdutc: float or array-like
     :param usett:
-        If True, the return value will be the difference between UTC and
-        Terrestrial Time (TT) instead of TAI (TT - TAI = 32.184 s).
+        If True, the return value will be the difference between Terrestrial
+        Time (TT) and UTC instead of TAI (TT - TAI = 32.184 s).
     :type usett: bool
 
-    :returns: TAI - UTC in seconds as a float (or TT - UTC if `usett` is True)
+    :returns:
+        TAI - UTC in seconds as a float or array matching the shape of `jdutc`
+        (or TT - UTC if `usett` is True)
 
     """
     from warnings import warn
 
+    mjds,delats,driftrefs,driftrates,validmjd = _get_leap_seconds()
 
-    dt = jd_to_calendar(jdutc)
+    mjd = np.asarray(jdutc,dtype=float) - mjdoffset
+    i = np.searchsorted(mjds,mjd,side='right') - 1
 
-    #get data from arrays defined below
-    drift = __dat_drift
-    cyear,cmonth,cdelat = __dat_changes
+    if np.any(mjd > validmjd):
+        warn('delta(AT) requested for a date past the validity of the leap second table (%i)'%jd_to_calendar(np.max(mjd)+mjdoffset).year)
+    if np.any(i < 0):
+        warn('delta(AT) requested before 1960 (%i)'%jd_to_calendar(np.min(mjd)+mjdoffset).year)
+        i = np.clip(i,0,None)
 
-    if dt.year > __dat_valid_year+5:
-        warn('delta(AT) requested for more than 5 years after current leap seconds (%i)'%dt.year)
-
-    m = 12*dt.year + dt.month
-    i = np.sum(__dat_m<m)-1
-    if i < 0:
-        warn('delta(AT) requested before 1960 (%i)'%dt.year)
-        i = 0
-    delat = cdelat[i]
-
-    #if pre leap seconds, account for drift
-    if i < drift.shape[0]:
-        fd = dt.hour/24+dt.minute/24/60+dt.second/24/3.6e3+dt.microsecond/24/3.6e9 #fraction of day
-        delat += (jdutc - mjdoffset + fd - drift[i,0]) * drift[i,1]
+    #pre leap seconds, account for drift - driftrates are 0 for later entries
+    delat = delats[i] + (mjd - driftrefs[i]) * driftrates[i]
     if usett:
-        return delat - 32.184
+        delat = delat + 32.184
+    if delat.shape == ():
+        return float(delat)
     else:
         return delat
 
+def set_leap_seconds(fn=None):
+    """
+    Sets the table of leap seconds used by :func:`delta_AT`.
+
+    :param fn:
+        The file name of a leap second table in the format of the IERS/NIST
+        ``leap-seconds.list`` file (e.g.
+        http://hpiers.obspm.fr/iers/bul/bulc/ntp/leap-seconds.list, also
+        distributed with many tz databases). If None, the table
+        built into astropysics will be used. The table is valid until the
+        expiration date given in the file.
+    :type fn: string or None
+
+    If this function has not been called, a file named ``leap-seconds.list`` in
+    the astropysics data directory (see
+    :func:`astropysics.config.get_data_dir`) will be used if present, so that
+    the leap seconds can be updated without any code changes.
+
+    :except ValueError: If the file does not contain any leap second entries.
+
+    """
+    global _leap_second_table
+
+    #pre-1972 entries are always from the built-in table
+    ndrift = __dat_drift.shape[0]
+    mjds = __dat_mjds
+    delats = __dat_changes[2]
+    driftrefs = np.zeros_like(delats)
+    driftrates = np.zeros_like(delats)
+    driftrefs[:ndrift],driftrates[:ndrift] = __dat_drift.T
+
+    if fn is None:
+        validmjd = _mjd_of_month(__dat_valid_year+5,1)
+    else:
+        fmjds,fdelats = [],[]
+        validmjd = np.inf
+        with open(fn) as f:
+            for l in f:
+                if l.startswith('#@'):
+                    #expiration date in NTP seconds (since 1900)
+                    validmjd = float(l[2:].split()[0])/86400 + 15020
+                elif l.strip() != '' and not l.startswith('#'):
+                    ls = l.split()
+                    fmjds.append(float(ls[0])/86400 + 15020)
+                    fdelats.append(float(ls[1]))
+        if len(fmjds) == 0:
+            raise ValueError('no leap second entries found in '+fn)
+
+        o = np.argsort(fmjds)
+        fmjds = np.array(fmjds)[o]
+        fdelats = np.array(fdelats)[o]
+        pre = mjds[:ndrift] < fmjds[0]
+        mjds = np.concatenate((mjds[:ndrift][pre],fmjds))
+        delats = np.concatenate((delats[:ndrift][pre],fdelats))
+        driftrefs = np.concatenate((driftrefs[:ndrift][pre],np.zeros_like(fmjds)))
+        driftrates = np.concatenate((driftrates[:ndrift][pre],np.zeros_like(fmjds)))
+
+    _leap_second_table = (mjds,delats,driftrefs,driftrates,validmjd)
+
+def _get_leap_seconds():
+    """
+    Returns the leap second table as (mjds,delats,driftrefs,driftrates,validmjd)
+    loading it on first use.
+    """
+    if _leap_second_table is None:
+        import os
+        from .config import get_data_dir
+
+        try:
+            fn = os.path.join(get_data_dir(create=False),'leap-seconds.list')
+        except OSError:
+            fn = None
+        if fn is None or not os.path.isfile(fn):
+            fn = None
+        set_leap_seconds(fn)
+    return _leap_second_table
+
+def _mjd_of_month(year,month):
+    """
+    Returns the MJD of the first day of the given month.
+    """
+    from datetime import date
+    return date(int(year),int(month),1).toordinal() - 678576
+
 #fixed arrays/values for delta_AT:
-__dat_valid_year = 2009
+__dat_valid_year = 2025
 #Reference dates (MJD) and drift rates (s/day), pre leap seconds
 __dat_drift = np.array([
     [ 37300.0, 0.0012960 ],
@@ -680,13 +874,313 @@ __dat_changes = np.array([
     [ 1997,  7, 31.0       ],
     [ 1999,  1, 32.0       ],
     [ 2006,  1, 33.0       ],
-    [ 2009,  1, 34.0       ]
+    [ 2009,  1, 34.0       ],
+    [ 2012,  7, 35.0       ],
+    [ 2015,  7, 36.0       ],
+    [ 2017,  1, 37.0       ]
 ]).T
-__dat_m = 12*__dat_changes[0] + __dat_changes[1]
+__dat_mjds = np.array([_mjd_of_month(y,m) for y,m in __dat_changes[:2].T],dtype=float)
+_leap_second_table = None #set on first use by _get_leap_seconds
+
+
+def _tdb_minus_tt(jdtt):
+    """
+    Approximate TDB - TT in seconds (good to ~10 microseconds) for TT julian
+    dates `jdtt`, from the USNO circular 179 expression.
+    """
+    g = np.radians(357.53 + 0.98560028*(jdtt - jd2000))
+    return 0.001657*np.sin(g) + 0.000014*np.sin(2*g)
+
+class TimeArray(object):
+    """
+    An array of times in one of the time scales UTC, TAI, TT, UT1, or TDB.
+
+    Times are stored as two-part julian dates `jd1` and `jd2` (the julian date
+    of the preceding midnight and the fraction of the day, respectively) so
+    that there is no loss of precision from representing ~2.4 million days and
+    fractions of a second in one float. Conversions between time scales are
+    done for the whole array at once, and the converted times as well as
+    derived quantities (e.g. epochs, sidereal times, and calendar fields) are
+    computed lazily on first access and cached, as the times themselves are
+    immutable.
+
+    :func:`numpy.asarray` on a :class:`TimeArray` gives the julian dates in its
+    own time scale, so they can be passed directly to functions that accept
+    arrays of julian dates (e.g. use ``t.tt`` for ephemerides).
+
+    **Examples**
+
+    >>> t = TimeArray([2455197.5,2455197.75],scale='utc')
+    >>> print t.tt.jd2*86400
+    [    66.184  21666.184]
+    >>> print t.hour
+    [ 0 6]
+
+    """
+    scales = ('ut1','utc','tai','tt','tdb')
+
+    def __init__(self,jd1,jd2=0,scale='utc',dut1=0):
+        """
+        :param jd1:
+            The julian dates, or the first part of two-part julian dates. Can
+            also be another :class:`TimeArray`, in which case it will be
+            converted to `scale`.
+        :type jd1: scalar or array-like
+        :param jd2:
+            The second part of two-part julian dates (the time is `jd1` +
+            `jd2`).
+        :type jd2: scalar or array-like
+        :param str scale:
+            The time scale of the input julian dates: 'utc', 'tai', 'tt', 'ut1',
+            or 'tdb'.
+        :param dut1:
+            UT1 - UTC in seconds, used for conversions to and from UT1.
+        :type dut1: scalar or array-like
+
+        :except ValueError: If the `scale` is invalid.
+        """
+        scale = scale.lower()
+        if scale not in self.scales:
+            raise ValueError('invalid time scale '+scale)
+
+        if isinstance(jd1,TimeArray):
+            other = jd1._convert(scale)
+            self.jd1,self.jd2 = other.jd1,other.jd2
+            self.scale = scale
+            self.dut1 = other.dut1
+            self._scaletimes = other._scaletimes
+            self._derived = other._derived
+            return
+
+        jd1,jd2 = np.broadcast_arrays(np.array(jd1,dtype=float),
+                                      np.array(jd2,dtype=float))
+        self.jd1,self.jd2 = self._normalize(jd1,jd2)
+        self.scale = scale
+        self.dut1 = np.array(dut1,dtype=float)
+        self.dut1.flags.writeable = False
+        self._scaletimes = {scale:self}
+        self._derived = {}
+
+    @staticmethod
+    def _normalize(jd1,jd2):
+        """
+        Returns (jd1,jd2) with `jd1` at midnight and 0 <= `jd2` < 1.
+        """
+        d1 = np.floor(jd1 - 0.5) + 0.5
+        f = (jd1 - d1) + jd2
+        carry = np.floor(f)
+        d1 = np.array(d1 + carry)
+        f = np.array(f - carry)
+        d1.flags.writeable = False
+        f.flags.writeable = False
+        return d1,f
+
+    def _offset(self,secs,scale):
+        """
+        Returns a new :class:`TimeArray` in `scale` that is offset from this one
+        by `secs` seconds and shares its scale cache.
+        """
+        res = TimeArray.__new__(TimeArray)
+        res.jd1,res.jd2 = self._normalize(self.jd1,self.jd2 + secs/86400)
+        res.scale = scale
+        res.dut1 = self.dut1
+        res._scaletimes = self._scaletimes
+        res._derived = {}
+        self._scaletimes[scale] = res
+        return res
+
+    def _step(self,scale):
+        """
+        Converts to an adjacent scale in the ut1-utc-tai-tt-tdb sequence.
+        """
+        fromscale = self.scale
+        if (fromscale,scale) == ('ut1','utc'):
+            return self._offset(-self.dut1,scale)
+        elif (fromscale,scale) == ('utc','ut1'):
+            return self._offset(self.dut1,scale)
+        elif (fromscale,scale) == ('utc','tai'):
+            return self._offset(delta_AT(self.jd),scale)
+        elif (fromscale,scale) == ('tai','utc'):
+            #delta(AT) is a function of UTC, so iterate once
+            dat = delta_AT(self.jd)
+            dat = delta_AT(self.jd - dat/86400)
+            return self._offset(-dat,scale)
+        elif (fromscale,scale) == ('tai','tt'):
+            return self._offset(32.184,scale)
+        elif (fromscale,scale) == ('tt','tai'):
+            return self._offset(-32.184,scale)
+        elif (fromscale,scale) == ('tt','tdb'):
+            return self._offset(_tdb_minus_tt(self.jd),scale)
+        elif (fromscale,scale) == ('tdb','tt'):
+            return self._offset(-_tdb_minus_tt(self.jd),scale)
+        else:
+            raise ValueError('cannot step from %s to %s'%(fromscale,scale))
+
+    def _convert(self,scale):
+        if scale in self._scaletimes:
+            return self._scaletimes[scale]
+        if scale not in self.scales:
+            raise ValueError('invalid time scale '+scale)
+
+        i = self.scales.index(self.scale)
+        j = self.scales.index(scale)
+        t = self
+        for k in (range(i+1,j+1) if j > i else range(i-1,j-1,-1)):
+            s = self.scales[k]
+            t = t._scaletimes[s] if s in t._scaletimes else t._step(s)
+        return t
+
+    def to(self,scale):
+        """
+        Converts these times to another time scale.
+
+        :param str scale: The time scale: 'utc', 'tai', 'tt', 'ut1', or 'tdb'.
+
+        :returns: A :class:`TimeArray` in the requested scale.
+
+        :except ValueError: If the `scale` is invalid.
+        """
+        return self._convert(scale.lower())
+
+    utc = property(lambda self:self._convert('utc'),doc='These times in UTC')
+    tai = property(lambda self:self._convert('tai'),doc='These times in TAI')
+    tt = property(lambda self:self._convert('tt'),doc='These times in TT')
+    ut1 = property(lambda self:self._convert('ut1'),doc='These times in UT1')
+    tdb = property(lambda self:self._convert('tdb'),doc='These times in TDB')
+
+    def _cached(self,name,func):
+        if name not in self._derived:
+            self._derived[name] = func()
+        return self._derived[name]
+
+    @property
+    def jd(self):
+        """
+        The julian dates as a single float array (limited to ~20 microsecond
+        precision).
+        """
+        return self._cached('jd',lambda:self.jd1 + self.jd2)
+
+    @property
+    def mjd(self):
+        """
+        The modified julian dates.
+        """
+        return self._cached('mjd',lambda:(self.jd1 - mjdoffset) + self.jd2)
+
+    @property
+    def epoch(self):
+        """
+        The julian epochs of these times (computed from TT).
+        """
+        return self._cached('epoch',lambda:jd_to_epoch(self.tt.jd))
+
+    @property
+    def gmst(self):
+        """
+        Greenwich mean sidereal time in hours (computed from UT1).
+        """
+        from .coords.funcs import greenwich_sidereal_time
+        return self._cached('gmst',lambda:greenwich_sidereal_time(self.ut1.jd,False))
+
+    @property
+    def gast(self):
+        """
+        Greenwich apparent sidereal time in hours (computed from UT1).
+        """
+        from .coords.funcs import greenwich_sidereal_time
+        return self._cached('gast',lambda:greenwich_sidereal_time(self.ut1.jd,True))
+
+    @property
+    def era(self):
+        """
+        Earth rotation angle in degrees (computed from UT1).
+        """
+        from .coords.funcs import earth_rotation_angle
+        return self._cached('era',lambda:earth_rotation_angle(self.ut1.jd,True))
+
+    def _calendar(self):
+        ymd = jd_to_calendar(self.jd1.ravel(),rounding=0,output='fracarray')
+        secs = self.jd2.ravel()*86400
+        hour = (secs//3600).astype(int)
+        minute = ((secs - hour*3600)//60).astype(int)
+        shape = self.jd1.shape
+        return {'year':ymd[:,0].astype(int).reshape(shape),
+                'month':ymd[:,1].astype(int).reshape(shape),
+                'day':np.round(ymd[:,2]).astype(int).reshape(shape),
+                'hour':hour.reshape(shape),
+                'minute':minute.reshape(shape),
+                'second':(secs - hour*3600 - minute*60).reshape(shape)}
+
+    def _calendarField(name):
+        def getter(self):
+            return self._cached('calendar',self._calendar)[name]
+        return property(getter,doc='Calendar %s in this time scale'%name)
+    year = _calendarField('year')
+    month = _calendarField('month')
+    day = _calendarField('day')
+    hour = _calendarField('hour')
+    minute = _calendarField('minute')
+    second = _calendarField('second')
+    del _calendarField
+
+    @property
+    def shape(self):
+        return self.jd1.shape
+
+    def __len__(self):
+        return len(self.jd1)
+
+    def __getitem__(self,key):
+        dut1 = self.dut1 if self.dut1.shape == () else \
+               np.broadcast_arrays(self.dut1,self.jd1)[0][key]
+        return TimeArray(self.jd1[key],self.jd2[key],self.scale,dut1)
+
+    def __array__(self,dtype=None):
+        return np.asarray(self.jd,dtype=dtype)
+
+    def __repr__(self):
+        return '<TimeArray (%s): %s>'%(self.scale.upper(),self.jd)
 
 
 #<-------------------Site and Observing/Instrumentation-related---------------->
 
+def _refraction_correction(alts,altitude,refraction=True):
+    """
+    Applies the correction for atmospheric refraction (formula from Meeus ch
+    16) to true (airless) altitudes.
+
+    :param alts: The true altitudes in degrees.
+    :type alts: scalar or array-like
+    :param altitude:
+        The altitude of the observer in meters (used to scale the correction by
+        the pressure relative to sea level), or None for sea level.
+    :param refraction:
+        If True, the refraction is computed for a temperature of 273 K.
+        Otherwise, it is taken as the temperature in K.
+
+    :returns:
+        The apparent altitudes in degrees. Altitudes below -1 degree are
+        returned unchanged.
+    """
+    from .constants import g0,Rb
+
+    T = 273 if refraction is True else float(refraction)
+    t0 = 273 #K
+    M = 28.9644 #g/mol
+    alt = 0 if altitude is None else altitude*100 #cm
+    P = np.exp(-g0*M*alt/(Rb*t0)) #relative to sea level
+
+    alts = np.array(alts,dtype=float)
+    #additive correction in arcmin, for altitudes in degrees
+    #for inverse problem of apparent h->true/airless h, use:
+    #R = 1/tan(h0+(7.31/(h0+4.4)))
+    above = alts > -1
+    h = alts[above]
+    R = 1.02/np.tan(np.radians(h + 10.3/(h + 5.11)))
+    alts[above] += R*P*(283/T)/60
+    return alts
+
 
 class Site(object):
     """
@@ -1276,6 +1770,148 @@ class Site(object):
         else:
             return False
 
+    def riseSetTransitArray(self,coords,date=None,alt=-.5667,niter=2):
+        """
+        Computes the rise, set, and transit times of many targets at once.
+
+        This is the array version of :meth:`riseSetTransit`, with the same
+        meaning of `date` and `alt`, but all targets are computed in a single
+        vectorized pass. The estimates from the hour angle at `alt` are then
+        refined iteratively using the apparent sidereal time (and target
+        positions, if they are time-dependent) at the estimated event times.
+
+        :param coords:
+            The target positions as a
+            :class:`~astropysics.coords.LatLongCoordinatesArray`, a sequence of
+            :class:`~astropysics.coords.LatLongCoordinates` objects, or a
+            2-sequence (ra,dec) of arrays in degrees. Alternatively, a callable
+            `coords(jds)` that returns (ra,dec) arrays in degrees for an array
+            of julian dates can be given for moving targets.
+        :param date:
+            The (local) date of the transits - see :func:`calendar_to_jd` for
+            acceptable formats. If None, the current date will be assumed as
+            inferred from :attr:`Site.currentobsjd`
+        :param alt: The altitude for which a target is risen or set in degrees.
+        :param int niter: The number of refinement iterations.
+
+        :returns:
+            (rise,set,transit) as arrays of julian dates (UTC). For circumpolar
+            targets, rise and set are NaN, and for targets that are never
+            visible, all three are NaN. The transits are those that occur during
+            the local date `date`, so the rise and set times may be on the
+            previous/following day.
+
+        """
+        from .coords import greenwich_sidereal_time
+
+        jd,dt = self._processDate(date)
+        utcoffset = dt.replace(tzinfo=self.tz).utcoffset()
+        #JD of local midnight at the start of the date
+        jdmid = dt.date().toordinal() + 1721424.5 - \
+                (utcoffset.days + utcoffset.seconds/86400)
+
+        moving = callable(coords)
+        if moving:
+            ra,dec = coords(np.array([jdmid + 0.5]))
+        else:
+            ra,dec = np.broadcast_arrays(*_icrs_radec_arrays(coords))
+        scalarout = np.shape(ra) == ()
+        ra = np.array(ra,dtype=float).ravel()
+        dec = np.array(dec,dtype=float).ravel()
+
+        rate = 360*1.0027378507871321 #degrees of hour angle per day
+        long = self.longitude.degrees
+        lat = self.latitude.radians
+        h0 = np.radians(alt)
+
+        #the equation of the equinoxes changes by < 1 ms over a day, so use GMST
+        #plus its value at mid-day for apparent sidereal times
+        eqeq = 15*(greenwich_sidereal_time(jdmid + 0.5,True) -
+                   greenwich_sidereal_time(jdmid + 0.5,False))
+        lst0 = greenwich_sidereal_time(jdmid,False)*15 + eqeq + long
+        transit = jdmid + ((ra - lst0)%360)/rate
+
+        coslha = (np.sin(h0) - np.sin(lat)*np.sin(np.radians(dec)))/ \
+                 (np.cos(lat)*np.cos(np.radians(dec)))
+        circumpolar = coslha < -1
+        never = coslha > 1
+        lha = np.degrees(np.arccos(np.clip(coslha,-1,1)))
+        rise = transit - lha/rate
+        set = transit + lha/rate
+
+        for i in range(niter):
+            for t,isrs in ((transit,False),(rise,True),(set,True)):
+                if moving:
+                    ra,dec = [np.array(a,dtype=float).ravel() for a in coords(t)]
+                lst = greenwich_sidereal_time(t,False)*15 + eqeq + long
+                H = np.radians((lst - ra + 180)%360 - 180)
+                if isrs:
+                    #Meeus ch. 15: dt = (h - h0)/(360 cos(dec) cos(lat) sin(H))
+                    decr = np.radians(dec)
+                    h = np.arcsin(np.sin(lat)*np.sin(decr) +
+                                  np.cos(lat)*np.cos(decr)*np.cos(H))
+                    denom = rate*np.cos(decr)*np.cos(lat)*np.sin(H)
+                    ok = (denom != 0) & ~circumpolar & ~never
+                    t[ok] += np.degrees(h[ok] - h0)/denom[ok]
+                else:
+                    t -= np.degrees(H)/rate
+
+        rise[circumpolar | never] = np.nan
+        set[circumpolar | never] = np.nan
+        transit[never] = np.nan
+
+        if scalarout:
+            return rise[0],set[0],transit[0]
+        else:
+            return rise,set,transit
+
+    def nextRiseSetTransitArray(self,coords,jd=None,alt=-.5667,niter=2):
+        """
+        Computes the 'next' rise, set, and transit times of many targets at
+        once. This is the array version of :meth:`nextRiseSetTransit`, and
+        follows the same rules for which events are returned - i.e. for targets
+        on-sky at `jd`, the rise and set bracket `jd`, otherwise all events are
+        in the future (transits only, for circumpolar targets).
+
+        :param coords:
+            The target positions in any of the forms accepted by
+            :meth:`riseSetTransitArray`.
+        :param jd:
+            The (UTC) julian date at which to do the computation, or None for
+            :attr:`Site.currentobsjd`.
+        :param alt: The altitude for which a target is risen or set in degrees.
+        :param int niter:
+            The number of refinement iterations (see
+            :meth:`riseSetTransitArray`).
+
+        :returns:
+            (rise,set,transit) as arrays of julian dates (UTC). For circumpolar
+            targets, rise and set are NaN, and for targets that are never
+            visible, all three are NaN.
+        """
+        if jd is None:
+            jd = self.currentobsjd
+
+        #the yesterday/today/tomorrow (UTC) dates used by nextRiseSetTransit
+        today = np.floor(jd - 0.5) + 0.5
+        r0,s0,t0 = self.riseSetTransitArray(coords,today-1,alt,niter)
+        r1,s1,t1 = self.riseSetTransitArray(coords,today,alt,niter)
+        r2,s2,t2 = self.riseSetTransitArray(coords,today+1,alt,niter)
+
+        circumpolar = np.isnan(r1) & ~np.isnan(t1)
+        #NaN comparisons are False, so never-visible targets get today's NaNs
+        with np.errstate(invalid='ignore'):
+            use0 = ~circumpolar & (jd < s0)
+            use2 = np.where(circumpolar,jd >= t1,~use0 & (jd >= s1))
+        res = []
+        for e0,e1,e2 in ((r0,r1,r2),(s0,s1,s2),(t0,t1,t2)):
+            res.append(np.where(use0,e0,np.where(use2,e2,e1)))
+
+        if np.shape(r1) == ():
+            return tuple([float(e) for e in res])
+        else:
+            return tuple(res)
+
     def apparentCoordinates(self,coords,datetime=None,precess=True,refraction=True):
         """
         computes the positions in horizontal coordinates of an object with the
@@ -1289,10 +1925,12 @@ class Site(object):
         the observation (almost always the right thing to do)
 
         If `refraction` is True, an added correction to the altitude due to
-        atmospheric refraction at STP (formula from Meeus ch 16) is included. If
-        `refraction` is a (non-0) float, it will be taken as the temperature at
-        which to perform the refraction calculation. If it evaluates to False,
-        no refraction correction is performed
+        atmospheric refraction at the pressure for this Site's altitude and a
+        temperature of 273 K (formula from Meeus ch 16) is included. If
+        `refraction` is a (non-0) float, it will be taken as the temperature in
+        K at which to perform the refraction calculation. If it evaluates to
+        False, no refraction correction is performed. This is the same
+        correction as is used by :meth:`altAzGrid`.
 
 
         *returns*
@@ -1317,31 +1955,14 @@ class Site(object):
             res = self.equatorialToHorizontal(coords,lsts)
 
         if refraction:
-            from math import tan,radians
-            if not hasattr(self,'_cached_pressure') or self._cached_pressure is None:
-                from math import exp
-                from.constants import g0,Rb
-                t0 = 273 #K
-                M = 28.9644 #g/mol
-                self._cached_pressure = P = exp(g0*M*self.altitude/(Rb*t0))
-            else:
-                P = self._cached_pressure
-
-            if refraction is True:
-                T = 273
-            else:
-                T  = float(refraction)
             if isinstance(res,list):
                 res_list = res
             else:
                 res_list = [res]
-            for this_res in res_list:
-                h = this_res.alt.radians
-                R = 1.02/tan(h+(10.3/(h+5.11))) #additive correction in arcmin
-                #for inverse problem of apparent h->true/airless h, use:
-                #R = 1/tan(h0+(7.31/(h0+4.4)))
-
-                this_res.alt._decval += radians(R/60.)
+            alts = _refraction_correction([r.alt.d for r in res_list],
+                                          self.altitude,refraction)
+            for this_res,alt in zip(res_list,alts):
+                this_res.alt.d = alt
 
         return res
 
@@ -1359,34 +1980,82 @@ class Site(object):
 
         return jd,jd_to_calendar(jd)
 
-    def nightTable(self,coord,date=None,strtablename=None,localtime=True,
-                            hrrange=(18,6,25)):
+    def altAzGrid(self,coords,jds,precess=True,refraction=True):
         """
-        tabulates altitude, azimuth, and airmass values for the provided fixed
-        position on a particular date, specified either as a datetime.date
-        object, a (yr,mon,day) tuple, or a julain date (will be rounded to
-        nearest)
+        Computes the altitude, azimuth, airmass, and hour angle of many fixed
+        targets at many times. The result is an (N_targets x N_times) grid
+        computed in a single broadcast operation, with the sidereal time
+        computed once for each time.
+
+        :param coords:
+            The target positions as a
+            :class:`~astropysics.coords.LatLongCoordinatesArray`, a
+            :class:`~astropysics.coords.LatLongCoordinates` object or a sequence
+            of them, or a 2-sequence (ra,dec) of ICRS coordinates in degrees.
+        :param jds: The julian dates (UT1) of the times.
+        :type jds: scalar or array-like
+        :param bool precess:
+            If True, the positions will be precessed to the epoch of the first
+            time (almost always the right thing to do).
+        :param refraction:
+            If True, a correction to the altitude for atmospheric refraction at
+            the pressure for this Site's altitude and a temperature of 273 K
+            (formula from Meeus ch 16) is included. If a (non-0) float, it will
+            be taken as the temperature in K. If it evaluates to False, no
+            refraction correction is performed.
+
+        :returns:
+            A record array of shape (N_targets,N_times) with fields 'alt' and
+            'az' (in degrees), 'airmass' (sec(z), negative below the horizon),
+            and 'ha' (hour angle in hours, from -12 to 12).
+        """
+        from .coords import greenwich_sidereal_time,ICRSCoordinates, \
+                            EquatorialCoordinatesEquinox,LatLongCoordinatesArray
 
-        if `date` is None, the current date is used
+        jds = np.array(jds,dtype=float,ndmin=1).ravel()
 
-        If `localtime` is True, the hours output (and input) will be in local
-        time for this Site. Otherwise, it is UTC.
+        if precess:
+            if not isinstance(coords,LatLongCoordinatesArray):
+                ra,dec = np.broadcast_arrays(*_icrs_radec_arrays(coords))
+                coords = LatLongCoordinatesArray(ICRSCoordinates,ra,dec)
+            coords = coords.convert(EquatorialCoordinatesEquinox)
+            coords.epoch = jd_to_epoch(jds[0])
+            ra,dec = coords.long,coords.lat
+        else:
+            ra,dec = np.broadcast_arrays(*_icrs_radec_arrays(coords))
+        ra = np.radians(np.array(ra,dtype=float).ravel())[:,np.newaxis]
+        dec = np.radians(np.array(dec,dtype=float).ravel())[:,np.newaxis]
 
-        `hrrange` determines the size of the table - it should be a 3-tuple
-        (starthr,endhr,n) where starthr is on the day specified in date and
-        endhr is date + 1 day
+        lsts = np.radians(greenwich_sidereal_time(jds,True)*15) + \
+               self.longitude.radians
+        HA = (lsts - ra + pi)%(2*pi) - pi
+        sHA = np.sin(HA)
+        cHA = np.cos(HA)
 
-        if `strtablename` is True, a string is returned with a printable table
-        of observing data.  If `strtable` is a string, it will be used as the
-        title for the table.  Otherwise, a record array is returned with the
-        hour(UTC), alt, az, and airmass
+        sdec = np.sin(dec)
+        cdec = np.cos(dec)
+        slat = np.sin(self.latitude.radians)
+        clat = np.cos(self.latitude.radians)
+
+        alts = np.degrees(np.arcsin(slat*sdec + clat*cdec*cHA))
+        azs = np.degrees(np.arctan2(-cdec*sHA,clat*sdec - slat*cdec*cHA)%(2*pi))
+
+        if refraction:
+            alts = _refraction_correction(alts,self.altitude,refraction)
+
+        airmass = 1/np.cos(np.radians(90 - alts))
+
+        return np.rec.fromarrays((alts,azs,airmass,np.degrees(HA)/15),
+                                 names='alt,az,airmass,ha')
+
+    def _nightGrid(self,coords,date,hrrange,localtime):
         """
-        from .astropysics import coords
-        import datetime
+        Computes the :meth:`altAzGrid` over a night for :meth:`nightTable` and
+        :meth:`nightPlot`.
 
-        #for objects that can get a position with no argument
-        if hasattr(coord,'equatorialCoordinates'):
-            coord = coord.equatorialCoordinates()
+        :returns: timehr,grid,date,utcoffset,starthr
+        """
+        import datetime
 
         if date is None:
             jd = self.currentobsjd
@@ -1415,13 +2084,41 @@ class Site(object):
 
         timehr = (jds-np.round(np.mean(jds))+.5)*24+utcoffset #UTC hr
 
+        grid = self.altAzGrid(coords,jds,precess=False)
+
+        return timehr,grid,date,utcoffset,starthr
+
+    def nightTable(self,coord,date=None,strtablename=None,localtime=True,
+                            hrrange=(18,6,25)):
+        """
+        tabulates altitude, azimuth, and airmass values for the provided fixed
+        position on a particular date, specified either as a datetime.date
+        object, a (yr,mon,day) tuple, or a julain date (will be rounded to
+        nearest)
+
+        if `date` is None, the current date is used
+
+        If `localtime` is True, the hours output (and input) will be in local
+        time for this Site. Otherwise, it is UTC.
 
-        alt,az = coords.objects_to_coordinate_arrays(self.apparentCoordinates(coord,jds,precess=False))
+        `hrrange` determines the size of the table - it should be a 3-tuple
+        (starthr,endhr,n) where starthr is on the day specified in date and
+        endhr is date + 1 day
+
+        if `strtablename` is True, a string is returned with a printable table
+        of observing data.  If `strtable` is a string, it will be used as the
+        title for the table.  Otherwise, a record array is returned with the
+        hour(UTC), alt, az, and airmass
+        """
+        import datetime
 
-        z = 90 - alt
-        airmass = 1/np.cos(np.radians(z))
+        #for objects that can get a position with no argument
+        if hasattr(coord,'equatorialCoordinates'):
+            coord = coord.equatorialCoordinates()
 
-        ra = np.rec.fromarrays((timehr,alt,az,airmass),names = 'hour,alt,az,airmass')
+        timehr,grid,date,utcoffset,starthr = self._nightGrid(coord,date,hrrange,localtime)
+        ra = np.rec.fromarrays((timehr,grid.alt[0],grid.az[0],grid.airmass[0]),
+                               names = 'hour,alt,az,airmass')
 
 
         if strtablename is not None:
@@ -1431,7 +2128,7 @@ class Site(object):
 
             if isinstance(strtablename,basestring):
                 lines.append('Object:'+str(strtablename))
-            lines.append('{0} {1}'.format(coord.ra.getHmsStr(),coord.dec.getDmsStr()))
+            lines.append(u'{0} {1}'.format(coord.ra.getHmsStr(),coord.dec.getDmsStr()))
             lines.append(str(date))
             if transit is None:
                 lines.append('Not visible from this site!')
@@ -1535,6 +2232,9 @@ class Site(object):
         elif plotkwargs is None:
             plotkwargs = [None for c in coords]
 
+        #for objects that can get a position with no argument
+        coords = [c.equatorialCoordinates() if hasattr(c,'equatorialCoordinates')
+                  else c for c in coords]
 
         with mpl_context(clf=clf) as plt:
             oldright = None
@@ -1543,23 +2243,23 @@ class Site(object):
                     oldright = plt.gcf().subplotpars.right
                     plt.subplots_adjust(right=0.86)
 
-                for n,c,kw in zip(names,coords,plotkwargs):
-                    ra = self.nightTable(c,date,hrrange=(12,12,100),localtime=True)
+                hours,grid,sitedate = self._nightGrid(coords,date,(12,12,100),True)[:3]
+                for n,alt,am,kw in zip(names,grid.alt,grid.airmass,plotkwargs):
                     if kw is None:
                         kw = {}
                     kw.setdefault('label',n)
                     kw.setdefault('zorder',3)
                     kw.setdefault('lw',2)
                     if plottype == 'am':
-                        ammask = ra.airmass>0
-                        x = ra.hour[ammask]
-                        y = ra.airmass[ammask]
+                        ammask = am>0
+                        x = hours[ammask]
+                        y = am[ammask]
                     else:
-                        x = ra.hour
-                        y = ra.alt
+                        x = hours
+                        y = alt
                     plt.plot(x,y,**kw)
 
-                plt.title(str(ra.sitedate))
+                plt.title(str(sitedate))
 
                 if 'alt' in plottype:
                     if plt.ylim()[0] < 0:
@@ -1587,7 +2287,7 @@ class Site(object):
                     plt.legend(loc=0)
 
                 if sun:
-                    seqp = Sun(ra.sitedate).equatorialCoordinates()
+                    seqp = Sun(sitedate).equatorialCoordinates()
                     rise,set,t = self.riseSetTransit(seqp,date,0)
                     rise12,set12,t12 = self.riseSetTransit(seqp,date,-12)
                     rise18,set18,t18 = self.riseSetTransit(seqp,date,-18)
@@ -1617,7 +2317,7 @@ class Site(object):
                     xls = plt.xlim()
                     yls = plt.ylim()
 
-                    m = Moon(ra.sitedate)
+                    m = Moon(sitedate)
                     ram = self.nightTable(m,date,hrrange=(12,12,100),localtime=True)
                     if not isMappingType(moon):
                         moon = {}
@@ -1662,20 +2362,19 @@ class Site(object):
 
 
             elif plottype == 'altaz':
-                for n,c,kw in zip(names,coords,plotkwargs):
-                    ra = self.nightTable(c,date,hrrange=(0,0,100))
-
+                grid,sitedate = self._nightGrid(coords,date,(0,0,100),True)[1:3]
+                for n,alt,az,kw in zip(names,grid.alt,grid.az,plotkwargs):
                     if kw is None:
-                        plt.plot(ra.az,ra.alt,label=n)
+                        plt.plot(az,alt,label=n)
                     else:
                         kw['label'] = n
-                        plt.plot(ra.az,ra.alt,**kw)
+                        plt.plot(az,alt,**kw)
 
                 plt.xlim(0,360)
                 plt.xticks(np.arange(9)*360/8)
                 plt.ylim(0,90)
 
-                plt.title(str(ra.sitedate))
+                plt.title(str(sitedate))
                 plt.xlabel(r'${\rm azimuth} [{\rm degrees}]$')
                 plt.ylabel(r'${\rm altitude} [{\rm degrees}]$')
 
@@ -1683,14 +2382,13 @@ class Site(object):
                     plt.legend(loc=0)
 
             elif plottype == 'sky':
-                for n,c,kw in zip(names,coords,plotkwargs):
-
-                    ra = self.nightTable(c,date,hrrange=(0,0,100))
+                grid,sitedate = self._nightGrid(coords,date,(0,0,100),True)[1:3]
+                for n,alt,az,kw in zip(names,grid.alt,grid.az,plotkwargs):
                     if kw is None:
-                        plt.polar(np.radians(ra.az),90-ra.alt,label=n)
+                        plt.polar(np.radians(az),90-alt,label=n)
                     else:
                         kw['label'] = n
-                        plt.polar(np.radians(ra.az),90-ra.alt,**kw)
+                        plt.polar(np.radians(az),90-alt,**kw)
 
                 xticks = [0,45,90,135,180,225,270,315]
                 xtlabs = ['N',r'$45^\circ$','E',r'$135^\circ$','S',r'$225^\circ$','W',r'$315^\circ$']
@@ -1699,7 +2397,7 @@ class Site(object):
                 yticks = [15,30,45,60,75]
                 plt.yticks(yticks,[r'${0}^\circ$'.format(int(90-yt)) for yt in yticks])
 
-                plt.title(str(ra.sitedate))
+                plt.title(str(sitedate))
 
                 if not nonames:
                     plt.legend(loc=0)
@@ -1761,12 +2459,23 @@ class Site(object):
             center = 0
         cp12 = center + 12
 
+        #rise/set/transit for all objects at once, as (n x Nobjects) arrays
+        coords = [c.equatorialCoordinates() if hasattr(c,'equatorialCoordinates')
+                  else c for c in coords]
+        rsts = [self.riseSetTransitArray(coords,jd,0) for jd in jds]
+        rises,sets,transits = [np.array(a,ndmin=2) for a in zip(*rsts)]
+        if utc:
+            offs = 0
+        else:
+            offs = [jd_to_calendar(jd).replace(tzinfo=self.tz).utcoffset() for jd in jds]
+            offs = np.array([o.days*24 + o.seconds/3600 for o in offs])[:,np.newaxis]
+        rises,sets,transits = [((a - 0.5)*24 + offs)%24 for a in (rises,sets,transits)]
+
         with mpl_context(clf=clf) as plt:
             if colors:
                 plt.gca().set_color_cycle(colors)
-            for c,nm in zip(coords,names):
-                rst = [self.riseSetTransit(c,jd_to_calendar(jd),0,utc=utc) for jd in jds]
-                rise,set,transit = np.array(rst).T
+            for i,nm in enumerate(names):
+                rise,set,transit = rises[:,i],sets[:,i],transits[:,i]
                 transit[transit>cp12] -= 24 #do this to get the plot to cross over night time
 
                 c = plt.gca()._get_lines.color_cycle.next()
@@ -1919,6 +2628,237 @@ sites['greenwich'] = Site('51d28m38s',0,7,0,'Royal Observatory,Greenwich')
 __loadobsdb(sites)
 
 
+#<-------------Barycentric/heliocentric time and velocity corrections---------->
+
+def _icrs_radec_arrays(coords):
+    """
+    Converts `coords` to arrays of ICRS RA and Dec in degrees. `coords` can be
+    a :class:`~astropysics.coords.LatLongCoordinatesArray`, a
+    :class:`~astropysics.coords.LatLongCoordinates` object or a sequence of
+    them, or a 2-sequence (ra,dec) of ICRS RA and Dec in degrees.
+    """
+    from .coords import ICRSCoordinates,LatLongCoordinates,LatLongCoordinatesArray
+
+    if isinstance(coords,LatLongCoordinates):
+        if not isinstance(coords,ICRSCoordinates):
+            coords = coords.convert(ICRSCoordinates)
+        return np.array(coords.ra.d),np.array(coords.dec.d)
+    elif not isinstance(coords,LatLongCoordinatesArray) and len(coords)>0 and \
+         isinstance(coords[0],LatLongCoordinates):
+        coords = LatLongCoordinatesArray.fromObjects(coords,ICRSCoordinates)
+
+    if isinstance(coords,LatLongCoordinatesArray):
+        if coords.coordsys is not ICRSCoordinates:
+            coords = coords.convert(ICRSCoordinates)
+        return coords.long,coords.lat
+    else:
+        ra,dec = coords
+        return np.array(ra,dtype=float),np.array(dec,dtype=float)
+
+def _site_gcrs_pos_vel(site,jds):
+    """
+    Computes the position (in cm) and velocity (in km/s) of `site` relative to
+    the geocenter in GCRS-aligned coordinates. Polar motion and UT1-UTC are
+    ignored.
+
+    :returns: pos,vel as 3xN arrays
+    """
+    from .constants import Rea,Reb
+    from .coords.funcs import earth_rotation_angle
+    from .coords.coordsys import _pn_cache
+
+    #ITRS position on the WGS84 ellipsoid
+    lat,long = site.latitude.radians,site.longitude.radians
+    alt = 0 if site.altitude is None else site.altitude*100
+    esq = 1 - (Reb/Rea)**2
+    N = Rea/(1 - esq*np.sin(lat)**2)**0.5
+    rxy = (N + alt)*np.cos(lat)
+    z = (N*(1 - esq) + alt)*np.sin(lat)
+
+    #rotate to CIRS using the earth rotation angle
+    era = earth_rotation_angle(jds,False) + long
+    x,y = rxy*np.cos(era),rxy*np.sin(era)
+    omega = 2*pi*1.00273781191135448/86400 #rad/s
+    pos = np.array((x,y,z*np.ones_like(x)))
+    vel = np.array((-omega*y,omega*x,np.zeros_like(x)))*1e-5 #cm/s->km/s
+
+    #CIRS->GCRS - precession-nutation is evaluated at ~0.1 day resolution
+    days,inv = np.unique(np.round(np.asarray(jds)*10),return_inverse=True)
+    CT = _pn_cache.compute(jd_to_epoch(days/10))[2][inv].transpose(0,2,1)
+    pos = np.einsum('nij,jn->in',CT,pos)
+    vel = np.einsum('nij,jn->in',CT,vel)
+
+    return pos,vel
+
+def barycentric_correction(jds,coords,site=None,heliocentric=False):
+    """
+    Computes barycentric (or heliocentric) julian dates and radial velocity
+    corrections for observations of targets at the given times. The inputs are
+    broadcast against each other, so this can be used for many observations of
+    one target, or one observation each of many targets.
+
+    The time correction is the light-travel time (Roemer delay) from the
+    observer to the solar system barycenter (or the sun's center) projected
+    along the direction to the target. The velocity correction is the
+    projection of the observer's velocity (Earth's orbital motion plus
+    rotation) towards the target. Earth positions are from
+    :func:`astropysics.coords.ephems.earth_pos_vel`, evaluated in TT (TDB and
+    TT differ by less than 2 ms, which is negligible here).
+
+    :param jds: The julian dates (UTC) of the observations.
+    :type jds: scalar or array-like
+    :param coords:
+        The target position(s), either as
+        :class:`~astropysics.coords.LatLongCoordinates` object(s), a
+        :class:`~astropysics.coords.LatLongCoordinatesArray`, or a 2-sequence
+        (ra,dec) of ICRS coordinates in degrees.
+    :param site:
+        The :class:`Site` of the observations, or None to compute corrections
+        for an observer at the geocenter.
+    :param bool heliocentric:
+        If True, the corrections are relative to the center of the sun instead
+        of the solar system barycenter.
+
+    :returns:
+        (bjds,rvcorrs) where `bjds` are the barycentric (or heliocentric)
+        julian dates, in the same time scale as `jds` (i.e. BJD_UTC), and
+        `rvcorrs` are the velocity corrections in km/s, to be
+        *added* to the measured radial velocities.
+    """
+    from .constants import c,cmperau
+    from .coords.ephems import earth_pos_vel
+
+    ra,dec = _icrs_radec_arrays(coords)
+    jds,ra,dec = np.broadcast_arrays(np.array(jds,dtype=float),ra,dec)
+    scalar = jds.shape==()
+    jds,ra,dec = [np.ravel(a) for a in (jds,ra,dec)]
+
+    #the ephemeris is in TT, while the site rotation uses UTC in place of UT1
+    pos,vel = earth_pos_vel(jds + delta_AT(jds,True)/86400,
+                            barycentric=not heliocentric)
+    pos = pos*cmperau
+    if site is not None:
+        spos,svel = _site_gcrs_pos_vel(site,jds)
+        pos += spos
+        vel += svel
+
+    #unit vector towards the target
+    ra,dec = np.radians(ra),np.radians(dec)
+    n = np.array((np.cos(dec)*np.cos(ra),np.cos(dec)*np.sin(ra),np.sin(dec)))
+
+    delay = np.sum(pos*n,axis=0)/c #seconds
+    bjds = jds + delay/86400
+    rvcorrs = np.sum(vel*n,axis=0)
+
+    if scalar:
+        return bjds[0],rvcorrs[0]
+    else:
+        return bjds,rvcorrs
+
+class BarycentricCorrector(object):
+    """
+    Computes barycentric (or heliocentric) julian dates and radial velocity
+    corrections for large numbers of observations (see
+    :func:`barycentric_correction` for the details of the corrections).
+
+    For each distinct target and night, the corrections are computed exactly on
+    a grid of times that spans the night and stored in an LRU cache. The
+    corrections for individual observations are then interpolated from that
+    grid with cubic splines. With the default hourly grid, the interpolation
+    errors are around 1 cm/s in velocity, and below the resolution of double
+    precision julian dates (~40 microseconds) in time.
+
+    **Examples**
+
+    >>> bc = BarycentricCorrector(sites['greenwich'])
+    >>> bjds,rvs = bc([2455197.5,2455197.6],(10.68,41.27))
+    >>> print '%.2f'%rvs[0]
+    -24.34
+
+    """
+    def __init__(self,site=None,heliocentric=False,nodespacing=1/24.,cachesize=1024):
+        """
+        :param site:
+            The :class:`Site` of the observations, or None to compute
+            corrections for an observer at the geocenter.
+        :param bool heliocentric:
+            If True, the corrections are relative to the center of the sun
+            instead of the solar system barycenter.
+        :param nodespacing: The spacing of the grid of exact corrections in days.
+        :param int cachesize: The maximum number of (target,night) pairs cached.
+        """
+        from .utils import LRUCache
+
+        self.site = site
+        self.heliocentric = heliocentric
+        self.nodespacing = nodespacing
+        self._cache = LRUCache(cachesize)
+
+    def clear(self):
+        """
+        Clears the cache of (target,night) corrections.
+        """
+        self._cache.clear()
+
+    def _nights(self,jds):
+        """
+        The night number for each jd - nights run from local noon to noon.
+        """
+        long = 0 if self.site is None else self.site.longitude.degrees
+        return np.floor(jds + long/360)
+
+    def _nightSplines(self,ra,dec,night):
+        """
+        Gets the (delay,rv) interpolating splines for a target and night.
+        """
+        from scipy.interpolate import InterpolatedUnivariateSpline
+
+        key = (ra,dec,night,self.site,self.heliocentric,self.nodespacing)
+        if key in self._cache:
+            return self._cache[key]
+
+        long = 0 if self.site is None else self.site.longitude.degrees
+        start = night - long/360
+        nnodes = int(np.ceil(1/self.nodespacing))
+        #extend a node past each end of the night
+        nodes = start + np.arange(-1,nnodes+2)*(1/nnodes)
+        bjds,rvs = barycentric_correction(nodes,(ra,dec),self.site,self.heliocentric)
+        splines = (InterpolatedUnivariateSpline(nodes,(bjds-nodes)*86400),
+                   InterpolatedUnivariateSpline(nodes,rvs))
+        self._cache[key] = splines
+        return splines
+
+    def __call__(self,jds,coords):
+        """
+        Computes the corrections for observations at the times `jds` of the
+        target(s) `coords` - see :func:`barycentric_correction` for the input
+        and output formats.
+        """
+        from .coords.coordsys import _group_epochs
+
+        ra,dec = _icrs_radec_arrays(coords)
+        jds,ra,dec = np.broadcast_arrays(np.array(jds,dtype=float),ra,dec)
+        scalar = jds.shape==()
+        jds,ra,dec = [np.ravel(a) for a in (jds,ra,dec)]
+
+        keys,inv = _group_epochs(ra,dec,self._nights(jds))
+        delays = np.empty(len(jds))
+        rvcorrs = np.empty(len(jds))
+        order = np.argsort(inv,kind='mergesort')
+        bounds = np.searchsorted(inv[order],np.arange(len(keys)+1))
+        for i,key in enumerate(keys):
+            idx = order[bounds[i]:bounds[i+1]]
+            dspl,rvspl = self._nightSplines(*[float(k) for k in key])
+            delays[idx] = dspl(jds[idx])
+            rvcorrs[idx] = rvspl(jds[idx])
+        bjds = jds + delays/86400
+
+        if scalar:
+            return bjds[0],rvcorrs[0]
+        else:
+            return bjds,rvcorrs
+
+
 #<-----------------Attenuation/Reddening and dust-related---------------------->
 
 class Extinction(object):
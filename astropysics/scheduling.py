@@ -0,0 +1,436 @@
+#Copyright 2008 Erik Tollerud
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+
+========================================================
+scheduling -- planning the observations for a night
+========================================================
+
+The :mod:`scheduling` module contains tools for choosing the order in which a
+list of targets are observed from a :class:`~astropysics.obstools.Site` during
+a night. A :class:`Scheduler` computes the positions of all the targets, the
+Sun, and the Moon on a grid of times spanning the night in a few vectorized
+operations, combines any number of :class:`Constraint` objects into a single
+(targets x times) grid of allowed observations, and then generates a plan
+from those grids.
+
+**Examples**
+
+Schedule a set of random targets with 10-minute exposures, requiring airmass
+below 2 and a distance of at least 30 degrees from the Moon::
+
+    import numpy as np
+    from astropysics.obstools import sites
+    from astropysics.scheduling import Scheduler,AirmassConstraint,\\
+                                       MoonSeparationConstraint
+
+    ras,decs = np.random.rand(2000)*360,np.random.rand(2000)*120-60
+    sched = Scheduler(sites['kpno'],(ras,decs),priorities=np.random.rand(2000),
+                      exptimes=600,constraints=[AirmassConstraint(2),
+                                                MoonSeparationConstraint(30)])
+    sched.setNight((2012,3,20))
+    plan = sched.schedule()
+    print plan.name,plan.start,plan.airmass
+
+
+Classes and Inheritance Structure
+---------------------------------
+
+.. inheritance-diagram:: astropysics.scheduling
+   :parts: 1
+
+Module API
+----------
+
+"""
+
+from __future__ import division,with_statement
+import numpy as np
+
+
+def _rect_to_radec(x,y,z):
+    """
+    Converts cartesian coordinate arrays to (ra,dec) in degrees.
+    """
+    ra = np.degrees(np.arctan2(y,x))%360
+    dec = np.degrees(np.arctan2(z,np.hypot(x,y)))
+    return ra,dec
+
+def sun_positions(jds):
+    """
+    Computes the geocentric (GCRS) positions of the Sun.
+
+    :param jds: The julian dates (TT) at which to compute the positions.
+    :type jds: array-like
+
+    :returns: (ra,dec) arrays in degrees.
+    """
+    from .coords.ephems import earth_pos_vel
+
+    pos = earth_pos_vel(np.array(jds,dtype=float,ndmin=1),False)[0]
+    return _rect_to_radec(*-pos)
+
+def moon_positions(jds,site=None):
+    """
+    Computes the positions of the Moon.
+
+    :param jds: The julian dates (TT) at which to compute the positions.
+    :type jds: array-like
+    :param site:
+        A :class:`~astropysics.obstools.Site` for which to compute the
+        topocentric position, or None for the geocentric position. The
+        rotation of the Earth for the site position uses UTC in place of UT1.
+
+    :returns: (ra,dec) arrays in degrees (GCRS axes).
+    """
+    from .constants import aupercm
+    from .coords.ephems import Moon
+    from .obstools import _site_gcrs_pos_vel,delta_AT
+
+    jds = np.array(jds,dtype=float,ndmin=1)
+    rc = Moon()(jds,asarray=True)
+    pos = np.array((rc.x,rc.y,rc.z)) #AU
+    if site is not None:
+        #TT->UTC - delta_AT with TT input only differs right at a leap second
+        jdutcs = jds - delta_AT(jds,True)/86400
+        pos = pos - _site_gcrs_pos_vel(site,jdutcs)[0]*aupercm
+    return _rect_to_radec(*pos)
+
+def _altitudes(site,jds,ra,dec):
+    """
+    Altitudes in degrees for positions (ra,dec) in degrees with the same shape
+    as `jds` in the true equator and equinox of date.
+    """
+    from .coords import greenwich_sidereal_time
+
+    H = np.radians(greenwich_sidereal_time(jds,True)*15 - ra) + \
+        site.longitude.radians
+    lat = site.latitude.radians
+    dec = np.radians(dec)
+    return np.degrees(np.arcsin(np.sin(lat)*np.sin(dec) +
+                                np.cos(lat)*np.cos(dec)*np.cos(H)))
+
+def _to_date(ra,dec,epoch):
+    """
+    Rotates GCRS (ra,dec) in degrees to the true equator and equinox of
+    `epoch`.
+    """
+    from .coords.coordsys import _pn_cache
+
+    ra,dec = np.radians(ra),np.radians(dec)
+    xyz = np.array((np.cos(dec)*np.cos(ra),np.cos(dec)*np.sin(ra),np.sin(dec)))
+    return _rect_to_radec(*np.dot(_pn_cache.get(epoch)[1].A,xyz))
+
+
+class Constraint(object):
+    """
+    Base class for scheduling constraints. A constraint is called with a
+    :class:`Scheduler` (after :meth:`Scheduler.setNight`) and returns a
+    boolean array that is True where an observation is allowed. The array must
+    be broadcastable to (Ntargets,Ntimes) - i.e. it can be (Ntargets,Ntimes),
+    (Ntargets,1) for constraints that only depend on the target, or (Ntimes,)
+    for those that only depend on time.
+
+    Any callable with this signature can be used as a constraint - subclasses
+    of this class only need to override :meth:`allowed`.
+    """
+    def __call__(self,scheduler):
+        return self.allowed(scheduler)
+
+    def allowed(self,scheduler):
+        """
+        Computes where observations are allowed.
+
+        :param scheduler: The :class:`Scheduler` to compute the constraint for.
+
+        :returns: A boolean array broadcastable to (Ntargets,Ntimes).
+        """
+        raise NotImplementedError
+
+
+class AltitudeConstraint(Constraint):
+    """
+    Requires targets to be within a range of altitudes.
+    """
+    def __init__(self,minalt=30,maxalt=90):
+        """
+        :param minalt: The minimum altitude in degrees.
+        :param maxalt: The maximum altitude in degrees.
+        """
+        self.minalt = minalt
+        self.maxalt = maxalt
+
+    def allowed(self,scheduler):
+        alt = scheduler.grid.alt
+        return (alt >= self.minalt) & (alt <= self.maxalt)
+
+
+class AirmassConstraint(Constraint):
+    """
+    Requires targets to be below a maximum airmass.
+    """
+    def __init__(self,maxairmass=2):
+        """
+        :param maxairmass: The maximum airmass (sec(z)).
+        """
+        self.maxairmass = maxairmass
+
+    def allowed(self,scheduler):
+        am = scheduler.grid.airmass
+        return (am >= 1) & (am <= self.maxairmass)
+
+
+class MoonSeparationConstraint(Constraint):
+    """
+    Requires targets to be a minimum angular distance from the Moon.
+    """
+    def __init__(self,minsep=30,ignorebelow=True):
+        """
+        :param minsep: The minimum separation from the Moon in degrees.
+        :param bool ignorebelow:
+            If True, any separation is allowed while the Moon is below the
+            horizon.
+        """
+        self.minsep = minsep
+        self.ignorebelow = ignorebelow
+
+    def allowed(self,scheduler):
+        res = scheduler.moonsep >= self.minsep
+        if self.ignorebelow:
+            res |= scheduler.moonalt < 0
+        return res
+
+
+class Scheduler(object):
+    """
+    Schedules observations of a list of targets from a
+    :class:`~astropysics.obstools.Site` over a night.
+
+    :meth:`setNight` computes grids of the target altitudes, azimuths, and
+    airmasses (see :meth:`~astropysics.obstools.Site.altAzGrid`), the Sun and
+    Moon altitudes, and the separation of each target from the Moon over a
+    grid of times covering the night with the Sun below the :attr:`twilight`
+    altitude. The :attr:`constraints` are then evaluated on those grids, and
+    :meth:`schedule` generates a plan.
+    """
+    def __init__(self,site,targets,priorities=1,exptimes=600,names=None,
+                      constraints=None,timestep=300,overhead=0,twilight=-12):
+        """
+        :param site: The :class:`~astropysics.obstools.Site` of the observations.
+        :param targets:
+            The target positions as a
+            :class:`~astropysics.coords.LatLongCoordinatesArray`, a sequence of
+            :class:`~astropysics.coords.LatLongCoordinates` objects, or a
+            2-sequence (ra,dec) of arrays of ICRS coordinates in degrees.
+        :param priorities:
+            The priority of each target (or one for all of them). Larger values
+            are more important.
+        :type priorities: scalar or array-like
+        :param exptimes:
+            The exposure time for each target (or one for all of them) in
+            seconds.
+        :type exptimes: scalar or array-like
+        :param names:
+            A sequence of names for the targets, or None to use their indecies.
+        :param constraints:
+            A sequence of :class:`Constraint` objects or callables with the
+            same signature, or None for no constraints other than the target
+            being above the horizon.
+        :param timestep: The spacing of the time grid in seconds.
+        :param overhead: The time in seconds to add to each exposure.
+        :param twilight:
+            The altitude of the Sun in degrees that marks the start and end of
+            the night.
+        """
+        from .obstools import _icrs_radec_arrays
+
+        ra,dec = np.broadcast_arrays(*_icrs_radec_arrays(targets))
+        self.ra = np.array(ra,dtype=float).ravel()
+        self.dec = np.array(dec,dtype=float).ravel()
+        ntargets = len(self.ra)
+
+        self.site = site
+        self.priorities = np.array(priorities,dtype=float)*np.ones(ntargets)
+        self.exptimes = np.array(exptimes,dtype=float)*np.ones(ntargets)
+        if names is None:
+            names = [str(i) for i in range(ntargets)]
+        elif len(names) != ntargets:
+            raise ValueError("names and targets don't match in size")
+        self.names = np.array(names)
+        self.constraints = [] if constraints is None else list(constraints)
+        self.timestep = timestep
+        self.overhead = overhead
+        self.twilight = twilight
+
+        self.jds = None
+        self._allowed = None
+
+    def __len__(self):
+        return len(self.ra)
+
+    def addConstraint(self,constraint):
+        """
+        Adds a constraint to this scheduler.
+
+        :param constraint:
+            A :class:`Constraint` object or a callable with the same signature.
+        """
+        self.constraints.append(constraint)
+        self._allowed = None
+
+    def setNight(self,date=None):
+        """
+        Computes the grids of target, Sun, and Moon positions for a night.
+
+        :param date:
+            The local date on which the night starts - see
+            :func:`~astropysics.obstools.calendar_to_jd` for acceptable formats.
+            If None, the current date will be assumed as inferred from
+            :attr:`Site.currentobsjd`.
+
+        :except ValueError: If the Sun never sets below :attr:`twilight`.
+        """
+        from .obstools import jd_to_epoch,delta_AT
+
+        jd,dt = self.site._processDate(date)
+        utcoffset = dt.replace(tzinfo=self.site.tz).utcoffset()
+        #local noon to noon
+        jdnoon = dt.date().toordinal() + 1721425 - \
+                 (utcoffset.days + utcoffset.seconds/86400)
+        jds = jdnoon + np.arange(0,1,self.timestep/86400)
+        epoch = jd_to_epoch(jdnoon + 0.5)
+        #the grid is in UTC, but the Sun and Moon ephemerides need TT
+        jdtts = jds + delta_AT(jds,True)/86400
+
+        sunalt = _altitudes(self.site,jds,*_to_date(*sun_positions(jdtts),epoch=epoch))
+        night = np.where(sunalt < self.twilight)[0]
+        if len(night) == 0:
+            raise ValueError('Sun does not set below %s degrees on %s'%(self.twilight,dt.date()))
+        tslice = slice(night[0],night[-1]+1)
+
+        self.jds = jds = jds[tslice]
+        self.sunalt = sunalt[tslice]
+
+        mra,mdec = moon_positions(jdtts[tslice],self.site)
+        self.moonalt = _altitudes(self.site,jds,*_to_date(mra,mdec,epoch))
+
+        self.grid = self.site.altAzGrid((self.ra,self.dec),jds)
+
+        #target-Moon separations from unit vector dot products
+        ra,dec = np.radians(self.ra),np.radians(self.dec)
+        tvecs = np.array((np.cos(dec)*np.cos(ra),np.cos(dec)*np.sin(ra),np.sin(dec))).T
+        mra,mdec = np.radians(mra),np.radians(mdec)
+        mvecs = np.array((np.cos(mdec)*np.cos(mra),np.cos(mdec)*np.sin(mra),np.sin(mdec)))
+        self.moonsep = np.degrees(np.arccos(np.clip(np.dot(tvecs,mvecs),-1,1)))
+
+        self._allowed = None
+
+    @property
+    def allowed(self):
+        """
+        A boolean (Ntargets,Ntimes) array that is True where the target is
+        above the horizon and all constraints are satisfied.
+        """
+        if self.jds is None:
+            raise ValueError('setNight has not been called for this scheduler')
+        if self._allowed is None:
+            allowed = self.grid.alt > 0
+            for c in self.constraints:
+                allowed &= c(self)
+            self._allowed = allowed
+        return self._allowed
+
+    def _runLengths(self):
+        """
+        Computes the number of consecutive allowed time steps starting at each
+        time for each target.
+        """
+        allowed = self.allowed
+        runs = np.zeros((allowed.shape[0],allowed.shape[1]+1),dtype=int)
+        for i in range(allowed.shape[1]-1,-1,-1):
+            runs[:,i] = (runs[:,i+1] + 1)*allowed[:,i]
+        return runs[:,:-1]
+
+    def _bestAirmass(self,lookahead):
+        """
+        Computes the best allowed airmass in the `lookahead` time steps after
+        each time.
+        """
+        am = np.where(self.allowed,self.grid.airmass,np.inf)
+        if lookahead is None:
+            return np.minimum.accumulate(am[:,::-1],axis=1)[:,::-1]
+        else:
+            best = am.copy()
+            for i in range(1,lookahead+1):
+                np.minimum(best[:,:-i],am[:,i:],best[:,:-i])
+            return best
+
+    def schedule(self,lookahead=None):
+        """
+        Generates an observing plan for the night.
+
+        Starting at the beginning of the night, the plan is generated by
+        choosing the target with the highest merit among those that are not
+        yet scheduled and are allowed for the whole exposure, then moving on to
+        the end of that exposure (or to the next time step if no targets are
+        available). The merit is the priority of the target scaled by the ratio
+        of the best airmass it reaches in the lookahead period to its current
+        airmass - i.e. targets are deferred if they will be at much lower
+        airmass later. Ties are broken in favor of lower airmass.
+
+        :param lookahead:
+            The lookahead period in hours, or None to look ahead to the end of
+            the night. If 0, targets are chosen purely on priority.
+
+        :returns:
+            A record array with one entry per scheduled observation in time
+            order, with fields 'target' (the index of the target), 'name',
+            'start' and 'end' (julian dates, UTC), 'alt', 'airmass', and
+            'priority' (at the start of the exposure).
+
+        :except ValueError: If :meth:`setNight` has not yet been called.
+        """
+        if self.jds is None:
+            raise ValueError('setNight has not been called for this scheduler')
+
+        nt = len(self.jds)
+        nsteps = np.ceil((self.exptimes + self.overhead)/self.timestep).astype(int)
+        nsteps[nsteps < 1] = 1
+        runs = self._runLengths()
+        if lookahead is not None:
+            lookahead = int(round(lookahead*3600/self.timestep))
+        bestam = self._bestAirmass(lookahead)
+        am = self.grid.airmass
+
+        done = np.zeros(len(self),dtype=bool)
+        obs = []
+        i = 0
+        while i < nt:
+            cands = np.where(~done & (runs[:,i] >= nsteps))[0]
+            if len(cands) == 0:
+                i += 1
+                continue
+            merit = self.priorities[cands]*bestam[cands,i]/am[cands,i]
+            k = cands[np.lexsort((am[cands,i],-merit))[0]]
+            obs.append((k,i))
+            done[k] = True
+            i += nsteps[k]
+
+        ks,iss = np.array(obs,dtype=int).reshape(len(obs),2).T
+        starts = self.jds[iss]
+        ends = starts + (self.exptimes[ks] + self.overhead)/86400
+        return np.rec.fromarrays((ks,self.names[ks],starts,ends,self.grid.alt[ks,iss],
+                                  am[ks,iss],self.priorities[ks]),
+                                 names='target,name,start,end,alt,airmass,priority')
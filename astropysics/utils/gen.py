@@ -224,6 +224,67 @@ class _LinkedDict(dict):
             return default
         
         
+class LRUCache(MutableMapping):
+    """
+    A dict-like object that holds at most :attr:`maxsize` items. When a new item
+    is added to a full cache, the least-recently used (accessed or set) item is
+    discarded.
+    
+    .. warning::
+        This class is probably not at all thread safe.
+        
+    """
+    def __init__(self,maxsize=128,*args):
+        """
+        :param int maxsize: The maximum number of items to hold in the cache.
+        
+        Further arguments are the same as for a dict.
+        """
+        from collections import OrderedDict
+        
+        self._od = OrderedDict()
+        self._maxsize = 1
+        self.maxsize = maxsize
+        if len(args)>0:
+            self.update(*args)
+            
+    def _getMaxsize(self):
+        return self._maxsize
+    def _setMaxsize(self,val):
+        val = int(val)
+        if val < 1:
+            raise ValueError('LRUCache maxsize must be at least 1')
+        self._maxsize = val
+        while len(self._od) > val:
+            self._od.popitem(last=False)
+    maxsize = property(_getMaxsize,_setMaxsize,doc="""
+    The maximum number of items held in the cache. If set to a smaller value 
+    than the current number of items, the least-recently used are discarded.
+    """)
+    
+    def __getitem__(self,key):
+        val = self._od.pop(key)
+        self._od[key] = val
+        return val
+    def __setitem__(self,key,val):
+        if key in self._od:
+            del self._od[key]
+        elif len(self._od) >= self._maxsize:
+            self._od.popitem(last=False)
+        self._od[key] = val
+    def __delitem__(self,key):
+        del self._od[key]
+    def __contains__(self,key):
+        return key in self._od
+    def __len__(self):
+        return len(self._od)
+    def __iter__(self):
+        return iter(self._od)
+    def __str__(self):
+        return str(dict(self._od))+'/LRU'
+    def clear(self):
+        self._od.clear()
+        
 class DataObjectRegistry(dict):
     """
     A class to register data sets used throughout a module and enable easy 
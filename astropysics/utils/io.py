@@ -195,6 +195,78 @@ def get_package_data(dataname):
     path = dirname(rootfile)+'/data/'+dataname
     return get_loader(rootname).get_data(path)
 
+def get_package_data_arrays(dataname,parser,cache=True):
+    """
+    Loads arrays generated from a data file distributed with the astropysics
+    source code. The first time this is called for a given file, `parser` is
+    used to generate the arrays from the file contents, and the result is
+    cached as binary numpy (.npy) files in the astropysics data directory (see
+    :func:`astropysics.config.get_data_dir`). Later calls (including in other
+    processes) memory-map the cached files instead of parsing the file again.
+
+    :param str dataname:
+        The name of a file in the package data directory.
+    :param parser:
+        A callable ``parser(content)`` that takes the content of the file as a
+        string and returns a dictionary mapping names (valid as file names) to
+        arrays.
+    :param bool cache:
+        If False, the cache is ignored and the file is always parsed.
+
+    :returns:
+        A dictionary mapping the names from `parser` to arrays. These are
+        read-only if they were loaded from the cache.
+
+    .. note::
+        The cache is regenerated whenever the package data file is modified.
+        If the cache cannot be written (e.g. the data directory is read-only),
+        the parsed arrays are returned without caching.
+
+    """
+    import os,shutil,tempfile
+    from .. import __file__ as rootfile
+    from ..config import get_data_dir
+
+    path = os.path.join(os.path.dirname(rootfile),'data',dataname)
+    if cache:
+        try:
+            st = os.stat(path)
+            stamp = '%i %r'%(st.st_size,st.st_mtime)
+            cachedir = os.path.join(get_data_dir(),'package_cache',dataname)
+        except OSError: #e.g. zipped distribution or no home directory
+            cache = False
+
+    if cache:
+        try:
+            with open(os.path.join(cachedir,'stamp')) as f:
+                if f.read() == stamp:
+                    return dict([(fn[:-4],np.load(os.path.join(cachedir,fn),mmap_mode='r'))
+                                 for fn in os.listdir(cachedir) if fn.endswith('.npy')])
+        except (OSError,IOError,ValueError):
+            pass
+
+    arrs = parser(get_package_data(dataname))
+
+    if cache:
+        tmpdir = None
+        try:
+            if not os.path.isdir(os.path.dirname(cachedir)):
+                os.makedirs(os.path.dirname(cachedir))
+            #write to a temporary directory first so that other processes never
+            #see an incomplete cache
+            tmpdir = tempfile.mkdtemp(dir=os.path.dirname(cachedir))
+            for k,v in arrs.items():
+                np.save(os.path.join(tmpdir,k+'.npy'),np.asarray(v))
+            with open(os.path.join(tmpdir,'stamp'),'w') as f:
+                f.write(stamp)
+            if os.path.exists(cachedir):
+                shutil.rmtree(cachedir,True)
+            os.rename(tmpdir,cachedir)
+        except (OSError,IOError):
+            if tmpdir is not None:
+                shutil.rmtree(tmpdir,True)
+    return arrs
+
 def _readrem(remote,reportprogress=False):
     """
     Reads the provided remote url and returns the result, possible reporting
@@ -428,3 +428,405 @@ def test_FK5Coordinates_string_formatting():
     
     assert d1.getDmsStr( canonical= True) == d2.getDmsStr( canonical= True) 
     
+
+def test_latlong_array():
+    """
+    Test LatLongCoordinatesArray conversions against the scalar coordinates.
+    """
+    from numpy import linspace
+    from astropysics.coords.coordsys import LatLongCoordinatesArray, \
+         FK5Coordinates,GalacticCoordinates,SupergalacticCoordinates, \
+         FK4Coordinates,CIRSCoordinates,ITRSCoordinates
+
+    ras = linspace(0,359,20)
+    decs = linspace(-85,85,20)
+    fk5arr = LatLongCoordinatesArray(FK5Coordinates,ras,decs)
+    fk5s = [FK5Coordinates(ra,dec) for ra,dec in zip(ras,decs)]
+
+    assert len(fk5arr) == len(fk5s)
+    assert fk5arr.epoch == 2000
+
+    for tosys in (GalacticCoordinates,SupergalacticCoordinates,FK4Coordinates,
+                  CIRSCoordinates,ITRSCoordinates):
+        arr = fk5arr.convert(tosys)
+        assert arr.coordsys is tosys
+        for i,c in enumerate(fk5s):
+            diff = (arr[i]-c.convert(tosys)).arcsec
+            assert diff < 1e-8,'Array FK5->%s too large:%g'%(tosys.__name__,diff)
+
+    #round trip
+    back = fk5arr.convert(GalacticCoordinates).convert(FK5Coordinates)
+    assert back.separation(fk5arr).max()*3600 < 1e-8
+
+    #epoch transformations with one epoch per position
+    epochs = linspace(1990,2010,20)
+    arr = fk5arr.copy()
+    arr.epoch = epochs
+    for i,c in enumerate(fk5s):
+        c.epoch = epochs[i]
+        diff = (arr[i]-c).arcsec
+        assert diff < 1e-7,'Array FK5 epoch transform too large:%g'%diff
+
+    #objects -> array round trip
+    arr2 = LatLongCoordinatesArray.fromObjects(fk5s)
+    assert arr2.separation(arr).max()*3600 < 1e-7
+    assert tuple(arr2.epoch) == tuple(epochs)
+    
+    #an array of epochs can be given to the constructor
+    arr3 = LatLongCoordinatesArray(FK5Coordinates,arr.long,arr.lat,epoch=epochs)
+    assert tuple(arr3.epoch) == tuple(epochs)
+
+def test_matrix_rotate_errors():
+    """
+    Test error propagation for LatLongCoordinates.matrixRotate and arrays.
+    """
+    from numpy import linspace
+    from astropysics.utils import rotation_matrix
+    from astropysics.coords.coordsys import LatLongCoordinatesArray, \
+         FK5Coordinates,GalacticCoordinates
+
+    #rotation about the pole leaves errors unchanged
+    c = FK5Coordinates(10,20,0.01,0.02)
+    c.matrixRotate(rotation_matrix(30,'z'))
+    assert_almost_equal(c.raerr.d,0.01,12)
+    assert_almost_equal(c.decerr.d,0.02,12)
+
+    #scalar and array propagation agree
+    ras = linspace(0,359,10)
+    decs = linspace(-80,80,10)
+    arr = LatLongCoordinatesArray(FK5Coordinates,ras,decs,0.01,0.02)
+    garr = arr.convert(GalacticCoordinates)
+    for i,(ra,dec) in enumerate(zip(ras,decs)):
+        g = FK5Coordinates(ra,dec,0.01,0.02).convert(GalacticCoordinates)
+        assert_almost_equal(g.laterr.d,garr.laterr[i],12)
+        assert_almost_equal(g.longerr.d,garr.longerr[i],12)
+
+def test_transform_cache():
+    """
+    Check that optimized (cached) conversions match the step-by-step ones
+    for different epochs.
+    """
+    from astropysics.coords.coordsys import CoordinateSystem,FK4Coordinates,\
+         GalacticCoordinates,ITRSCoordinates
+    
+    CoordinateSystem._invalidateTransformCache()
+    for epoch in (1950,1985.5,2000,2020.25):
+        fk4 = FK4Coordinates(52.7,-15.3,epoch=epoch)
+        for tosys in (GalacticCoordinates,ITRSCoordinates):
+            slow = fk4.convert(tosys,optimize=False)
+            fast1 = fk4.convert(tosys,optimize=True)
+            fast2 = fk4.convert(tosys,optimize=True)
+            assert (slow-fast1).arcsec < 1e-8,'optimized %s conversion mismatch'%tosys.__name__
+            assert (slow-fast2).arcsec < 1e-8,'cached %s conversion mismatch'%tosys.__name__
+    ncached = len(CoordinateSystem._transformcache['smatrix'])
+    assert ncached > 0
+    
+    #changing the polar motion should not reuse the cached matricies
+    ITRSCoordinates.polarmotion = (1e-6,2e-6)
+    try:
+        fk4 = FK4Coordinates(52.7,-15.3,epoch=2020.25)
+        slow = fk4.convert(ITRSCoordinates,optimize=False)
+        fast = fk4.convert(ITRSCoordinates,optimize=True)
+        assert (slow-fast).arcsec < 1e-8
+        assert len(CoordinateSystem._transformcache['smatrix']) > ncached
+    finally:
+        ITRSCoordinates.polarmotion = None
+
+    #changing transformcachesize resizes the existing cache
+    oldsize = CoordinateSystem.transformcachesize
+    CoordinateSystem.transformcachesize = 1
+    try:
+        FK4Coordinates(52.7,-15.3,epoch=1975).convert(GalacticCoordinates,optimize=True)
+        assert len(CoordinateSystem._transformcache['smatrix']) == 1
+    finally:
+        CoordinateSystem.transformcachesize = oldsize
+
+def test_transform_cache_position_dependent():
+    """
+    Check that optimized conversion does not combine or cache 'smatrix'
+    transforms that are not registered as depending only on the epoch.
+    """
+    from astropysics.coords.coordsys import CoordinateSystem,ICRSCoordinates,\
+         GalacticCoordinates,LatLongCoordinates
+    from astropysics.utils import rotation_matrix
+
+    class PosDepCoordinates(LatLongCoordinates):
+        pass
+
+    #rotation depends on the position, so a proxy object gives the wrong matrix
+    posdep = lambda c:rotation_matrix(c.longitude.d,'z')
+    CoordinateSystem.registerTransform(PosDepCoordinates,ICRSCoordinates,
+                                       posdep,transtype='smatrix')
+    try:
+        for long in (10,50,120):
+            pdc = PosDepCoordinates(long,20)
+            slow = pdc.convert(GalacticCoordinates,optimize=False)
+            fast = pdc.convert(GalacticCoordinates,optimize=True)
+            assert (slow-fast).arcsec < 1e-8
+    finally:
+        CoordinateSystem.delTransform(PosDepCoordinates,ICRSCoordinates)
+
+def test_transform_paths():
+    """
+    Check that transformation paths are updated as transforms are registered 
+    and deleted.
+    """
+    import numpy as np
+    from astropysics.coords.coordsys import CoordinateSystem,ICRSCoordinates,\
+         GalacticCoordinates,LatLongCoordinates
+    
+    class PathTestCoordinates(LatLongCoordinates):
+        pass
+    
+    identity = lambda c:np.eye(3).view(np.matrix)
+    
+    try:
+        CoordinateSystem.getTransformPath(PathTestCoordinates,GalacticCoordinates)
+        assert False,'path found for unregistered coordinates'
+    except NotImplementedError:
+        pass
+    
+    CoordinateSystem.registerTransform(PathTestCoordinates,ICRSCoordinates,
+                                       identity,transtype='smatrix')
+    CoordinateSystem.registerTransform(ICRSCoordinates,PathTestCoordinates,
+                                       identity,transtype='smatrix')
+    try:
+        path = CoordinateSystem.getTransformPath(PathTestCoordinates,GalacticCoordinates)
+        assert path[:2] == [PathTestCoordinates,ICRSCoordinates]
+        assert path[2:] == CoordinateSystem.getTransformPath(ICRSCoordinates,GalacticCoordinates)[1:]
+        
+        ptc = PathTestCoordinates(10,20)
+        gal = ptc.convert(GalacticCoordinates)
+        assert (gal - ICRSCoordinates(10,20).convert(GalacticCoordinates)).arcsec < 1e-8
+    finally:
+        CoordinateSystem.delTransform(PathTestCoordinates,ICRSCoordinates)
+        CoordinateSystem.delTransform(ICRSCoordinates,PathTestCoordinates)
+        
+    try:
+        CoordinateSystem.getTransformPath(PathTestCoordinates,GalacticCoordinates)
+        assert False,'path found after transform was deleted'
+    except NotImplementedError:
+        pass
+
+def test_match_coords():
+    """
+    Compare chunked spherical matching to a brute-force great-circle match.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import match_coords
+    
+    np.random.seed(1234)
+    ra1,dec1 = np.random.rand(300)*4+358,np.random.rand(300)*4+86
+    ra2,dec2 = np.random.rand(400)*4+358,np.random.rand(400)*4+86
+    eps = 0.1
+    
+    r1,d1,r2,d2 = [np.radians(c) for c in (ra1,dec1,ra2,dec2)]
+    cossep = np.sin(d1)[:,None]*np.sin(d2) + \
+             np.cos(d1)[:,None]*np.cos(d2)*np.cos(r1[:,None]-r2)
+    matches = np.degrees(np.arccos(np.clip(cossep,-1,1))) <= eps
+    
+    for chunksize in (37,1000):
+        m1,m2 = match_coords(ra1,dec1,ra2,dec2,eps,'mask',True,chunksize)
+        assert np.all(m1==matches.any(axis=1)) and np.all(m2==matches.any(axis=0))
+        
+        i1,i2 = match_coords(ra1,dec1,ra2,dec2,eps,'index',True,chunksize)
+        w1,w2 = np.where(matches)
+        assert np.all(i1==w1) and np.all(i2==w2)
+        
+        m2d = match_coords(ra1,dec1,ra2,dec2,eps,'match2D',True,chunksize)
+        assert isinstance(m2d,np.ndarray) and np.all(m2d==matches.T)
+        
+        s2d = match_coords(ra1,dec1,ra2,dec2,eps,'sparse2D',True,chunksize)
+        assert np.all(s2d.toarray()==matches.T)
+        
+    n1,n2 = match_coords(ra1,dec1,ra2,dec2,eps,'count',spherical=True)
+    assert n1==matches.any(axis=1).sum() and n2==matches.any(axis=0).sum()
+    
+    #the default is the cartesian distance in arbitrary units
+    x1,y1 = np.random.rand(50)*100,np.random.rand(50)*100
+    x2,y2 = np.random.rand(60)*100,np.random.rand(60)*100
+    cmatches = np.hypot(x1[:,None]-x2,y1[:,None]-y2) <= 5
+    assert np.all(match_coords(x1,y1,x2,y2,5,'match2D',chunksize=7)==cmatches.T)
+
+def test_spherical_index():
+    """
+    Compare SphericalIndex queries to brute-force great-circle separations.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import SphericalIndex,_lonlat_to_unit_vectors
+    
+    np.random.seed(4321)
+    l1,b1 = np.random.rand(500)*360,np.degrees(np.arcsin(np.random.rand(500)*2-1))
+    l2,b2 = np.random.rand(200)*360,np.degrees(np.arcsin(np.random.rand(200)*2-1))
+    cossep = np.dot(_lonlat_to_unit_vectors(l2,b2),_lonlat_to_unit_vectors(l1,b1).T)
+    seps = np.degrees(np.arccos(np.clip(cossep,-1,1)))
+    
+    idx = SphericalIndex(l1,b1)
+    
+    knnseps,knninds = idx.query_knn(l2,b2,k=3)
+    assert np.all(knninds==np.argsort(seps,axis=1)[:,:3])
+    assert np.allclose(knnseps,np.sort(seps,axis=1)[:,:3])
+    
+    qinds,inds,rseps = idx.query_radius(l2,b2,radius=8,chunksize=33)
+    w2,w1 = np.where(seps<=8)
+    assert np.all(qinds==w2) and np.all(inds==w1)
+    assert np.allclose(rseps,seps[w2,w1])
+    
+    radii = np.array([2,8,30])
+    assert np.all(idx.count_pairs(l2,b2,radii)==[np.sum(seps<=r) for r in radii])
+
+def test_separation_chunks():
+    """
+    Check the chunked separation reductions against the full separation matrix.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import separation_matrix,separation_histogram,\
+         separation_min,separation_matrix_chunks
+    
+    np.random.seed(2468)
+    v = np.random.randn(150,3)
+    w = np.random.randn(90,3)
+    
+    full = separation_matrix(v,w)
+    blocks = [b for i,b in separation_matrix_chunks(v,w,chunksize=16)]
+    assert np.all(np.concatenate(blocks)==full)
+    
+    dists = np.sqrt(np.sum(full**2,axis=-1))
+    mins,argmins = separation_min(v,w,chunksize=16)
+    assert np.allclose(mins,dists.min(axis=1))
+    assert np.all(argmins==dists.argmin(axis=1))
+    
+    counts,edges = separation_histogram(v,w,bins=12,chunksize=16)
+    assert np.all(counts==np.histogram(dists,edges)[0])
+    
+    #great-circle distances for pairs within a single set
+    lonlat = np.array((np.random.rand(200)*360,
+                       np.degrees(np.arcsin(np.random.rand(200)*2-1)))).T
+    l,b = np.radians(lonlat.T)
+    cossep = np.sin(b)[:,None]*np.sin(b) + np.cos(b)[:,None]*np.cos(b)*np.cos(l[:,None]-l)
+    seps = np.degrees(np.arccos(np.clip(cossep,-1,1)))
+    
+    counts,edges = separation_histogram(lonlat,bins=9,greatcircle=True,chunksize=7)
+    assert np.all(counts==np.histogram(seps[np.triu_indices(200,1)],edges)[0])
+    
+    np.fill_diagonal(seps,np.inf)
+    mins,argmins = separation_min(lonlat,greatcircle=True,chunksize=7)
+    assert np.allclose(mins,seps.min(axis=1))
+    assert np.all(argmins==seps.argmin(axis=1))
+
+def test_cosmo_dist_table():
+    """
+    Check the tabulated cosmological distances against direct integration and
+    the inversion to redshift.
+    """
+    import numpy as np
+    from astropysics.constants import choose_cosmology,get_cosmology
+    from astropysics.coords.funcs import cosmo_z_to_dist,cosmo_dist_to_z,\
+         _cosmo_integral
+    
+    oldcosmo = get_cosmology()
+    try:
+        for cosmo in ('wmap7baoh0','scdm'):
+            choose_cosmology(cosmo)
+            z = np.array([1e-3,0.05,0.5,1.5,4,20,500])
+            for lookback in (False,True):
+                direct = _cosmo_integral(z,lookback,1e-8,{'epsrel':1e-12})
+                d = cosmo_z_to_dist(z,disttype=3 if lookback else 0)
+                assert np.allclose(d/d[0],direct/direct[0],rtol=1e-8,atol=0)
+                
+            for disttype in ('comoving','luminosity','lookback','distmod'):
+                d = cosmo_z_to_dist(z,disttype=disttype)
+                assert np.allclose(cosmo_dist_to_z(d,disttype=disttype),z,rtol=1e-8)
+                
+            d = cosmo_z_to_dist(z[:3],disttype='angular')
+            assert np.allclose(cosmo_dist_to_z(d,disttype='angular'),z[:3],rtol=1e-8)
+            assert abs(cosmo_dist_to_z(d[1],disttype='angular')-z[1]) < 1e-8
+    finally:
+        choose_cosmology(oldcosmo)
+
+def test_cosmology_cache():
+    """
+    Check that cached cosmological distances are dropped when the cosmology
+    changes.
+    """
+    from astropysics import constants
+    from astropysics.coords.funcs import cosmo_z_to_dist
+    
+    oldcosmo = constants.get_cosmology()
+    try:
+        cosmo = constants.choose_cosmology('wmap7')
+        d70 = cosmo_z_to_dist(0.5)
+        
+        version = constants.get_cosmology_version()
+        cosmo.H0 = cosmo.H0/2
+        assert constants.get_cosmology_version() > version
+        assert_almost_equal(cosmo_z_to_dist(0.5)/d70,2,10)
+        
+        version = constants.get_cosmology_version()
+        constants.choose_cosmology('wmap7')
+        assert constants.get_cosmology_version() > version
+        assert_almost_equal(cosmo_z_to_dist(0.5)/d70,1,10)
+        
+        #cosmologies that are not current do not invalidate the caches
+        version = constants.get_cosmology_version()
+        other = constants.WMAP7Cosmology()
+        other.H0 = 50
+        assert constants.get_cosmology_version() == version
+        
+        assert constants.cosmology_cached(('test',),lambda:1) == 1
+        assert constants.cosmology_cached(('test',),lambda:2) == 1
+        constants.update_cosmology()
+        assert constants.cosmology_cached(('test',),lambda:2) == 2
+    finally:
+        constants.choose_cosmology(oldcosmo)
+
+def test_precession_nutation_cache():
+    """
+    Check the cached and vectorized precession-nutation matricies against the
+    direct scalar calculation.
+    """
+    import numpy as np
+    from astropysics.coords import coordsys
+    from astropysics.coords.coordsys import CIRSCoordinates,ICRSCoordinates,\
+         set_precession_nutation_cache,_precession_matrix_J2000_Capitaine,\
+         _nutation_matrix
+    
+    epochs = np.array([1987.123,2000,2011.5,2033.9])
+    NP,NPB,C,s = coordsys._pn_cache.compute(epochs)
+    for i,epoch in enumerate(epochs):
+        NPi = _nutation_matrix(epoch)*_precession_matrix_J2000_Capitaine(epoch)
+        assert np.allclose(NP[i],NPi,rtol=0,atol=1e-15)
+        assert np.allclose(NPB[i],NPi*ICRSCoordinates.frameBiasJ2000,rtol=0,atol=1e-15)
+        assert np.allclose(CIRSCoordinates._CMatrix(epoch),C[i],rtol=0,atol=1e-15)
+        assert CIRSCoordinates._CMatrix(epoch) is CIRSCoordinates._CMatrix(epoch)
+    
+    #interpolated values should be within the tolerance (in arcsec)
+    set_precession_nutation_cache(interptol=1e-5)
+    try:
+        epochs = np.linspace(2010,2011,500)
+        exact = coordsys._PrecessionNutationCache().compute(epochs)[2]
+        interp = coordsys._pn_cache.compute(epochs)[2]
+        assert np.max(np.abs(exact-interp))*206264.806 < 1e-5
+    finally:
+        set_precession_nutation_cache()
+
+def test_equinox_epoch_transform():
+    """
+    Check that EquatorialCoordinatesEquinox epoch transformations use the
+    inverse of the full precession-nutation matrix, so they round-trip and
+    match the transformation through GCRS.
+    """
+    from astropysics.coords.coordsys import EquatorialCoordinatesEquinox,\
+         GCRSCoordinates
+    
+    for ra,dec in ((10,20),(200,-60),(330,85)):
+        c = EquatorialCoordinatesEquinox(ra,dec,epoch=1990)
+        c.epoch = 2030
+        
+        g = EquatorialCoordinatesEquinox(ra,dec,epoch=1990).convert(GCRSCoordinates)
+        expected = GCRSCoordinates(g.ra.d,g.dec.d,epoch=2030).convert(EquatorialCoordinatesEquinox)
+        assert (c-expected).arcsec < 1e-8,'epoch transform mismatch:%g'%(c-expected).arcsec
+        
+        c.epoch = 1990
+        back = (c-EquatorialCoordinatesEquinox(ra,dec,epoch=1990)).arcsec
+        assert back < 1e-8,'epoch round trip too large:%g'%back
@@ -5593,4 +5593,83 @@ def test_radec():
 #        assert (ec.ra-hc.ra).arcsec<140,'RA diff too large for Jupiter:%g arcsec'%(ec.ra-hc.ra).arcsec
 #        assert (ec.dec-hc.dec).arcsec<60,'Dec diff too large for Jupiter:%g arcsec'%(ec.ra-hc.ra).arcsec
 
-    return dict(dras),dict(ddecs)
\ No newline at end of file
+    return dict(dras),dict(ddecs)
+
+def test_array_ephems():
+    """
+    Test vectorized ephemerides against the one-at-a-time calculation.
+    """
+    from astropysics.coords import GCRSCoordinates
+    
+    jds = np.linspace(2451545,2451545+365,20)
+    for objname in ('Mars','Moon','Earth'):
+        m = ephems.get_solar_system_ephems(objname)
+        carr = m(jds,asarray=True)
+        cs = m(jds)
+        assert len(carr.x)==len(jds)
+        assert np.allclose(carr.x,[c.x for c in cs])
+        assert np.allclose(carr.y,[c.y for c in cs])
+        assert np.allclose(carr.z,[c.z for c in cs])
+        
+        if objname!='Earth':
+            garr = m(jds,GCRSCoordinates,asarray=True)
+            gs = m(jds,GCRSCoordinates)
+            assert np.allclose(garr.ra,[c.ra.d for c in gs])
+            assert np.allclose(garr.dec,[c.dec.d for c in gs])
+            
+    pm = ephems.ProperMotionObject('pm',10,20,1,-2,distpc0=10)
+    parr = pm(jds,asarray=True)
+    assert np.allclose(parr.ra,[c.ra.d for c in pm(jds)])
+    assert np.allclose(parr.dec,[c.dec.d for c in pm(jds)])
+    
+    try:
+        pm([],asarray=True)
+        assert False,'empty jds did not raise a ValueError'
+    except ValueError:
+        pass
+    
+    M = np.linspace(-np.pi,np.pi,101)
+    for e in (0,.1,.5,.9,.999):
+        E = ephems.KeplerianObject._solveKepler(M,e)
+        assert np.max(np.abs(E-e*np.sin(E)-M))<1e-8
+        
+def test_earth_pos_vel_array():
+    """
+    Test that earth_pos_vel gives the same results for arrays and scalars.
+    """
+    jds = np.linspace(2415021,2488069,25)
+    for barycentric in (False,True):
+        pos,vel = ephems.earth_pos_vel(jds,barycentric)
+        assert pos.shape==(3,len(jds)) and vel.shape==(3,len(jds))
+        for i,jd in enumerate(jds):
+            p,v = ephems.earth_pos_vel(jd,barycentric)
+            assert p.shape==(3,)
+            assert np.allclose(pos[:,i],p,rtol=0,atol=1e-13)
+            assert np.allclose(vel[:,i],v,rtol=0,atol=1e-11)
+            
+    e = ephems.Earth()
+    assert np.allclose(e.getVelocity(jds),ephems.earth_pos_vel(jds,True)[1])
+
+def test_earth_series_cache():
+    import os,shutil,tempfile
+    from astropysics import config
+    from astropysics.utils.io import get_package_data_arrays
+    
+    #use a temporary data directory so the user's cache is left alone
+    tmpdir = tempfile.mkdtemp()
+    oldgetdatadir = config.get_data_dir
+    config.get_data_dir = lambda create=True:tmpdir
+    try:
+        parsed = get_package_data_arrays('earth_series.tab',ephems._parse_earth_series,cache=False)
+        assert not os.listdir(tmpdir)
+        get_package_data_arrays('earth_series.tab',ephems._parse_earth_series)
+        assert os.path.isdir(os.path.join(tmpdir,'package_cache','earth_series.tab'))
+        cached = get_package_data_arrays('earth_series.tab',ephems._parse_earth_series)
+        assert sorted(parsed.keys()) == sorted(cached.keys())
+        for k in parsed:
+            assert np.all(parsed[k] == cached[k])
+            assert cached[k].shape == parsed[k].shape
+        del cached
+    finally:
+        config.get_data_dir = oldgetdatadir
+        shutil.rmtree(tmpdir,True)
@@ -2,7 +2,7 @@
 from __future__ import division,with_statement
 from astropysics.constants import pi
 import numpy as np
-from astropysics.objcat import StructuredFieldNode,Catalog,Field,CycleError, \
+from astropysics.objcat import StructuredFieldNode,FieldNode,Catalog,Field,CycleError, \
                                CycleWarning,LinkField
 from nose import tools
 
@@ -63,6 +63,23 @@ class Test4(StructuredFieldNode):
     @StructuredFieldNode.derivedFieldFunc
     def d2(val4='^.0-val4',val='^^.0-val',num='.top-num'):
         return val4+val+num
+
+    
+class Test5(StructuredFieldNode):
+    """
+    Counts derived function calls for test_evaluate_derived below.
+    """
+    calls = []
+    x = Field('x',float,(2.0,0.1,0.1))
+    
+    @StructuredFieldNode.derivedFieldFunc
+    def y(x='x'):
+        Test5.calls.append(x)
+        return x*2
+    
+    @StructuredFieldNode.derivedFieldFunc
+    def z(y='y',x='x'):
+        return y+x
     
 def test_deps():
     """
@@ -167,3 +184,182 @@ def test_sed():
     f['o2'] = PhotObservation('ugriz',randn(5,12)+12,rand(5,12)/3)
     
     return f
+
+def test_columnar_cat():
+    """
+    Test columnar Catalog storage
+    """
+    c = Catalog('col',columnar=True)
+    nodes = [Test1(c) for i in range(10)]
+    nodes[3]['num'] = ('testsrc',(7.5,0.5))
+    nodes[5].addField('extra')
+    nodes[5]['extra'] = ('testsrc',2)
+    
+    cols = c.columns
+    tools.assert_equal(len(cols),10)
+    tools.assert_equal(cols['num'][3],7.5)
+    tools.assert_equal(cols['num'].dtype,float)
+    tools.assert_equal(cols.getErrors('num')[0][3],0.5)
+    tools.assert_equal(cols.getSources('num',True)[3],'testsrc')
+    tools.assert_equal(list(cols.getMask('extra')),[i==5 for i in range(10)])
+    
+    #changes through the node interface, including derived values
+    nodes[3]['num'] = None
+    nodes[0]['num'] = ('testsrc',1.0)
+    tools.assert_equal(cols['num'][3],4.2)
+    tools.assert_equal(cols['f'][0],2*1.0+1+5.6)
+    
+    #changes in the catalog structure
+    nodes[1].parent = None
+    Test1(c,num=('testsrc2',3))
+    tools.assert_equal(len(cols),10)
+    tools.assert_equal(cols['num'][-1],3)
+    tools.assert_equal(cols.select(cols['num'] < 4.2),[nodes[0],c.children[-1]])
+    
+    #derived values that cannot be computed because a dependency is empty
+    c3 = Catalog('col3',columnar=True)
+    Test3(c3,a=('testsrc',1.0),b=('testsrc',2.0))
+    Test3(c3,a=('testsrc',3.0))
+    
+    #extraction must match the tree traversal
+    kws = ({},{'errors':True,'sources':True},{'missing':'mask'},{'missing':0},
+           {'missing':'masked'},{'missing':'skip'},
+           {'missing':'mask','errors':True,'sources':True})
+    for cat,fnss in ((c,('num,num2,f','extra')),(c3,('a,d','d'))):
+        for fns in fnss:
+            for kw in kws:
+                colres = cat.extractField(fns,**kw)
+                cat.columnar = False
+                treeres = cat.extractField(fns,**kw)
+                cat.columnar = True
+                tools.assert_equal(repr(colres),repr(treeres))
+
+def test_extract_field():
+    """
+    Test single-pass field extraction and the cached node order
+    """
+    c = Catalog('ext')
+    nodes = [Test1(c) for i in range(5)]
+    nodes[2]['num'] = ('testsrc',(7.5,0.5))
+    nodes[4].addField('extra')
+    nodes[4]['extra'] = ('testsrc',2)
+    
+    num,f = c.extractField('num,f')
+    tools.assert_equal(list(num),[4.2,4.2,7.5,4.2,4.2])
+    tools.assert_equal(f[2],2*7.5+1+5.6)
+    
+    arr,errs,srcs = c.extractField('num',sources=True,errors=True)
+    tools.assert_equal(srcs[2],'testsrc')
+    tools.assert_equal(tuple(errs[2]),(0.5,0.5))
+    tools.assert_equal(tuple(errs[0]),(1,2))
+    
+    extra,msk = c.extractField('extra',missing='mask')
+    tools.assert_equal(list(msk),[False,False,False,False,True])
+    tools.assert_equal(extra[4],2)
+    tools.assert_equal(len(c.extractField('extra',missing='skip')),1)
+    
+    tools.assert_equal(len(c.extractField('num',filter=lambda n:n is not nodes[2])),4)
+    tools.assert_equal(len(c.extractField('num',filter=4.2)),1)
+    
+    #the cached node order must follow changes in the tree
+    nodes[0].parent = None
+    Test1(c,num=('testsrc2',3))
+    tools.assert_equal(list(c.extractField('num')),[4.2,7.5,4.2,4.2,3])
+    Test1(c.children[1],num=('testsrc2',1))
+    tools.assert_equal(list(c.extractField('num')),[4.2,1,7.5,4.2,4.2,3])
+
+def test_visit():
+    """
+    Test tree traversal orders
+    """
+    c = Catalog('vis')
+    a,b = Test1(c),Test1(c)
+    a1,a2,a3 = Test1(a),Test1(a),Test1(a)
+    
+    tools.assert_equal(c.visit(lambda n:n,'postorder'),[a1,a2,a3,a,b,c])
+    tools.assert_equal(c.visit(lambda n:n,'preorder'),[c,a,a1,a2,a3,b])
+    tools.assert_equal(c.visit(lambda n:n,1),[a1,a,a2,a3,c,b])
+    tools.assert_equal(c.visit(lambda n:n,1,includeself=False),[a1,a,a2,a3,b])
+    tools.assert_equal(c.visit(lambda n:n,0.5,includeself=False),[a1,a,a2,a3,b])
+    tools.assert_equal(c.visit(lambda n:n,'level'),[c,a,b,a1,a2,a3])
+    tools.assert_equal(c.visit(lambda n:n,'level',includeself=False),[a,b,a1,a2,a3])
+    tools.assert_equal(c.visit(lambda n:n,None),[c])
+    tools.assert_raises(ValueError,c.ivisit,lambda n:n,'inorder')
+    
+    tools.assert_equal(c.visit(lambda n:n,filter=lambda n:n is not a),[a1,a2,a3,b,c])
+    tools.assert_equal(c.visit(lambda n:len(n.children),filter=0),[3,2])
+    it = c.ivisit(lambda n:n,'preorder')
+    tools.assert_equal(it.next(),c)
+    
+    #deeper than the recursion limit
+    n = b
+    for i in range(1200):
+        n = Test1(n)
+    tools.assert_equal(len(list(c.ivisit(lambda n:n))),1206)
+
+def test_evaluate_derived():
+    """
+    Test batched derived value evaluation
+    """
+    c = Catalog('der')
+    nodes = [Test5(c,x=('testsrc',(i,0.1*i,0.2))) for i in range(10)]
+    lazy = [Test5(None,x=('testsrc',(i,0.1*i,0.2))) for i in range(10)]
+    
+    del Test5.calls[:]
+    c.evaluateDerived('z')
+    tools.assert_equal(len(Test5.calls),3) #value + upper/lower errors
+    for n,l in zip(nodes,lazy):
+        tools.assert_true(n.y.currentobj._valid and n.z.currentobj._valid)
+        tools.assert_almost_equal(n['z'],l['z'])
+        tools.assert_almost_equal(n.z.currenterror[0],l.z.currenterror[0])
+        tools.assert_almost_equal(n.z.currenterror[1],l.z.currenterror[1])
+    tools.assert_equal(nodes[0].y.currenterror,(0.0,0.4))
+    
+    #invalidated values are recomputed
+    nodes[2]['x'] = ('testsrc2',5)
+    c.evaluateDerived()
+    tools.assert_equal(nodes[2]['z'],15)
+    tools.assert_equal(nodes[2].z.currenterror,(0,0))
+    
+    #cycles are left to be computed individually
+    c2 = Catalog('cyc')
+    Test2(c2)
+    c2.evaluateDerived()
+    tools.assert_false(c2.children[0].d1.currentobj._valid)
+
+def test_bulk_update():
+    """
+    Test deferred change notifications
+    """
+    c = Catalog('bulk')
+    nodes = [Test3(c,a=('testsrc',1.0),b=('testsrc',2.0)) for i in range(3)]
+    for n in nodes:
+        tools.assert_equal(n['d'],0)
+        
+    calls = []
+    def notifier(oldvalobj,newvalobj):
+        calls.append(newvalobj)
+    nodes[0].d.registerNotifier(notifier,False)
+    
+    nodes[0]['a'] = ('testsrc2',3.0)
+    nodes[0]['b'] = ('testsrc2',4.0)
+    tools.assert_equal(len(calls),2)
+    tools.assert_equal(nodes[0]['d'],1)
+    
+    del calls[:]
+    with c.bulkUpdate():
+        for n in nodes:
+            n['a'] = ('testsrc3',5.0)
+            n['b'] = ('testsrc3',6.0)
+            with c.bulkUpdate():
+                n['a'] = ('testsrc4',7.0)
+        tools.assert_equal(len(calls),0)
+        tools.assert_equal(nodes[1]['d'],0) #not yet invalidated
+    tools.assert_equal(len(calls),1)
+    for n in nodes:
+        tools.assert_equal(n['d'],4)
+    
+    del calls[:]
+    FieldNode.setToSourceAtNode(c,'testsrc')
+    tools.assert_equal(len(calls),1)
+    tools.assert_equal(nodes[0]['d'],0)
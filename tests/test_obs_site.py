@@ -299,3 +299,282 @@ class TestOnSky(unittest.TestCase):
                                    vernal_equinox_2012,
                                       )
         self.assertFalse(on_sky)
+
+
+class TestBarycentricCorrection(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.site = greenwich()
+        self.jds = 2455197.5 + np.linspace(0, 3, 200)
+        self.coords = FK5Coordinates("0:42:44 +41:16:09 J2000.0")
+
+    def test_exact_correction(self):
+        import numpy as np
+        from astropysics.obstools import barycentric_correction
+
+        bjds, rvs = barycentric_correction(self.jds, self.coords, self.site)
+        self.assertTrue(np.all(np.abs(bjds - self.jds)*86400 < 510))
+        self.assertTrue(np.all(np.abs(rvs) < 30.5))
+
+        #array results must match the scalar computation
+        bjd, rv = barycentric_correction(self.jds[7], self.coords, self.site)
+        self.assertAlmostEqual(bjd, bjds[7], 9)
+        self.assertAlmostEqual(rv, rvs[7], 9)
+
+        #the observer's rotation contributes at most ~0.47 km/s
+        gbjds, grvs = barycentric_correction(self.jds, self.coords)
+        self.assertTrue(np.all(np.abs(rvs - grvs) < 0.47))
+        self.assertTrue(np.all(np.abs(bjds - gbjds)*86400 < 0.022))
+
+    def test_ephemeris_time_scale(self):
+        import numpy as np
+        from astropysics.constants import c, cmperau
+        from astropysics.coords.ephems import earth_pos_vel
+        from astropysics.obstools import barycentric_correction, delta_AT
+
+        #UTC inputs must use the Earth's position and velocity at TT
+        jds = 2455197.5 + np.linspace(0, 365, 50)
+        pos, vel = earth_pos_vel(jds + delta_AT(jds, True)/86400, True)
+        ra, dec = 10.68, 41.27 #ICRS degrees
+        n = np.array((np.cos(np.radians(dec))*np.cos(np.radians(ra)),
+                      np.cos(np.radians(dec))*np.sin(np.radians(ra)),
+                      np.sin(np.radians(dec))))
+        bjds, rvs = barycentric_correction(jds, (ra, dec))
+        delays = np.dot(n, pos)*cmperau/c
+        self.assertTrue(np.all(np.abs((bjds - jds)*86400 - delays) < 1e-5))
+        self.assertTrue(np.all(np.abs(rvs - np.dot(n, vel)) < 1e-9))
+
+    def test_corrector_matches_exact(self):
+        import numpy as np
+        from astropysics.obstools import BarycentricCorrector, \
+                                         barycentric_correction
+
+        bc = BarycentricCorrector(self.site)
+        coords = (self.coords.ra.d, self.coords.dec.d)
+        bjds, rvs = barycentric_correction(self.jds, coords, self.site)
+        cbjds, crvs = bc(self.jds, coords)
+        self.assertTrue(np.all(np.abs(bjds - cbjds)*86400 < 1e-4))
+        self.assertTrue(np.all(np.abs(rvs - crvs) < 1e-4))
+        self.assertEqual(len(bc._cache), 4)
+
+
+class TestDeltaAT(unittest.TestCase):
+    def tearDown(self):
+        astropysics.obstools.set_leap_seconds()
+
+    def test_array_delta_at(self):
+        import numpy as np
+        from astropysics.obstools import delta_AT
+
+        #values from the SOFA dat.c algorithm
+        jds = np.array([2438821.0, 2452791.5, 2457754.4999, 2457754.5])
+        dats = np.array([3.717242, 32, 36, 37])
+        self.assertTrue(np.allclose(delta_AT(jds), dats))
+        self.assertTrue(np.allclose(delta_AT(jds, usett=True), dats + 32.184))
+        self.assertEqual(delta_AT(jds[1]), 32)
+        self.assertEqual(delta_AT(jds.reshape(2, 2)).shape, (2, 2))
+
+    def test_leap_second_file(self):
+        import os, tempfile
+        from astropysics.obstools import delta_AT, set_leap_seconds
+
+        fd, fn = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('#@\t3913056000\n')
+                f.write('2272060800\t10\t# 1 Jan 1972\n')
+                f.write('3692217600\t36\t# 1 Jul 2015\n')
+                f.write('3912019200\t38\t# 1 Jan 2024 (fictitious)\n')
+            set_leap_seconds(fn)
+        finally:
+            os.remove(fn)
+
+        self.assertEqual(delta_AT(2460310.5), 38)
+        self.assertEqual(delta_AT(2451545.0), 10)
+        self.assertAlmostEqual(delta_AT(2438821.0), 3.717242)
+
+
+class TestDatetime64(unittest.TestCase):
+    def test_datetime64_round_trip(self):
+        import numpy as np
+        from astropysics.obstools import calendar_to_jd, jd_to_calendar
+
+        dts = np.array(['1850-06-01T00:00', '2000-01-01T12:00',
+                        '2010-07-04T18:30:15.25'], dtype='datetime64[us]')
+        jds = calendar_to_jd(dts)
+        pyjds = calendar_to_jd([d.tolist() for d in dts])
+        self.assertTrue(np.allclose(jds, pyjds, rtol=0, atol=1e-8))
+        self.assertEqual(jds[1], 2451545)
+        self.assertTrue(np.all(jd_to_calendar(jds, output='datetime64',
+                                              rounding=1000) == dts))
+        self.assertEqual(jd_to_calendar(2451545, output='datetime64'),
+                         np.datetime64('2000-01-01T12:00', 'us'))
+        self.assertTrue(np.allclose(calendar_to_jd(dts, mjd=True),
+                                    jds - 2400000.5))
+
+    def test_datetime64_tz(self):
+        import numpy as np
+        from astropysics.obstools import calendar_to_jd, jd_to_calendar
+
+        #standard and daylight time in the same array
+        dts = np.array(['2010-01-01T00:00', '2010-07-01T00:00'],
+                       dtype='datetime64[us]')
+        jds = calendar_to_jd(dts, tz='US/Pacific')
+        self.assertTrue(np.allclose(jds, [calendar_to_jd((2010, 1, 1, 0), -8),
+                                          calendar_to_jd((2010, 7, 1, 0), -7)]))
+        self.assertTrue(np.allclose(calendar_to_jd(dts, tz=-8),
+                                    calendar_to_jd(dts) + 8/24.))
+        self.assertTrue(np.all(jd_to_calendar(jds, output='datetime64',
+                                              tz='US/Pacific') == dts))
+        local = jd_to_calendar(jds, tz='US/Pacific')
+        self.assertEqual([d.hour for d in local], [0, 0])
+
+
+class TestTimeArray(unittest.TestCase):
+    def test_scale_conversions(self):
+        import numpy as np
+        from astropysics.obstools import TimeArray, delta_AT
+
+        jds = 2455197.5 + np.linspace(0, 1000, 50)
+        t = TimeArray(jds, scale='utc', dut1=0.25)
+        self.assertTrue(np.allclose((t.tai.jd - jds)*86400, delta_AT(jds),
+                                    atol=1e-4))
+        self.assertTrue(np.allclose((t.tt.jd2 - t.tai.jd2)*86400, 32.184))
+        self.assertTrue(np.allclose((t.ut1.jd2 - t.jd2)*86400, 0.25))
+        self.assertTrue(np.all(np.abs((t.tdb.jd2 - t.tt.jd2)*86400) < 0.002))
+
+        #round trips must be exact to well below a microsecond
+        for scale in TimeArray.scales:
+            back = TimeArray(t.to(scale).jd1, t.to(scale).jd2, scale,
+                             dut1=0.25).utc
+            dt = (back.jd1 - t.jd1) + (back.jd2 - t.jd2)
+            self.assertTrue(np.all(np.abs(dt)*86400 < 1e-6))
+        self.assertTrue(t.tt.utc is t)
+
+    def test_leap_second_boundary(self):
+        from astropysics.obstools import TimeArray
+
+        t = TimeArray(2457754.5, -0.5/86400, 'utc')
+        self.assertAlmostEqual(t.tai.jd2*86400, 35.5, 6)
+        self.assertAlmostEqual(t.tai.utc.jd2*86400, 86399.5, 6)
+        self.assertEqual((t.year, t.month, t.day, t.hour, t.minute),
+                         (2016, 12, 31, 23, 59))
+
+    def test_derived_quantities(self):
+        import numpy as np
+        from astropysics.obstools import TimeArray, jd_to_epoch
+        from astropysics.coords import greenwich_sidereal_time
+
+        jds = np.array([2451545.0, 2455197.75])
+        t = TimeArray(jds, scale='tt')
+        self.assertTrue(np.allclose(t.epoch, jd_to_epoch(jds)))
+        self.assertTrue(t.epoch is t.epoch)
+        self.assertTrue(np.allclose(np.asarray(t), jds))
+        self.assertTrue(np.allclose(t.gmst,
+                        greenwich_sidereal_time(t.ut1.jd, False)))
+        self.assertEqual(list(t.hour), [12, 6])
+        self.assertEqual(t[1].scale, 'tt')
+
+
+class TestRiseSetTransitArray(unittest.TestCase):
+    def setUp(self):
+        self.site = greenwich()
+
+    def test_matches_scalar(self):
+        import numpy as np
+        from astropysics.obstools import calendar_to_jd
+
+        ras = np.linspace(0, 350, 15)
+        decs = np.linspace(-45, 85, 15)
+        r, s, t = self.site.riseSetTransitArray((ras, decs),
+                                                vernal_equinox_2012.date())
+        for i, (ra, dec) in enumerate(zip(ras, decs)):
+            res = self.site.riseSetTransit(FK5Coordinates(ra, dec),
+                                           vernal_equinox_2012.date(),
+                                           timeobj=True, utc=True)
+            for arr, dt in zip((r, s, t), res):
+                if dt is None:
+                    self.assertTrue(np.isnan(arr[i]))
+                else:
+                    jd = calendar_to_jd(dt)
+                    self.assertTrue(abs(arr[i] - jd)*86400 < 2)
+
+    def test_next_matches_scalar(self):
+        import numpy as np
+        from astropysics.obstools import calendar_to_jd
+
+        coords = [equatorial_transiting_at_ve_m6hr,
+                  equatorial_transiting_at_ve_m1hr,
+                  equatorial_transiting_at_ve_p12hr,
+                  circumpolar_north_transit_at_ve_m1hr,
+                  circumpolar_north_transit_at_ve_p12hr,
+                  never_visible_source]
+        r, s, t = self.site.nextRiseSetTransitArray(coords,
+                                        calendar_to_jd(vernal_equinox_2012))
+        for i, c in enumerate(coords):
+            res = self.site.nextRiseSetTransit(c, vernal_equinox_2012)
+            for arr, dt in zip((r, s, t), res):
+                if dt is None:
+                    self.assertTrue(np.isnan(arr[i]))
+                else:
+                    jd = calendar_to_jd(dt)
+                    self.assertTrue(abs(arr[i] - jd)*86400 < 2)
+
+    def test_moving_target(self):
+        import numpy as np
+
+        ra, dec = equatorial_transiting_at_ve.ra.d, 10.0
+        fixed = self.site.riseSetTransitArray(([ra], [dec]),
+                                              vernal_equinox_2012.date())
+        #a target moving 1 degree/day east rises, transits, and sets later
+        def coords(jds):
+            return ra + (np.asarray(jds) - 2456005.5), np.ones(np.shape(jds))*dec
+        moving = self.site.riseSetTransitArray(coords,
+                                               vernal_equinox_2012.date())
+        for m, f in zip(moving, fixed):
+            self.assertTrue(0 < (m[0] - f[0])*1440 < 10)
+
+
+class TestAltAzGrid(unittest.TestCase):
+    def setUp(self):
+        self.site = greenwich()
+
+    def test_matches_equatorial_to_horizontal(self):
+        import numpy as np
+
+        coords = [equatorial_transiting_at_ve, circumpolar_north_transit_at_ve,
+                  never_visible_source]
+        jds = 2456006.5 + np.linspace(0, 1, 7)
+        grid = self.site.altAzGrid(coords, jds, precess=False,
+                                   refraction=False)
+        self.assertEqual(grid.shape, (3, 7))
+        for i, c in enumerate(coords):
+            for j, jd in enumerate(jds):
+                lst = self.site.localSiderialTime(jd)
+                hc = self.site.equatorialToHorizontal(c, lst)
+                self.assertAlmostEqual(grid.alt[i, j], hc.alt.d, 4)
+                self.assertAlmostEqual(grid.az[i, j], hc.az.d, 4)
+        self.assertTrue(np.all(grid.alt[2] < 0))
+        self.assertTrue(np.all(np.abs(grid.ha) <= 12))
+
+        #refraction only raises objects, and by < 35 arcmin
+        rgrid = self.site.altAzGrid(coords, jds, precess=False)
+        dalt = (rgrid.alt - grid.alt)*60
+        self.assertTrue(np.all((dalt >= 0) & (dalt < 35)))
+
+    def test_refraction_matches_apparent_coordinates(self):
+        import numpy as np
+
+        jds = 2456006.5 + np.linspace(0, 1, 5)
+        grid = self.site.altAzGrid([equatorial_transiting_at_ve], jds,
+                                   precess=False)
+        hcs = self.site.apparentCoordinates(equatorial_transiting_at_ve, jds,
+                                            precess=False)
+        for j, hc in enumerate(hcs):
+            self.assertAlmostEqual(grid.alt[0, j], hc.alt.d, 4)
+
+    def test_night_table(self):
+        table = self.site.nightTable(equatorial_transiting_at_ve,
+                                     vernal_equinox_2012.date())
+        self.assertEqual(len(table), 25)
+        self.assertEqual(table.dtype.names, ('hour', 'alt', 'az', 'airmass'))
@@ -0,0 +1,102 @@
+import numpy as np
+from astropysics.obstools import Site
+from astropysics.scheduling import Scheduler, AirmassConstraint, \
+                                   MoonSeparationConstraint, Constraint
+
+
+def _random_targets(n, seed=1):
+    rs = np.random.RandomState(seed)
+    return rs.rand(n)*360, rs.rand(n)*120 - 60, rs.rand(n)
+
+
+def _kpno():
+    return Site(lat=31.9633, long=-111.6, alt=2120, tz=-7, name='KPNO')
+
+
+def test_schedule():
+    ras, decs, pris = _random_targets(300)
+    sched = Scheduler(_kpno(), (ras, decs), priorities=pris, exptimes=900,
+                      constraints=[AirmassConstraint(2),
+                                   MoonSeparationConstraint(30)])
+    sched.setNight((2012, 3, 20))
+
+    #night bounded by 12 degree twilight
+    assert np.all(sched.sunalt < -12)
+    assert sched.allowed.shape == (300, len(sched.jds))
+
+    plan = sched.schedule()
+    assert len(plan) > 0
+    assert len(set(plan.target)) == len(plan)
+    assert np.all(plan.end[:-1] <= plan.start[1:] + 1e-9)
+    assert np.all(plan.airmass <= 2)
+    assert np.all(plan.alt > 0)
+    #each exposure must fit in the allowed region for its target
+    for k, start, end in zip(plan.target, plan.start, plan.end):
+        inexp = (sched.jds >= start) & (sched.jds < end)
+        assert np.all(sched.allowed[k, inexp])
+        assert np.all(sched.moonsep[k, inexp & (sched.moonalt > 0)] >= 30)
+
+
+def test_lookahead():
+    #two equal-priority targets: 0 is rising (best airmass at the end of the
+    #grid) and 1 is setting (best airmass now)
+    sched = Scheduler(_kpno(), ([0, 180], [0, 0]), exptimes=600, timestep=600)
+    am = np.array([[1.3, 1.2, 1.1, 1.0], [1.5, 1.7, 2.0, 2.5]])
+    sched.jds = 2456007 + np.arange(4)*600/86400.
+    sched.grid = np.rec.fromarrays((90 - np.degrees(np.arccos(1/am)), am),
+                                   names='alt,airmass')
+
+    #without lookahead, ties in priority go to the lower current airmass
+    greedy = sched.schedule(lookahead=0)
+    assert list(greedy.target) == [0, 1]
+
+    #with lookahead, the rising target is deferred until it is better placed
+    plan = sched.schedule()
+    assert list(plan.target) == [1, 0]
+    assert np.allclose(plan.airmass, [1.5, 1.2])
+
+
+def test_custom_constraint():
+    ras, decs, pris = _random_targets(100)
+
+    class NorthConstraint(Constraint):
+        def allowed(self, scheduler):
+            return (scheduler.dec > 0)[:, np.newaxis]
+
+    sched = Scheduler(_kpno(), (ras, decs), priorities=pris, exptimes=600)
+    sched.setNight((2012, 3, 20))
+    nplan = len(sched.schedule())
+    sched.addConstraint(NorthConstraint())
+    plan = sched.schedule()
+    assert np.all(decs[plan.target] > 0)
+    assert len(plan) <= nplan
+
+    #plain callables work as well
+    sched.addConstraint(lambda s: s.jds < s.jds[len(s.jds)//2])
+    plan = sched.schedule()
+    assert np.all(plan.start < sched.jds[len(sched.jds)//2])
+
+
+def benchmark_schedule(n=3000, lookahead=None):
+    """
+    Times the scheduling of `n` random targets for one night.
+    """
+    from time import time
+
+    ras, decs, pris = _random_targets(n)
+    t0 = time()
+    sched = Scheduler(_kpno(), (ras, decs), priorities=pris, exptimes=600,
+                      constraints=[AirmassConstraint(2),
+                                   MoonSeparationConstraint(30)])
+    sched.setNight((2012, 3, 20))
+    t1 = time()
+    plan = sched.schedule(lookahead)
+    t2 = time()
+    print '%i targets, %i time steps: grids %.3f s, plan %.3f s, %i scheduled' % \
+          (n, len(sched.jds), t1 - t0, t2 - t1, len(plan))
+    return t2 - t0
+
+
+if __name__ == '__main__':
+    for n in (1000, 3000, 10000):
+        benchmark_schedule(n)